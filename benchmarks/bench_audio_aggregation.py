@@ -0,0 +1,89 @@
+"""Messages and CPU against playback start delay of the audio aggregation.
+
+Streams `--seconds` of response audio in `--delta-ms` deltas through an
+AudioAggregator for each `--frame-ms`, sending binary frames to a local
+websocket as server.py does (0 is no aggregation, one message per delta).
+Messages and CPU are measured on an unpaced replay, the playback start
+delay (first delta to first frame sent) on deltas arriving in real time.
+Run with `python -m benchmarks.bench_audio_aggregation`.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+
+from yampa.utils import FRAME_RATE, SAMPLE_WIDTH, AudioAggregator, pack_audio_frame
+
+
+async def drain(ws):
+    async for _ in ws:
+        pass
+
+
+async def bench(
+    frame_ms: int, max_latency_ms: int, delta: bytes, deltas: int, url: str
+) -> tuple[int, float, float]:
+    async with connect(url) as ws:
+        sequence = itertools.count()
+        messages = 0
+        first_sent_at = 0.0
+
+        async def send(item_id: str, pcm: bytes):
+            nonlocal messages, first_sent_at
+            messages += 1
+            first_sent_at = first_sent_at or time.perf_counter()
+            await ws.send(pack_audio_frame(item_id, next(sequence), pcm))
+
+        aggregator = AudioAggregator(send, frame_ms, max_latency_ms)
+        start = time.process_time()
+        for _ in range(deltas):
+            await aggregator.append("item_1", delta)
+        await aggregator.done("item_1")
+        cpu = time.process_time() - start
+        sent = messages
+
+        # Real time arrival, the start of playback waits for the first frame
+        interval = len(delta) / SAMPLE_WIDTH / FRAME_RATE
+        first_sent_at = 0.0
+        received_at = time.perf_counter()
+        for _ in range(deltas):
+            await aggregator.append("item_2", delta)
+            if first_sent_at:
+                break
+            await asyncio.sleep(interval)
+        while not first_sent_at:
+            await asyncio.sleep(0.001)
+        aggregator.close()
+    return sent, cpu, first_sent_at - received_at
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--delta-ms", type=int, default=20)
+    parser.add_argument("--frame-ms", type=int, nargs="+", default=[0, 40, 60, 80, 100])
+    parser.add_argument("--max-latency-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    delta = bytes(FRAME_RATE * SAMPLE_WIDTH * args.delta_ms // 1000)
+    deltas = int(args.seconds * 1000 / args.delta_ms)
+    async with serve(drain, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        url = f"ws://127.0.0.1:{port}"
+        for frame_ms in args.frame_ms:
+            messages, cpu, delay = await bench(
+                frame_ms, args.max_latency_ms, delta, deltas, url
+            )
+            print(
+                f"frame {frame_ms:>3}ms {messages / args.seconds:6.1f} messages/s"
+                f" {cpu / args.seconds * 60 * 1000:7.1f}ms CPU per minute of speech"
+                f" {delay * 1000:6.1f}ms playback start delay"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
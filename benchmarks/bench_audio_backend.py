@@ -0,0 +1,43 @@
+"""Throughput per core of the audio backends, in seconds of audio per CPU second.
+
+Run with `python -m benchmarks.bench_audio_backend`.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from yampa.utils import NumpyBackend, PydubBackend
+
+FORMATS = [(48000, 2), (48000, 1), (44100, 2), (16000, 1)]
+
+
+def make_audio(frame_rate: int, channels: int, seconds: float) -> bytes:
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    samples = (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+    return np.repeat(samples, channels).tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    for frame_rate, channels in FORMATS:
+        audio = make_audio(frame_rate, channels, args.seconds)
+        for backend in (NumpyBackend(), PydubBackend()):
+            start = time.process_time()
+            for _ in range(args.iterations):
+                backend.to_pcm16(audio, frame_rate, channels, 2)
+            elapsed = time.process_time() - start
+            throughput = args.seconds * args.iterations / elapsed
+            print(
+                f"{frame_rate}Hz/{channels}ch {type(backend).__name__:<13} "
+                f"{throughput:8.0f}x realtime per core"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Bytes and CPU per minute of speech sent to the browser for audio deltas.
+
+Compares the `new.audio` json envelope holding the base64 delta with the
+binary frame holding the decoded pcm16. Run with
+`python -m benchmarks.bench_audio_transport`.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import time
+
+from yampa.utils import FRAME_RATE, SAMPLE_WIDTH, pack_audio_frame
+
+from .common import load_scenario
+
+
+def json_transport(deltas: list[tuple[str, str]]) -> int:
+    sent = 0
+    for _, delta in deltas:
+        # Same encoding as starlette's WebSocket.send_json
+        message = json.dumps(
+            {"type": "new.audio", "data": delta},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        sent += len(message.encode())
+    return sent
+
+
+def binary_transport(deltas: list[tuple[str, str]]) -> int:
+    sent = 0
+    sequence = itertools.count()
+    for item_id, delta in deltas:
+        sent += len(pack_audio_frame(item_id, next(sequence), base64.b64decode(delta)))
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    deltas = [
+        (event["item_id"], event["delta"])
+        for event in load_scenario(args.scenario)
+        if event["type"] == "response.audio.delta"
+    ]
+    pcm_bytes = sum(len(base64.b64decode(delta)) for _, delta in deltas)
+    minutes = pcm_bytes / SAMPLE_WIDTH / FRAME_RATE / 60
+
+    for name, transport in (("json", json_transport), ("binary", binary_transport)):
+        start = time.process_time()
+        for _ in range(args.iterations):
+            sent = transport(deltas)
+        cpu = (time.process_time() - start) / args.iterations
+        print(
+            f"{name:<7} {sent / minutes / 1e6:6.2f}MB "
+            f"{cpu / minutes * 1000:7.2f}ms CPU per minute of speech"
+        )
+
+
+if __name__ == "__main__":
+    main()
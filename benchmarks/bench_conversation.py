@@ -0,0 +1,112 @@
+"""Conversation state of a long session: ConversationStore against scratch.py.
+
+Replays a synthetic session of `--items` turns, each a user item, an
+assistant item streaming transcript and audio deltas, and deletions past
+`--keep` items (clients prune long conversations): the oldest item, or one
+in the middle with `--delete middle`. The baseline mirrors `EventProcessors`
+from `scratch.py`: copied dicts, `list.remove` on delete, base64 strings in
+a list and transcripts grown with `+=`.
+
+Run with `python -m benchmarks.bench_conversation`.
+"""
+
+import argparse
+import asyncio
+import base64
+import time
+import tracemalloc
+
+from yampa.openai.conversation import ConversationStore
+from yampa.openai.events import AudioDeltaView
+
+# 50ms of audio per delta, as sent upstream
+DELTA = base64.b64encode(bytes(2400)).decode()
+
+
+class ScratchProcessors:
+    def __init__(self):
+        self.itemLookup = {}
+        self.items = []
+
+    async def on_item_created(self, event):
+        item = event["item"].copy()
+        self.itemLookup[item["id"]] = item
+        self.items.append(item)
+        item["formatted"] = {"audio": [], "text": "", "transcript": ""}
+
+    async def on_item_deleted(self, event):
+        item = self.itemLookup.pop(event["item_id"])
+        self.items.remove(item)
+
+    async def on_audio_transcript_delta(self, event):
+        self.itemLookup[event["item_id"]]["formatted"]["transcript"] += event["delta"]
+
+    async def on_audio_delta(self, event):
+        self.itemLookup[event["item_id"]]["formatted"]["audio"].extend(event["delta"])
+
+
+def session(items: int, keep: int, deltas: int, delete: str):
+    """(method, event) pairs of the synthetic session."""
+    previous = None
+    alive = []
+    for turn in range(items):
+        for role in ("user", "assistant"):
+            item_id = f"item_{turn}_{role}"
+            yield (
+                "on_item_created",
+                {
+                    "type": "conversation.item.created",
+                    "previous_item_id": previous,
+                    "item": {"id": item_id, "type": "message", "role": role},
+                },
+            )
+            previous = item_id
+            alive.append(item_id)
+        for _ in range(deltas):
+            yield "on_audio_transcript_delta", {"item_id": item_id, "delta": "word "}
+            yield "on_audio_delta", {"item_id": item_id, "delta": DELTA}
+        while len(alive) > keep:
+            index = 0 if delete == "oldest" else len(alive) // 2
+            yield "on_item_deleted", {"item_id": alive.pop(index)}
+
+
+async def replay(state, events) -> float:
+    start = time.perf_counter()
+    for method, event in events:
+        await getattr(state, method)(event)
+    return time.perf_counter() - start
+
+
+def bench(name: str, state, events):
+    tracemalloc.start()
+    elapsed = asyncio.run(replay(state, events))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"{name:<8} {len(events) / elapsed:12,.0f} events/s"
+        f" {memory / 1024 / 1024:8.1f}MiB held"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--keep", type=int, default=2000)
+    parser.add_argument("--deltas", type=int, default=10)
+    parser.add_argument("--delete", choices=("oldest", "middle"), default="oldest")
+    args = parser.parse_args()
+
+    events = list(session(args.items, args.keep, args.deltas, args.delete))
+    bench("scratch", ScratchProcessors(), events)
+    # The store is fed audio views, as EventHandler.handle_message builds them
+    events = [
+        (method, AudioDeltaView.model_validate(event))
+        if method == "on_audio_delta"
+        else (method, event)
+        for method, event in events
+    ]
+    bench("store", ConversationStore(), events)
+
+
+if __name__ == "__main__":
+    main()
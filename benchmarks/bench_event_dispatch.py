@@ -0,0 +1,48 @@
+"""Events per second dispatched by EventHandler.handle_event.
+
+Replays the ask_order scenario with the callbacks server.py registers.
+Run with `python -m benchmarks.bench_event_dispatch`.
+"""
+
+import argparse
+import asyncio
+import time
+
+from yampa.openai.processors import EventHandler
+
+from .common import load_scenario
+
+
+async def noop(_):
+    pass
+
+
+async def dispatch(events: list[dict], repeat: int) -> float:
+    event_handler = EventHandler(
+        on_transcript_delta_done=noop,
+        on_output_item_done=noop,
+        on_audio_delta=noop,
+        on_audio_done=noop,
+        on_input_audio_transcription_completed=noop,
+        on_event=noop,
+    )
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for event in events:
+            await event_handler.handle_event(event)
+    return len(events) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    events = load_scenario(args.scenario)
+    rate = asyncio.run(dispatch(events, args.repeat))
+    print(f"{rate:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""EventHandler.handle_event on recorded and long synthetic sessions.
+
+Replays each scenario through an event handler with the subscriptions of a
+relay session (server.py callbacks and a ConversationStore) and reports
+events/s, the p50/p99 latency of a `handle_event` call and the memory
+allocated during the replay, measured with tracemalloc in a separate pass
+so it does not skew the timings.
+
+Results are saved under `benchmarks/results/<commit>.json` with `--save`,
+and `--compare <commit>` prints the change against a saved run:
+
+    python -m benchmarks.bench_event_handler --save
+    git checkout other-branch
+    python -m benchmarks.bench_event_handler --compare <commit>
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from yampa.openai.conversation import ConversationStore
+from yampa.openai.instrumentation import DispatchMetrics
+from yampa.openai.processors import EventHandler
+
+from .common import load_timed_scenario, scale_scenario
+
+RESULTS = Path(__file__).resolve().parent / "results"
+
+
+async def noop(_):
+    pass
+
+
+DISPATCH_METRICS = False
+
+
+def make_event_handler() -> EventHandler:
+    event_handler = EventHandler(
+        on_transcript_delta_done=noop,
+        on_output_item_done=noop,
+        on_audio_delta=noop,
+        on_audio_done=noop,
+        on_input_audio_transcription_completed=noop,
+        on_event=noop,
+    )
+    ConversationStore().attach(event_handler)
+    if DISPATCH_METRICS:
+        event_handler.add_hook(DispatchMetrics(slow_threshold=None))
+    return event_handler
+
+
+async def replay(events: list[dict], repeat: int) -> list[int]:
+    """Duration of every handle_event call, in nanoseconds."""
+    durations = []
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        # A fresh session each time, the store would otherwise ignore the
+        # items it already has
+        event_handler = make_event_handler()
+        for event in events:
+            start = clock()
+            await event_handler.handle_event(event)
+            durations.append(clock() - start)
+    return durations
+
+
+async def allocations(events: list[dict]) -> tuple[int, int]:
+    """Peak and retained memory allocated by a replay, in bytes."""
+    event_handler = make_event_handler()
+    tracemalloc.start()
+    for event in events:
+        await event_handler.handle_event(event)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, retained
+
+
+def bench(events: list[dict], repeat: int) -> dict:
+    durations = asyncio.run(replay(events, repeat))
+    peak, retained = asyncio.run(allocations(events))
+    quantiles = statistics.quantiles(durations, n=100)
+    return {
+        "events": len(events),
+        "events_per_s": len(durations) / (sum(durations) / 1e9),
+        "p50_us": quantiles[49] / 1000,
+        "p99_us": quantiles[98] / 1000,
+        "peak_kib": peak / 1024,
+        "retained_kib": retained / 1024,
+    }
+
+
+def commit() -> str:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    sha = git("rev-parse", "--short", "HEAD")
+    return (
+        f"{sha}-dirty" if git("status", "--porcelain", "--untracked-files=no") else sha
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument(
+        "--turns",
+        type=int,
+        nargs="+",
+        default=[100, 1000],
+        help="Synthetic sessions repeating the scenario that many times",
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--dispatch-metrics",
+        action="store_true",
+        help="Replay with the callbacks instrumented",
+    )
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--compare", metavar="COMMIT")
+    args = parser.parse_args()
+
+    global DISPATCH_METRICS
+    DISPATCH_METRICS = args.dispatch_metrics
+    events, timestamps = load_timed_scenario(args.scenario)
+    sessions = {args.scenario: (events, args.repeat)}
+    for turns in args.turns:
+        scaled, _ = scale_scenario(events, timestamps, turns)
+        # About as many events replayed per session size
+        sessions[f"{args.scenario}x{turns}"] = (
+            scaled,
+            max(1, args.repeat // turns),
+        )
+
+    results = {name: bench(*session) for name, session in sessions.items()}
+
+    baseline = {}
+    if args.compare:
+        baseline = json.loads((RESULTS / f"{args.compare}.json").read_text())
+    for name, result in results.items():
+        line = (
+            f"{name:<20} {result['events_per_s']:12,.0f} events/s"
+            f" p50 {result['p50_us']:7.1f}us p99 {result['p99_us']:7.1f}us"
+            f" peak {result['peak_kib']:9.1f}KiB"
+            f" retained {result['retained_kib']:9.1f}KiB"
+        )
+        if name in baseline:
+            before = baseline[name]
+            line += (
+                f"  (events/s {result['events_per_s'] / before['events_per_s'] - 1:+.1%},"
+                f" p99 {result['p99_us'] / before['p99_us'] - 1:+.1%},"
+                f" peak {result['peak_kib'] / before['peak_kib'] - 1:+.1%})"
+            )
+        print(line)
+
+    if args.save:
+        RESULTS.mkdir(exist_ok=True)
+        path = RESULTS / f"{commit()}.json"
+        path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
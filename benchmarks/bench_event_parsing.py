@@ -0,0 +1,54 @@
+"""Messages per second parsed into typed models, with and without json.loads.
+
+Parses the scenario frames of the `ServerEvent` union the way the event
+handler used to, `json.loads` then `model_validate` of the dict, and in one
+pass with `model_validate_json` of the discriminated union. The frames are
+bytes, as the runner receives them. Run with
+`python -m benchmarks.bench_event_parsing`.
+"""
+
+import argparse
+import json
+import time
+
+from yampa.openai.events import SERVER_EVENT_MODELS, parse_server_event
+
+from .common import load_scenario
+
+
+def two_pass(message: bytes):
+    event = json.loads(message)
+    return SERVER_EVENT_MODELS[event["type"]].model_validate(event)
+
+
+def bench(parse, messages: list[bytes], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            parse(message)
+    return len(messages) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--audio", action="store_true", help="Include the audio deltas")
+    args = parser.parse_args()
+
+    messages = [
+        json.dumps(event).encode()
+        for event in load_scenario(args.scenario)
+        if event["type"] in SERVER_EVENT_MODELS
+        and (args.audio or event["type"] != "response.audio.delta")
+    ]
+    print(f"{len(messages)} frames, {args.repeat} times")
+    for name, parse in (
+        ("json.loads + model_validate", two_pass),
+        ("model_validate_json", parse_server_event),
+    ):
+        print(f"{name:<28} {bench(parse, messages, args.repeat):10.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Bytes sent to the browser per session with and without the event filter.
+
+Replays the scenario through the callbacks server.py registers with the
+binary audio transport: audio deltas as binary frames, and the events of
+the subscription relayed in the `event` envelope. Run with
+`python -m benchmarks.bench_event_subscription`.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from yampa.openai.events import AudioDeltaView, RawEvent
+from yampa.openai.processors import EventHandler
+from yampa.openai.subscriptions import DEFAULT_SUBSCRIPTION, resolve_subscription
+from yampa.utils import pack_audio_frame
+
+from .common import load_scenario
+
+
+async def replay(messages: list[str], subscription: list[str]) -> tuple[int, float]:
+    sent = 0
+
+    async def on_audio_delta(audio_delta: AudioDeltaView):
+        nonlocal sent
+        sent += len(pack_audio_frame(audio_delta.item_id, 0, audio_delta.pcm()))
+
+    async def on_event(event: RawEvent):
+        nonlocal sent
+        sent += len(('{"type":"event","data":' + event.text + "}").encode())
+
+    event_handler = EventHandler()
+    event_handler.register("response.audio.delta", on_audio_delta, AudioDeltaView)
+    for pattern in resolve_subscription(subscription):
+        event_handler.register(pattern, on_event, RawEvent)
+    start = time.process_time()
+    for message in messages:
+        await event_handler.handle_message(message)
+    return sent, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    args = parser.parse_args()
+
+    messages = [json.dumps(event) for event in load_scenario(args.scenario)]
+    for name, subscription in (
+        ("all", ["all"]),
+        ("default", list(DEFAULT_SUBSCRIPTION)),
+    ):
+        sent, cpu = asyncio.run(replay(messages, subscription))
+        print(f"{name:<8} {sent / 1024:8.1f}KiB {cpu * 1000:6.2f}ms CPU per session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""CPU time per second of audio of the decoding path against the pcm16 one.
+
+Run with `python -m benchmarks.bench_pcm_fast_path`. The CPU time of the
+ffmpeg processes spawned by pydub is included.
+"""
+
+import argparse
+import io
+import math
+import resource
+import struct
+import time
+import wave
+
+from yampa.utils import (
+    CHANNELS,
+    FRAME_RATE,
+    SAMPLE_WIDTH,
+    audio_to_item_create_event,
+    pcm16_to_base64,
+)
+
+
+def make_pcm(seconds: float) -> bytes:
+    return b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / FRAME_RATE)))
+        for i in range(int(seconds * FRAME_RATE))
+    )
+
+
+def to_wav(pcm: bytes) -> bytes:
+    out = io.BytesIO()
+    with wave.open(out, "wb") as f:
+        f.setnchannels(CHANNELS)
+        f.setsampwidth(SAMPLE_WIDTH)
+        f.setframerate(FRAME_RATE)
+        f.writeframes(pcm)
+    return out.getvalue()
+
+
+def cpu_time() -> float:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def bench(name: str, convert, payload: bytes, seconds: float, iterations: int):
+    start = cpu_time()
+    for _ in range(iterations):
+        convert(payload)
+    elapsed = cpu_time() - start
+    per_second = elapsed / (iterations * seconds)
+    print(f"{name:<8} {per_second * 1000:8.3f}ms CPU per second of audio")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    pcm = make_pcm(args.seconds)
+    bench(
+        "decode",
+        audio_to_item_create_event,
+        to_wav(pcm),
+        args.seconds,
+        args.iterations,
+    )
+    bench("pcm16", pcm16_to_base64, pcm, args.seconds, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
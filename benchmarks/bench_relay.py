@@ -0,0 +1,66 @@
+"""Upstream receive CPU per session: decoding every frame against the relay.
+
+Replays the ask_order frames through the server.py audio and firehose
+callbacks, first decoding each frame with json.loads and validating an
+AudioDelta, then with EventHandler.handle_message and the raw views. Run with
+`python -m benchmarks.bench_relay`.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from yampa.openai.events import AudioDelta, AudioDeltaView, RawEvent
+from yampa.openai.processors import EventHandler
+
+from .common import load_scenario
+
+
+async def decoded(frames: list[bytes], repeat: int):
+    async def on_audio_delta(audio_delta: AudioDelta):
+        json.dumps({"type": "new.audio", "data": audio_delta.delta})
+
+    async def on_event(event: dict):
+        json.dumps({"type": "event", "data": event})
+
+    event_handler = EventHandler(on_audio_delta=on_audio_delta, on_event=on_event)
+    for _ in range(repeat):
+        for frame in frames:
+            await event_handler.handle_event(json.loads(frame))
+
+
+async def relayed(frames: list[bytes], repeat: int):
+    async def on_audio_delta(audio_delta: AudioDeltaView):
+        '{"type":"new.audio","data":"' + audio_delta.delta + '"}'
+
+    async def on_event(event: RawEvent):
+        '{"type":"event","data":' + event.text + "}"
+
+    event_handler = EventHandler()
+    event_handler.register("response.audio.delta", on_audio_delta, AudioDeltaView)
+    event_handler.register("*", on_event, RawEvent)
+    for _ in range(repeat):
+        for frame in frames:
+            await event_handler.handle_message(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    frames = [
+        json.dumps(event, separators=(",", ":")).encode()
+        for event in load_scenario(args.scenario)
+    ]
+    for name, receive in (("decoded", decoded), ("relayed", relayed)):
+        start = time.process_time()
+        asyncio.run(receive(frames, args.repeat))
+        cpu = (time.process_time() - start) / args.repeat
+        print(f"{name:<8} {cpu * 1e6:8.1f}us CPU per scenario replay")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Cost of the session.update sent on every upstream connection.
+
+Run with `python -m benchmarks.bench_session_update`.
+"""
+
+import argparse
+import time
+from typing import Literal
+
+from yampa.openai.events import make_session_update_event, session_update_payload
+
+
+def get_product_remmaining_stock(product_id: int) -> int:
+    """Get product remaining stock given a product id."""
+    return 0
+
+
+def get_weather(location: str, scale: Literal["C", "F", "K"]) -> str:
+    """Get the weather at a given location."""
+    return ""
+
+
+TOOLS = [get_product_remmaining_stock, get_weather]
+
+
+def bench(name: str, build, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build(TOOLS)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {elapsed / iterations * 1e6:8.1f}us per connection")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    bench(
+        "build",
+        lambda tools: (
+            make_session_update_event(tools=tools)
+            .model_dump_json(exclude_unset=True)
+            .encode()
+        ),
+        args.iterations,
+    )
+    bench("cached", session_update_payload, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
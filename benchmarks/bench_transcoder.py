@@ -0,0 +1,74 @@
+"""Compare the per-payload pydub decode against the streaming transcoder.
+
+Run with `python -m benchmarks.bench_transcoder`, ffmpeg must be installed.
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+from pathlib import Path
+
+from pydub import AudioSegment
+
+from yampa.utils import StreamingTranscoder, audio_to_item_create_event
+
+AUDIO = Path(__file__).resolve().parent.parent / "tests" / "ask_orders.m4a"
+
+
+def make_payload(path: Path) -> bytes:
+    # MediaRecorder sends ogg/opus, which unlike m4a can be read from a pipe
+    out = io.BytesIO()
+    AudioSegment.from_file(path).export(out, format="ogg", codec="libopus")
+    return out.getvalue()
+
+
+def bench_pydub(payload: bytes, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        audio_to_item_create_event(payload)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_transcoder(payload: bytes, iterations: int) -> list[float]:
+    transcoder = StreamingTranscoder()
+    await transcoder.start()
+    timings = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await transcoder.feed(payload)
+            await transcoder.flush()
+            timings.append(time.perf_counter() - start)
+            # Let the next process spawn as it would between two recordings
+            await asyncio.sleep(0.05)
+    finally:
+        await transcoder.close()
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{name:<12} mean={statistics.mean(timings) * 1000:7.2f}ms "
+        f"p50={statistics.median(timings) * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", type=Path, default=AUDIO)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = make_payload(args.input)
+    report("pydub", bench_pydub(payload, args.iterations))
+    report("transcoder", asyncio.run(bench_transcoder(payload, args.iterations)))
+
+
+if __name__ == "__main__":
+    main()
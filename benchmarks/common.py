@@ -0,0 +1,54 @@
+import json
+import re
+from pathlib import Path
+
+SCENARIOS = Path(__file__).resolve().parent.parent / "tests" / "scenarios"
+
+# Ids upstream generates, renamed when a scenario is repeated
+_ID = re.compile(r'"((?:event|item|resp|call)_[A-Za-z0-9]{8,})"')
+
+
+def load_scenario(scenario_name: str) -> list[dict]:
+    return load_timed_scenario(scenario_name)[0]
+
+
+def load_timed_scenario(scenario_name: str) -> tuple[list[dict], list[float]]:
+    """Events of a scenario and their timestamps, the unix time file names."""
+    steps = []
+    timestamps = []
+    for path in sorted((SCENARIOS / scenario_name).iterdir()):
+        with open(path) as file:
+            steps.append(json.load(file))
+        timestamps.append(float(path.stem))
+    return steps, timestamps
+
+
+def rename_ids(payload: str, suffix: str) -> str:
+    """Append `suffix` to the upstream ids found in a json payload."""
+    return _ID.sub(lambda match: f'"{match[1]}{suffix}"', payload)
+
+
+def scale_scenario(
+    events: list[dict], timestamps: list[float], turns: int, pause: float = 5.0
+) -> tuple[list[dict], list[float]]:
+    """Repeat a scenario `turns` times, as one long session.
+
+    Each repetition gets its own ids so the items add up instead of
+    replacing each other, its first item follows the last one of the
+    previous repetition, and it starts `pause` seconds after it.
+    """
+    payload = json.dumps(events)
+    span = timestamps[-1] - timestamps[0] + pause if timestamps else 0.0
+    scaled_events: list[dict] = []
+    scaled_timestamps: list[float] = []
+    last_item_id = None
+    for turn in range(turns):
+        for event in json.loads(rename_ids(payload, f"_{turn}")):
+            if event["type"] == "conversation.item.created":
+                # Chained after the previous turn, not at the start
+                if event.get("previous_item_id", "") is None:
+                    event["previous_item_id"] = last_item_id
+                last_item_id = event["item"]["id"]
+            scaled_events.append(event)
+        scaled_timestamps.extend(timestamp + turn * span for timestamp in timestamps)
+    return scaled_events, scaled_timestamps
@@ -0,0 +1,195 @@
+"""Browser-like load on a server.py worker, to find how many sessions it holds.
+
+Opens `--clients` concurrent `/ws` sessions, spread over `--ramp` seconds.
+Each one sends `--turns` recordings, waiting for the response to finish
+and `--pause` seconds between them, like the Record button of index.html.
+Reports the time to the first response audio and to `response.done` of
+the turns, and from `/metrics` the worker sessions, upstream connections,
+child processes (ffmpeg) and memory, the children's included. Upstream
+connections and children still there once the clients left are leaks.
+
+Against the local stand-in of the realtime API:
+
+    python -m benchmarks.mock_realtime --port 9000
+    OPENAI_REALTIME_URL=ws://127.0.0.1:9000 OPENAI_API_KEY=mock \\
+        uvicorn server:app --port 8000
+    python -m benchmarks.loadgen --clients 100
+
+The default recording is 2s of pcm16 tone, so the worker does not spend
+its time in ffmpeg, use `--audio tests/ask_orders.m4a --audio-format
+container` to include the decoding.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import struct
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import websockets
+
+
+@dataclass
+class Results:
+    first_audio: list[float] = field(default_factory=list)
+    turns: list[float] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+def tone(seconds: float, sample_rate: int = 24000) -> bytes:
+    samples = int(seconds * sample_rate)
+    return struct.pack(
+        f"<{samples}h",
+        *(
+            int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+            for i in range(samples)
+        ),
+    )
+
+
+def scrape(url: str) -> dict[str, float]:
+    """Unlabelled samples of a Prometheus text endpoint."""
+    with urllib.request.urlopen(url) as response:
+        text = response.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#") and "{" not in line:
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+async def client(url: str, audio: bytes, args: argparse.Namespace, results: Results):
+    async with websockets.connect(url, max_size=None) as ws:
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            first_audio = None
+            await ws.send(audio)
+            while True:
+                message = await ws.recv()
+                if isinstance(message, bytes):
+                    if first_audio is None:
+                        first_audio = time.perf_counter() - start
+                    continue
+                event = json.loads(message)
+                if event["type"] == "error":
+                    results.errors.append(event["error"]["type"])
+                elif (
+                    event["type"] == "event"
+                    and event["data"]["type"] == "response.done"
+                ):
+                    break
+            results.turns.append(time.perf_counter() - start)
+            if first_audio is not None:
+                results.first_audio.append(first_audio)
+            await asyncio.sleep(args.pause)
+
+
+def memory(samples: dict[str, float]) -> float:
+    return samples.get("process_resident_memory_bytes", 0) + samples.get(
+        "yampa_child_resident_memory_bytes", 0
+    )
+
+
+def held(samples: dict[str, float]) -> float:
+    # A session is held until both its browser and upstream sockets are gone
+    return max(
+        samples.get("yampa_sessions", 0),
+        samples.get("yampa_upstream_connections", 0)
+        - samples.get("yampa_session_pool_idle", 0),
+    )
+
+
+async def sample(url: str, peak: dict[str, float], stop: asyncio.Event):
+    # Memory at the most sessions the worker held at once
+    while not stop.is_set():
+        samples = await asyncio.to_thread(scrape, url)
+        if held(samples) >= held(peak):
+            peak.update(samples)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except TimeoutError:
+            pass
+
+
+def quantiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(values, n=100)
+    return f"p50 {cuts[49] * 1000:7.0f}ms p99 {cuts[98] * 1000:7.0f}ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", default="127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--pause", type=float, default=1.0)
+    parser.add_argument("--ramp", type=float, default=5.0)
+    parser.add_argument("--audio", help="Recording sent each turn")
+    parser.add_argument(
+        "--audio-format", choices=("pcm16", "container"), default="pcm16"
+    )
+    args = parser.parse_args()
+
+    if args.audio is None:
+        audio = tone(2.0)
+    else:
+        audio = await asyncio.to_thread(Path(args.audio).read_bytes)
+    url = (
+        f"ws://{args.server}/ws?audio_transport=binary"
+        f"&audio_format={args.audio_format}&sample_rate=24000"
+    )
+    metrics_url = f"http://{args.server}/metrics"
+
+    idle = await asyncio.to_thread(scrape, metrics_url)
+    peak: dict[str, float] = {}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample(metrics_url, peak, stop))
+
+    results = Results()
+
+    async def delayed(index: int):
+        await asyncio.sleep(args.ramp * index / args.clients)
+        try:
+            await client(url, audio, args, results)
+        except (OSError, websockets.WebSocketException) as exc:
+            results.errors.append(type(exc).__name__)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(delayed(index) for index in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+    # Time for the worker to tear the sessions down
+    await asyncio.sleep(1.0)
+    after = await asyncio.to_thread(scrape, metrics_url)
+
+    sessions = held(peak)
+    used = memory(peak) - memory(idle)
+    print(
+        f"clients          {args.clients} ({len(results.turns)} turns in {elapsed:.1f}s)"
+    )
+    print(f"errors           {len(results.errors)} {sorted(set(results.errors))}")
+    print(f"sessions/worker  {sessions:.0f} at peak")
+    for label, name in (
+        ("upstream", "yampa_upstream_connections"),
+        ("children", "yampa_child_processes"),
+    ):
+        print(
+            f"{label:<16} {peak.get(name, 0):.0f} at peak,"
+            f" {after.get(name, 0) - idle.get(name, 0):.0f} left after the clients"
+        )
+    print(f"first audio      {quantiles(results.first_audio)}")
+    print(f"turn             {quantiles(results.turns)}")
+    if sessions:
+        print(f"memory/session   {used / sessions / 1024:.0f}KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
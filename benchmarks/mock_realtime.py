@@ -0,0 +1,137 @@
+"""Local stand-in for the OpenAI realtime API, to load-test server.py.
+
+Answers the events a session with client turn detection sends:
+`session.update` with `session.updated`, `input_audio_buffer.commit` with
+the recorded user item and `response.create` by replaying the recorded
+response, keeping its timing divided by `--speed`. `response.cancel` stops
+the replay. Every session and turn gets its own ids.
+
+Run with `python -m benchmarks.mock_realtime --port 9000` and point the
+server at it with `OPENAI_REALTIME_URL=ws://127.0.0.1:9000`.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from .common import load_timed_scenario, rename_ids
+
+
+class MockRealtime:
+    def __init__(self, scenario: str = "ask_order", speed: float = 1.0):
+        events, timestamps = load_timed_scenario(scenario)
+        self.speed = speed
+        self.session_created = json.dumps(events[0])
+        # The user item comes with the commit, the rest is the response
+        start = next(
+            index
+            for index, event in enumerate(events)
+            if event["type"] == "response.created"
+        )
+        self.user_items = [
+            json.dumps(event)
+            for event in events[1:start]
+            if event["type"] == "conversation.item.created"
+        ]
+        self.response_id = events[start]["response"]["id"]
+        self.response = [
+            (timestamp - timestamps[start], json.dumps(event))
+            for event, timestamp in zip(events[start:], timestamps[start:])
+        ]
+        self._sessions = itertools.count()
+        self.audio_bytes = 0
+
+    async def _replay(self, ws: ServerConnection, suffix: str):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for offset, payload in self.response:
+            delay = start + offset / self.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await ws.send(rename_ids(payload, suffix))
+            except ConnectionClosed:
+                return
+
+    async def handler(self, ws: ServerConnection):
+        session = next(self._sessions)
+        turns = itertools.count()
+        suffix = f"_{session}_{next(turns)}"
+        replay: asyncio.Task | None = None
+        response_id = None
+        await ws.send(rename_ids(self.session_created, f"_{session}"))
+        try:
+            async for message in ws:
+                event = json.loads(message)
+                event_type = event["type"]
+                if event_type == "session.update":
+                    await ws.send(
+                        json.dumps(
+                            {"type": "session.updated", "session": event["session"]}
+                        )
+                    )
+                elif event_type == "input_audio_buffer.append":
+                    self.audio_bytes += len(event["audio"]) * 3 // 4
+                elif event_type == "input_audio_buffer.commit":
+                    await ws.send(json.dumps({"type": "input_audio_buffer.committed"}))
+                    for item in self.user_items:
+                        await ws.send(rename_ids(item, suffix))
+                elif event_type == "response.create":
+                    if replay is not None and not replay.done():
+                        await ws.send(
+                            json.dumps(
+                                {
+                                    "type": "error",
+                                    "error": {
+                                        "type": "invalid_request_error",
+                                        "code": "conversation_already_has_active_response",
+                                    },
+                                }
+                            )
+                        )
+                        continue
+                    replay = asyncio.create_task(self._replay(ws, suffix))
+                    response_id = self.response_id + suffix
+                    suffix = f"_{session}_{next(turns)}"
+                elif (
+                    event_type == "response.cancel"
+                    and replay is not None
+                    and not replay.done()
+                ):
+                    replay.cancel()
+                    await ws.send(
+                        json.dumps(
+                            {
+                                "type": "response.done",
+                                "response": {"id": response_id, "status": "cancelled"},
+                            }
+                        )
+                    )
+        finally:
+            if replay is not None:
+                replay.cancel()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--scenario", default="ask_order")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Replay faster than recorded"
+    )
+    args = parser.parse_args()
+
+    mock = MockRealtime(args.scenario, args.speed)
+    # Whole recordings are appended at once, over the default 1MiB limit
+    async with serve(mock.handler, args.host, args.port, max_size=None) as server:
+        print(f"mock realtime server on ws://{args.host}:{args.port}")
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,145 @@
 import asyncio
+import base64
+import itertools
 import json
 import os
 from collections import defaultdict
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from typing import Literal, cast, get_args
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from yampa.openai.processors import EventHandler
-from yampa.openai.runner import OpenAIRunner
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from yampa.metrics import REGISTRY, Gauge, child_processes, resident_memory_bytes
+from yampa.openai.connection import DEFAULT_URL
 from yampa.openai.events import (
-    AudioTranscriptDone,
-    AudioDelta,
-    OutputItemDone,
+    AudioDeltaView,
     AudioDone,
+    AudioTranscriptDone,
+    InputAudioBufferAppend,
     InputAudioTranscriptionCompleted,
+    RawEvent,
+    TurnDetection,
+)
+from yampa.openai.instrumentation import DispatchMetrics
+from yampa.openai.outbound import QueuePolicy
+from yampa.openai.processors import EventHandler
+from yampa.openai.runner import OpenAIRunner
+from yampa.openai.session_pool import SessionPool
+from yampa.openai.subscriptions import DEFAULT_SUBSCRIPTION, resolve_subscription
+from yampa.openai.tools import cacheable
+from yampa.utils import (
+    CHANNELS,
+    DEFAULT_AUDIO_BACKEND,
+    FRAME_RATE,
+    AudioAggregator,
+    AudioBackendName,
+    AudioFormat,
+    SilenceGate,
+    TranscoderError,
+    WorkerPool,
+    WorkerPoolKind,
+    get_audio_backend,
+    pack_audio_frame,
+)
+
+
+# Stock changes, so its results are only reused for a few seconds
+@cacheable(ttl=5.0)
+def get_product_remmaining_stock(product_id: int) -> int:
+    """Get product remaining stock given a product id."""
+    try:
+        return [1, 23, 244, 344, 123][product_id]
+    except IndexError:
+        return 0
+
+
+@cacheable(ttl=60.0)
+def list_all_products() -> list[int]:
+    """List all available products. Returns a list of int."""
+    return list(range(20))
+
+
+TOOLS: list[Callable] = [get_product_remmaining_stock, list_all_products]
+
+
+class AudioFormatMessage(BaseModel):
+    """Format of the audio a client sends from now on."""
+
+    type: Literal["audio.format"]
+    format: AudioFormat
+    sample_rate: int = Field(FRAME_RATE, ge=8000, le=96000)
+    channels: int = Field(CHANNELS, ge=1, le=2)
+
+
+def getenv_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    """Environment variable restricted to `choices`, typos fail at startup."""
+    value = os.getenv(name, default)
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, not {value!r}")
+    return value
+
+
+try:
+    OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
+except KeyError:
+    raise RuntimeError("the OPENAI_API_KEY env variable is not defined") from None
+
+# Eg. a local stand-in for load tests, see benchmarks/mock_realtime.py
+OPENAI_REALTIME_URL = os.getenv("OPENAI_REALTIME_URL", DEFAULT_URL)
+
+# How a session waits for a slow upstream connection, see OutboundQueue
+OUTBOUND_POLICY = cast(
+    QueuePolicy,
+    getenv_choice("YAMPA_OUTBOUND_POLICY", "block", get_args(QueuePolicy)),
+)
+
+# Resampling of the uploads not already at 24kHz mono
+AUDIO_BACKEND = get_audio_backend(
+    cast(
+        AudioBackendName,
+        getenv_choice(
+            "YAMPA_AUDIO_BACKEND", DEFAULT_AUDIO_BACKEND, get_args(AudioBackendName)
+        ),
+    )
+)
+
+SESSIONS = Gauge("yampa_sessions", "Browser sessions connected to this worker.")
+RESIDENT_MEMORY = Gauge(
+    "process_resident_memory_bytes", "Resident memory size of this worker."
+)
+CHILD_PROCESSES = Gauge(
+    "yampa_child_processes", "Child processes of this worker, eg. ffmpeg."
+)
+CHILD_MEMORY = Gauge(
+    "yampa_child_resident_memory_bytes",
+    "Resident memory size of the child processes of this worker.",
+)
+
+# Upstream sessions opened and configured ahead of the browser connections,
+# disabled with a size of 0
+session_pool = SessionPool(
+    api_key=OPENAI_API_KEY,
+    tools=TOOLS,
+    size=int(os.getenv("YAMPA_SESSION_POOL_SIZE", "0")),
+    max_idle=float(os.getenv("YAMPA_SESSION_POOL_MAX_IDLE", "300")),
+    url=OPENAI_REALTIME_URL,
 )
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if session_pool.size:
+        session_pool.start()
+    yield
+    await session_pool.close()
+    transcode_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost",
@@ -32,20 +156,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shared by every session of this worker so one long recording can't block
+# the event loop relaying the other sessions.
+transcode_pool = WorkerPool(
+    kind=cast(
+        WorkerPoolKind,
+        getenv_choice("YAMPA_TRANSCODE_POOL", "thread", get_args(WorkerPoolKind)),
+    ),
+    max_workers=int(os.getenv("YAMPA_TRANSCODE_WORKERS", "4")),
+)
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    def get_product_remmaining_stock(product_id: int) -> int:
-        """Get product remaining stock given a product id."""
-        try:
-            return [1, 23, 244, 344, 123][product_id]
-        except IndexError:
-            return 0
-
-    def list_all_products() -> list[int]:
-        """List all available products. Returns a list of int."""
-        return list(range(20))
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    RESIDENT_MEMORY.set(resident_memory_bytes())
+    children, children_memory = child_processes()
+    CHILD_PROCESSES.set(children)
+    CHILD_MEMORY.set(children_memory)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    audio_format: AudioFormat = "container",
+    sample_rate: int = 24000,
+    channels: int = 1,
+    audio_transport: Literal["json", "binary"] = "json",
+    uplink: Literal["blob", "stream"] = "blob",
+    audio_frame_ms: int = 0,
+    events: str | None = None,
+    audio_max_latency_ms: int = 100,
+    turn_detection: Literal["client", "server_vad"] = "client",
+    vad_threshold: float = 0.5,
+    vad_prefix_padding_ms: int = 300,
+    vad_silence_duration_ms: int = 500,
+    trim_silence: bool = False,
+    silence_threshold_db: float = -45.0,
+    silence_hangover_ms: int = 300,
+    silence_padding_ms: int = 200,
+):
     async def on_transcript_delta_done(audio_transcript: AudioTranscriptDone):
         await websocket.send_json(
             {
@@ -54,18 +204,43 @@ async def websocket_endpoint(websocket: WebSocket):
             }
         )
 
-    items = defaultdict(list)
+    async def on_event(event: RawEvent):
+        # Relay the upstream frame as is, without decoding it
+        await websocket.send_text('{"type":"event","data":' + event.text + "}")
 
-    async def on_event(event: str):
-        await websocket.send_json({"type": "event", "data": event})
+    sequences: defaultdict[str, itertools.count] = defaultdict(itertools.count)
+
+    async def send_audio_frame(item_id: str, pcm: bytes):
+        if audio_transport == "binary":
+            # Raw pcm16 in a binary frame, no base64 nor json on either side
+            frame = pack_audio_frame(item_id, next(sequences[item_id]), pcm)
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(
+                '{"type":"new.audio","data":"' + base64.b64encode(pcm).decode() + '"}'
+            )
 
-    async def on_audio_delta(audio_delta: AudioDelta):
-        items[audio_delta.item_id].append(audio_delta.delta)
-        await websocket.send_json({"type": "new.audio", "data": audio_delta.delta})
+    # Deltas regrouped in fewer, larger frames, off with audio_frame_ms=0
+    aggregator = AudioAggregator(send_audio_frame, audio_frame_ms, audio_max_latency_ms)
+
+    async def on_audio_delta(audio_delta: AudioDeltaView):
+        if openai_runner.interrupts.muted(audio_delta.item_id):
+            # The user spoke over it, the rest of the item is not played
+            return
+        if audio_transport == "json" and not audio_frame_ms:
+            # Relayed as received, without decoding nor encoding it again
+            await websocket.send_text(
+                '{"type":"new.audio","data":"' + audio_delta.delta + '"}'
+            )
+        else:
+            await aggregator.append(audio_delta.item_id, audio_delta.pcm())
 
     async def on_audio_done(audio_done: AudioDone):
-        item = items[audio_done.item_id]
-        #await websocket.send_json({"type": "new.audio", "data": item})
+        if openai_runner.interrupts.muted(audio_done.item_id):
+            aggregator.discard(audio_done.item_id)
+        else:
+            await aggregator.done(audio_done.item_id)
+        sequences.pop(audio_done.item_id, None)
 
     async def on_input_audio_transcription_completed(
         item: InputAudioTranscriptionCompleted,
@@ -74,62 +249,195 @@ async def websocket_endpoint(websocket: WebSocket):
             {"type": "new.client.transcript", "data": item.transcript}
         )
 
+    async def on_outbound_drop(event: InputAudioBufferAppend):
+        await websocket.send_json(
+            {
+                "type": "error",
+                "error": {
+                    "type": "outbound_queue_full",
+                    "message": "audio dropped, the upstream connection is too slow",
+                },
+            }
+        )
+
     openai_runner = OpenAIRunner(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        tools=[get_product_remmaining_stock, list_all_products],
+        api_key=OPENAI_API_KEY,
+        tools=TOOLS,
+        input_audio_format=audio_format,
+        input_sample_rate=sample_rate,
+        input_channels=channels,
+        worker_pool=transcode_pool,
+        audio_backend=AUDIO_BACKEND,
+        url=OPENAI_REALTIME_URL,
+        session_pool=session_pool if session_pool.size else None,
+        outbound_maxsize=int(os.getenv("YAMPA_OUTBOUND_QUEUE_SIZE", "64")),
+        outbound_policy=OUTBOUND_POLICY,
+        on_outbound_drop=on_outbound_drop,
+        # Streaming mode: upstream detects the end of the user turn
+        turn_detection=TurnDetection(
+            threshold=vad_threshold,
+            prefix_padding_ms=vad_prefix_padding_ms,
+            silence_duration_ms=vad_silence_duration_ms,
+        )
+        if turn_detection == "server_vad"
+        else None,
+        vad=SilenceGate(
+            threshold_db=silence_threshold_db,
+            # Upstream VAD must still hear the silence ending the turn
+            hangover_ms=max(silence_hangover_ms, vad_silence_duration_ms + 100)
+            if turn_detection == "server_vad"
+            else silence_hangover_ms,
+            padding_ms=silence_padding_ms,
+        )
+        if trim_silence
+        else None,
     )
 
-    async def on_output_item_done(output_item: OutputItemDone):
-        # TODO: make it dynamic
-        if output_item.item.name == "get_product_remmaining_stock":
-            if output_item.item.arguments is None:
-                raise ValueError("arguments can't be None")
-            params = json.loads(output_item.item.arguments)
-            result = get_product_remmaining_stock(**params)
-            send_json = json.dumps(
-                {
-                    "type": "conversation.item.create",
-                    "item": {
-                        "call_id": output_item.item.call_id,
-                        "type": "function_call_output",
-                        # "role": "system",
-                        "output": str(result),
-                    },
-                }
-            )
-            await openai_runner.ws.send(send_json)
-            await openai_runner.ws.send(json.dumps({"type": "response.create"}))
-        elif output_item.item.name == "list_all_products":
-            list_products_result = list_all_products()
-            send_json = json.dumps(
-                {
-                    "type": "conversation.item.create",
-                    "item": {
-                        "call_id": output_item.item.call_id,
-                        "type": "function_call_output",
-                        # "role": "system",
-                        "output": str(list_products_result),
-                    },
-                }
-            )
-            await openai_runner.ws.send(send_json)
-            await openai_runner.ws.send(json.dumps({"type": "response.create"}))
-
     event_handler = EventHandler(
         on_transcript_delta_done=on_transcript_delta_done,
-        on_output_item_done=on_output_item_done,
-        on_audio_delta=on_audio_delta,
         on_audio_done=on_audio_done,
         on_input_audio_transcription_completed=on_input_audio_transcription_completed,
-        on_event=on_event,
     )
+    # Audio deltas and the relayed events are read from the upstream frames
+    # without decoding them
+    event_handler.register("response.audio.delta", on_audio_delta, AudioDeltaView)
+
+    def subscribe(patterns: list[str]):
+        # Events left out are never wrapped nor serialized for the client
+        event_handler.unregister(on_event)
+        for pattern in patterns:
+            event_handler.register(pattern, on_event, RawEvent)
+
+    try:
+        subscribe(
+            resolve_subscription(
+                DEFAULT_SUBSCRIPTION if events is None else events.split(",")
+            )
+        )
+    except ValueError as exc:
+        await websocket.close(code=1008, reason=str(exc))
+        return
+    if uplink == "stream" and not OpenAIRunner.can_stream(
+        audio_format, sample_rate, channels
+    ):
+        await websocket.close(code=1008, reason="streamed pcm16 must be 24kHz mono")
+        return
+    if os.getenv("YAMPA_DISPATCH_METRICS"):
+        # Per session, it caches the metrics of this session callbacks
+        event_handler.add_hook(
+            DispatchMetrics(
+                slow_threshold=float(os.getenv("YAMPA_SLOW_CALLBACK_SECONDS", "0.1"))
+            )
+        )
     # TODO: add a setter
     openai_runner.event_handler = event_handler
     await websocket.accept()
 
+    async def on_client_message(message: dict):
+        if message["type"] == "audio.format":
+            try:
+                audio_format_message = AudioFormatMessage.model_validate(message)
+            except ValidationError as exc:
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "error": {"type": "invalid_audio_format", "message": str(exc)},
+                    }
+                )
+                return
+            if uplink == "stream" and not OpenAIRunner.can_stream(
+                audio_format_message.format,
+                audio_format_message.sample_rate,
+                audio_format_message.channels,
+            ):
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "error": {
+                            "type": "invalid_audio_format",
+                            "message": "streamed pcm16 must be 24kHz mono",
+                        },
+                    }
+                )
+                return
+            # Clients able to capture pcm16 can skip the decoding
+            openai_runner.input_audio_format = audio_format_message.format
+            openai_runner.input_sample_rate = audio_format_message.sample_rate
+            openai_runner.input_channels = audio_format_message.channels
+        elif message["type"] == "interrupt":
+            # The browser already stopped playing, report what was heard
+            played_ms = message.get("played_ms")
+            item_id = message.get("item_id")
+            await openai_runner.interrupt(played_ms, item_id)
+            if item_id is not None:
+                aggregator.discard(item_id)
+        elif message["type"] == "subscribe":
+            try:
+                subscribe(resolve_subscription(message["events"]))
+            except ValueError as exc:
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "error": {"type": "invalid_subscription", "message": str(exc)},
+                    }
+                )
+        elif message["type"] == "input_audio.commit":
+            # End of a streamed recording, the turn is timed from here
+            openai_runner.turns.start()
+            try:
+                await openai_runner.commit_audio()
+            except TranscoderError as exc:
+                await send_invalid_audio(exc)
+            await send_vad_stats()
+
+    async def send_invalid_audio(exc: TranscoderError):
+        await websocket.send_json(
+            {"type": "error", "error": {"type": "invalid_audio", "message": str(exc)}}
+        )
+
+    async def send_vad_stats():
+        if openai_runner.vad is not None:
+            await websocket.send_json(
+                {"type": "vad.stats", "data": openai_runner.vad.stats.as_dict()}
+            )
+
     async def client_websocket():
         while True:
             data = await websocket.receive()
-            await openai_runner.send_audio(data["bytes"])
+            if data["type"] == "websocket.disconnect":
+                return
+            if data.get("text") is not None:
+                await on_client_message(json.loads(data["text"]))
+            elif data.get("bytes") is not None:
+                if uplink == "blob":
+                    openai_runner.turns.start()
+                if openai_runner.turn_detection is None and not openai_runner.streaming:
+                    # New user audio interrupts the assistant, with server VAD
+                    # upstream detects the user speaking instead
+                    await openai_runner.interrupt()
+                try:
+                    if uplink == "stream":
+                        await openai_runner.stream_audio(data["bytes"])
+                    else:
+                        await openai_runner.send_audio(data["bytes"])
+                        await send_vad_stats()
+                except TranscoderError as exc:
+                    await send_invalid_audio(exc)
 
-    await asyncio.gather(openai_runner.run(), client_websocket())
+    SESSIONS.inc()
+    # The session ends with either side, the other one is cancelled so the
+    # upstream socket, ffmpeg and the tool calls are released
+    tasks = [
+        asyncio.create_task(openai_runner.run()),
+        asyncio.create_task(client_websocket()),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        SESSIONS.dec()
+        aggregator.close()
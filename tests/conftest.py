@@ -1,7 +1,14 @@
+import io
+import json
+import math
+import struct
+import wave
 from pathlib import Path
-import pytest
 from typing import Any
-import json
+
+import pytest
+
+import benchmarks.common
 
 
 @pytest.fixture
@@ -13,6 +20,11 @@ def get_json():
     return _get_json
 
 
+@pytest.fixture
+def load_scenario():
+    return benchmarks.common.load_scenario
+
+
 @pytest.fixture
 def get_audio():
     def _get_audio(path: Path | str) -> bytes:
@@ -20,3 +32,23 @@ def get_audio():
             return f.read()
 
     return _get_audio
+
+
+@pytest.fixture
+def make_wav():
+    def _make_wav(seconds: float, frame_rate: int = 48000, channels: int = 2) -> bytes:
+        samples = [
+            int(8000 * math.sin(2 * math.pi * 440 * i / frame_rate))
+            for i in range(int(seconds * frame_rate))
+        ]
+        out = io.BytesIO()
+        with wave.open(out, "wb") as f:
+            f.setnchannels(channels)
+            f.setsampwidth(2)
+            f.setframerate(frame_rate)
+            f.writeframes(
+                b"".join(struct.pack("<h", s) * channels for s in samples),
+            )
+        return out.getvalue()
+
+    return _make_wav
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from yampa.utils import AudioAggregator
+
+# 20ms of pcm16 at 24kHz
+DELTA = bytes(960)
+
+
+class Sink:
+    def __init__(self):
+        self.frames: list[tuple[str, int]] = []
+
+    async def send(self, item_id: str, pcm: bytes):
+        self.frames.append((item_id, len(pcm)))
+
+
+@pytest.mark.asyncio
+async def test_aggregator_sends_frames_of_at_least_frame_ms():
+    sink = Sink()
+    aggregator = AudioAggregator(sink.send, frame_ms=80, max_latency_ms=None)
+    for _ in range(10):
+        await aggregator.append("item_1", DELTA)
+    assert sink.frames == [("item_1", 3840), ("item_1", 3840)]
+
+    # A large delta is not split
+    await aggregator.append("item_1", bytes(12000))
+    assert sink.frames[-1] == ("item_1", 1920 + 12000)
+
+    await aggregator.append("item_1", DELTA)
+    await aggregator.done("item_1")
+    assert sink.frames[-1] == ("item_1", 960)
+    # Nothing left to send
+    await aggregator.done("item_1")
+    assert len(sink.frames) == 4
+
+
+@pytest.mark.asyncio
+async def test_aggregator_bounds_latency():
+    sink = Sink()
+    aggregator = AudioAggregator(sink.send, frame_ms=80, max_latency_ms=20)
+    await aggregator.append("item_1", DELTA)
+    assert sink.frames == []
+
+    await asyncio.sleep(0.05)
+    assert sink.frames == [("item_1", 960)]
+    aggregator.close()
+
+
+@pytest.mark.asyncio
+async def test_aggregator_discards_interrupted_items():
+    sink = Sink()
+    aggregator = AudioAggregator(sink.send, frame_ms=80, max_latency_ms=20)
+    await aggregator.append("item_1", DELTA)
+    aggregator.discard("item_1")
+    await asyncio.sleep(0.05)
+    await aggregator.done("item_1")
+    assert sink.frames == []
+
+
+@pytest.mark.asyncio
+async def test_aggregator_disabled_sends_each_delta():
+    sink = Sink()
+    aggregator = AudioAggregator(sink.send, frame_ms=0)
+    await aggregator.append("item_1", DELTA)
+    await aggregator.append("item_1", DELTA)
+    assert sink.frames == [("item_1", 960)] * 2
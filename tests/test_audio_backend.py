@@ -0,0 +1,81 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from yampa.utils import NumpyBackend, PydubBackend, get_audio_backend
+
+# Minimum signal to noise ratio between the numpy and pydub outputs
+SNR_TOLERANCE_DB = 35
+
+
+def sine(frame_rate: int, channels: int, dtype: str = "<i2", amplitude=8000.0):
+    t = np.arange(frame_rate) / frame_rate
+    samples = (amplitude * np.sin(2 * np.pi * 440 * t)).astype(dtype)
+    return np.repeat(samples, channels).tobytes()
+
+
+def snr(reference: bytes, audio: bytes) -> float:
+    reference_samples = np.frombuffer(reference, "<i2").astype(np.float64)
+    samples = np.frombuffer(audio, "<i2").astype(np.float64)
+    size = min(reference_samples.size, samples.size)
+    # Ignore the filters warm up on both ends
+    reference_samples = reference_samples[200 : size - 200]
+    samples = samples[200 : size - 200]
+    noise = np.sum((reference_samples - samples) ** 2)
+    return 10 * np.log10(np.sum(reference_samples**2) / noise)
+
+
+@pytest.mark.parametrize(
+    "frame_rate,channels",
+    [(48000, 2), (44100, 1), (44100, 2), (22050, 1), (16000, 1)],
+)
+def test_numpy_backend_matches_pydub(frame_rate, channels):
+    audio = sine(frame_rate, channels)
+    expected = PydubBackend().to_pcm16(audio, frame_rate, channels, 2)
+    result = NumpyBackend().to_pcm16(audio, frame_rate, channels, 2)
+
+    assert abs(len(result) - len(expected)) <= 8
+    assert snr(expected, result) >= SNR_TOLERANCE_DB
+
+
+def test_numpy_backend_sample_width():
+    audio = sine(44100, 2, dtype="<i4", amplitude=2**29)
+    expected = PydubBackend().to_pcm16(audio, 44100, 2, 4)
+    result = NumpyBackend().to_pcm16(audio, 44100, 2, 4)
+
+    assert snr(expected, result) >= SNR_TOLERANCE_DB
+
+
+def test_numpy_backend_24_bit():
+    samples = np.frombuffer(sine(48000, 1, dtype="<i4", amplitude=2**21), "<i4")
+    # Low 3 bytes of each little endian int32
+    audio = samples.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    expected = PydubBackend().to_pcm16(audio, 48000, 1, 3)
+    result = NumpyBackend().to_pcm16(audio, 48000, 1, 3)
+
+    assert snr(expected, result) >= SNR_TOLERANCE_DB
+
+
+def test_numpy_backend_rejects_unknown_sample_width():
+    with pytest.raises(ValueError):
+        NumpyBackend().to_pcm16(bytes(10), 48000, 1, 5)
+
+
+def test_numpy_backend_passthrough():
+    audio = sine(24000, 1)
+    assert NumpyBackend().to_pcm16(audio, 24000, 1, 2) is audio
+
+
+def test_get_audio_backend():
+    assert isinstance(get_audio_backend(), NumpyBackend)
+    assert isinstance(get_audio_backend("numpy"), NumpyBackend)
+    assert isinstance(get_audio_backend("pydub"), PydubBackend)
+
+
+def test_server_audio_backend(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.delenv("YAMPA_AUDIO_BACKEND", raising=False)
+    server = importlib.import_module("server")
+
+    assert isinstance(server.AUDIO_BACKEND, NumpyBackend)
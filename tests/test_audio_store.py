@@ -0,0 +1,77 @@
+import base64
+
+from yampa.utils import AudioStore
+
+# 100ms of 24kHz pcm16
+CHUNK = bytes(range(256)) * 18 + bytes(192)
+
+
+def test_append_slice_and_free_on_done():
+    store = AudioStore(keep_done=False)
+    store.append_base64("item_1", base64.b64encode(CHUNK))
+    store.append("item_1", CHUNK)
+
+    assert store.duration_ms("item_1") == 200
+    assert store.slice_ms("item_1", 100) == CHUNK
+    assert store.slice_ms("item_1", 50, 100) == CHUNK[2400:]
+
+    store.done("item_1")
+    assert "item_1" not in store
+    assert store.nbytes == 0
+
+
+def test_budget_evicts_least_recently_used():
+    store = AudioStore(max_bytes=3 * len(CHUNK))
+    for item_id in ("item_1", "item_2", "item_3"):
+        store.append(item_id, CHUNK)
+    # Reading item_1 makes item_2 the least recently used
+    store.get("item_1")
+    store.append("item_4", CHUNK)
+
+    assert "item_2" not in store
+    assert all(item_id in store for item_id in ("item_1", "item_3", "item_4"))
+    assert store.nbytes == 3 * len(CHUNK)
+
+
+def test_active_item_is_never_evicted():
+    store = AudioStore(max_bytes=len(CHUNK))
+    for _ in range(5):
+        store.append("item_1", CHUNK)
+    assert store.duration_ms("item_1") == 500
+
+
+def test_spill_keeps_evicted_items_readable(tmp_path):
+    store = AudioStore(max_bytes=len(CHUNK), spill_dir=str(tmp_path))
+    store.append("item_1", CHUNK)
+    store.append("item_2", CHUNK)
+
+    assert store.nbytes == len(CHUNK)
+    assert store.get("item_1") == CHUNK
+    assert store.slice_ms("item_1", 50) == CHUNK[2400:]
+    store.truncate("item_1", 50)
+    assert store.duration_ms("item_1") == 50
+    store.clear()
+    assert len(store) == 0
+    assert store.spilled_bytes == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_budget_deletes_least_recently_used_files(tmp_path):
+    store = AudioStore(
+        max_bytes=len(CHUNK), spill_dir=str(tmp_path), max_spill_bytes=2 * len(CHUNK)
+    )
+    for item_id in ("item_1", "item_2", "item_3", "item_4"):
+        store.append(item_id, CHUNK)
+
+    assert "item_1" not in store
+    assert all(item_id in store for item_id in ("item_2", "item_3", "item_4"))
+    assert store.spilled_bytes == 2 * len(CHUNK)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_truncate():
+    store = AudioStore()
+    store.append("item_1", CHUNK)
+    store.truncate("item_1", 25)
+    assert store.get("item_1") == CHUNK[:1200]
+    assert store.nbytes == 1200
@@ -0,0 +1,89 @@
+import base64
+import json
+
+import pytest
+
+from yampa.openai.conversation import ConversationStore
+from yampa.openai.processors import EventHandler, FakeOpenAI
+
+
+def created(item_id: str, previous_item_id: str | None, **item) -> dict:
+    return {
+        "type": "conversation.item.created",
+        "previous_item_id": previous_item_id,
+        "item": {"id": item_id, "type": "message", "role": "assistant", **item},
+    }
+
+
+@pytest.mark.asyncio
+async def test_replays_scenario(load_scenario):
+    store = ConversationStore()
+    event_handler = EventHandler()
+    store.attach(event_handler)
+    await FakeOpenAI(load_scenario("ask_order"), event_handler).run()
+
+    user, assistant = store
+    assert (user.role, assistant.role) == ("user", "assistant")
+    assert assistant.status == "completed"
+    assert assistant.transcript.text.startswith("I can help with that.")
+    assert assistant.audio_ms > 1000
+    response = next(iter(store.responses.values()))
+    assert response.status == "completed"
+    assert response.output == [assistant.id]
+
+
+@pytest.mark.asyncio
+async def test_order_delete_and_truncate():
+    store = ConversationStore()
+    event_handler = EventHandler()
+    store.attach(event_handler)
+    for event in (
+        created("a", None),
+        created("c", "a"),
+        created("b", "a"),
+        created("first", None),
+    ):
+        await event_handler.handle_event(event)
+    assert [item.id for item in store] == ["first", "a", "b", "c"]
+
+    await event_handler.handle_event(
+        {"type": "conversation.item.deleted", "item_id": "b"}
+    )
+    await event_handler.handle_event(
+        {"type": "conversation.item.deleted", "item_id": "c"}
+    )
+    assert [item.id for item in store] == ["first", "a"]
+    await event_handler.handle_event(created("d", "a"))
+    assert [item.id for item in store] == ["first", "a", "d"]
+
+    pcm = bytes(4800)  # 100ms
+    await event_handler.handle_message(
+        json.dumps(
+            {
+                "type": "response.audio.delta",
+                "item_id": "a",
+                "delta": base64.b64encode(pcm).decode(),
+            }
+        )
+    )
+    for delta in ("Hello", " there"):
+        await event_handler.handle_event(
+            {"type": "response.audio_transcript.delta", "item_id": "a", "delta": delta}
+        )
+    assert store.get("a").transcript.text == "Hello there"
+    await event_handler.handle_event(
+        {"type": "conversation.item.truncated", "item_id": "a", "audio_end_ms": 40}
+    )
+    assert store.get("a").audio_ms == 40
+    assert store.get("a").transcript.text == ""
+
+
+@pytest.mark.asyncio
+async def test_transcription_before_item_is_queued():
+    store = ConversationStore()
+    await store.on_input_audio_transcription_completed(
+        {"item_id": "user", "transcript": "stock of product 2"}
+    )
+    await store.on_item_created(created("user", None, role="user"))
+    assert store.get("user").transcript.text == "stock of product 2"
+    assert store.get("user").status == "completed"
@@ -1,10 +1,13 @@
+import json
 from typing import Literal
 
 from yampa.openai.events import (
+    TurnDetection,
     conversation_item_created_event_handler,
-    session_created_handler,
-    make_session_update_event,
     make_conversation_item_create_event,
+    make_session_update_event,
+    session_created_handler,
+    session_update_payload,
 )
 
 
@@ -46,6 +49,40 @@ def test_make_session_update_event():
     }
 
 
+def test_session_update_payload_is_cached():
+    def get_stock(product_id: int) -> int:
+        """Get stock."""
+        return 0
+
+    payload = session_update_payload([get_stock])
+    assert (
+        payload
+        == make_session_update_event(tools=[get_stock])
+        .model_dump_json(exclude_unset=True)
+        .encode()
+    )
+    assert session_update_payload([get_stock]) is payload
+
+    get_stock.__doc__ = "Get the remaining stock."
+    updated = session_update_payload([get_stock])
+    assert updated is not payload
+    assert b"Get the remaining stock." in updated
+
+
+def test_session_update_payload_turn_detection():
+    turn_detection = TurnDetection(
+        threshold=0.6, prefix_padding_ms=200, silence_duration_ms=400
+    )
+    payload = json.loads(session_update_payload([], turn_detection))
+    assert payload["session"]["turn_detection"] == {
+        "type": "server_vad",
+        "threshold": 0.6,
+        "prefix_padding_ms": 200,
+        "silence_duration_ms": 400,
+    }
+    assert json.loads(session_update_payload([]))["session"]["turn_detection"] is None
+
+
 # TODO: make custom assert to avoid long diff with audio bytes
 def test_make_conversation_item_create_event(get_audio, get_json):
     response = get_json("conversation_item_create.json")
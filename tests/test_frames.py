@@ -0,0 +1,10 @@
+from yampa.utils import pack_audio_frame, unpack_audio_frame
+
+
+def test_audio_frame_roundtrip():
+    frame = pack_audio_frame("item_AIK0wRecrZqZlLV2oUVja", 3, b"\x01\x00\xff\xff")
+
+    item_id, sequence, pcm_audio = unpack_audio_frame(frame)
+    assert item_id == "item_AIK0wRecrZqZlLV2oUVja"
+    assert sequence == 3
+    assert pcm_audio == b"\x01\x00\xff\xff"
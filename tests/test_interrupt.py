@@ -0,0 +1,132 @@
+import base64
+import json
+
+import pytest
+
+from yampa.openai.interrupt import InterruptController
+from yampa.openai.processors import EventHandler
+
+# 100ms of audio
+DELTA = base64.b64encode(bytes(4800)).decode()
+
+
+def audio_delta(item_id: str) -> str:
+    return json.dumps(
+        {"type": "response.audio.delta", "item_id": item_id, "delta": DELTA}
+    )
+
+
+async def start_response(event_handler: EventHandler, deltas: int):
+    await event_handler.handle_event(
+        {"type": "response.created", "response": {"id": "resp_1"}}
+    )
+    for _ in range(deltas):
+        await event_handler.handle_message(audio_delta("item_1"))
+
+
+@pytest.mark.asyncio
+async def test_interrupt_cancels_truncates_and_mutes():
+    sent = []
+
+    async def send(message: str):
+        sent.append(json.loads(message))
+
+    controller = InterruptController(send)
+    event_handler = EventHandler()
+    controller.attach(event_handler)
+    await start_response(event_handler, deltas=5)
+
+    assert await controller.interrupt(played_ms=230, item_id="item_1")
+    assert sent == [
+        {"type": "response.cancel"},
+        {
+            "type": "conversation.item.truncate",
+            "item_id": "item_1",
+            "content_index": 0,
+            "audio_end_ms": 230,
+        },
+    ]
+    assert controller.muted("item_1")
+
+    # Deltas still in flight are not counted as received
+    await event_handler.handle_message(audio_delta("item_1"))
+    assert controller.received_ms == 500
+    await event_handler.handle_event({"type": "response.done", "response": {}})
+    await event_handler.handle_event(
+        {"type": "response.audio.done", "item_id": "item_1"}
+    )
+    assert not controller.muted("item_1")
+
+
+@pytest.mark.asyncio
+async def test_response_is_cancelled_once():
+    sent = []
+
+    async def send(message: str):
+        sent.append(json.loads(message))
+
+    controller = InterruptController(send)
+    event_handler = EventHandler()
+    controller.attach(event_handler)
+    await start_response(event_handler, deltas=5)
+
+    # The browser interrupt, then the first chunk of the next recording
+    assert await controller.interrupt(played_ms=230, item_id="item_1")
+    assert not await controller.interrupt()
+    assert [event["type"] for event in sent] == [
+        "response.cancel",
+        "conversation.item.truncate",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_played_ms_is_estimated_and_capped():
+    sent = []
+
+    async def send(message: str):
+        sent.append(json.loads(message))
+
+    controller = InterruptController(send)
+    event_handler = EventHandler()
+    controller.attach(event_handler)
+    await start_response(event_handler, deltas=2)
+    await event_handler.handle_event({"type": "response.done", "response": {}})
+
+    # Everything received was played: nothing to cancel nor truncate
+    assert not await controller.interrupt(played_ms=1000)
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_done_audio_is_not_interrupted_again():
+    sent = []
+
+    async def send(message: str):
+        sent.append(json.loads(message))
+
+    controller = InterruptController(send)
+    event_handler = EventHandler()
+    controller.attach(event_handler)
+    await start_response(event_handler, deltas=50)
+    await event_handler.handle_event(
+        {"type": "response.audio.done", "item_id": "item_1"}
+    )
+    await event_handler.handle_event({"type": "response.done", "response": {}})
+
+    # The next recording, the assistant is done and nothing is muted
+    assert not await controller.interrupt()
+    assert sent == []
+
+    # Still playing in the browser, truncated at what it reported
+    assert await controller.interrupt(played_ms=1200, item_id="item_1")
+    assert [event["type"] for event in sent] == ["conversation.item.truncate"]
+    assert not controller.muted_items
+
+
+@pytest.mark.asyncio
+async def test_nothing_to_interrupt():
+    async def send(message: str):
+        raise AssertionError("nothing should be sent")
+
+    controller = InterruptController(send)
+    assert not await controller.interrupt()
@@ -0,0 +1,40 @@
+import pytest
+
+from yampa.openai.latency import TURN_STAGE, TurnTimer
+from yampa.openai.processors import EventHandler
+
+AUDIO_DELTA = {
+    "type": "response.audio.delta",
+    "item_id": "item_1",
+    "delta": "AAA=",
+}
+AUDIO_DONE = {"type": "response.audio.done", "item_id": "item_1"}
+
+
+def counts() -> dict[str, int]:
+    return {
+        stage: TURN_STAGE.labels(stage).count
+        for stage in ("transcoded", "first_audio", "audio_done")
+    }
+
+
+@pytest.mark.asyncio
+async def test_turn_timer_observes_each_stage_once_per_turn():
+    event_handler = EventHandler()
+    turns = TurnTimer()
+    turns.attach(event_handler)
+    before = counts()
+
+    # Nothing is observed before a turn starts
+    await event_handler.handle_event(AUDIO_DELTA)
+    turns.mark("transcoded")
+    assert counts() == before
+
+    for _ in range(2):
+        turns.start()
+        turns.mark("transcoded")
+        turns.mark("transcoded")
+        for event in (AUDIO_DELTA, AUDIO_DELTA, AUDIO_DONE):
+            await event_handler.handle_event(event)
+
+    assert counts() == {stage: count + 2 for stage, count in before.items()}
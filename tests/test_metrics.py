@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+from yampa.metrics import Counter, Gauge, Histogram, Registry, child_processes
+
+
+def test_render():
+    registry = Registry()
+    counter = Counter("requests_total", "Requests.", ("path",), registry=registry)
+    gauge = Gauge("sessions", "Open sessions.", registry=registry)
+    histogram = Histogram(
+        "latency_seconds", "Latency.", registry=registry, buckets=(0.1, 1.0)
+    )
+    counter.labels("/ws").inc()
+    counter.labels("/ws").inc(2)
+    gauge.inc()
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(3)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{path="/ws"} 3',
+        "# HELP sessions Open sessions.",
+        "# TYPE sessions gauge",
+        "sessions 1",
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 3.15",
+        "latency_seconds_count 3",
+    ]
+
+
+def test_child_processes():
+    if not sys.platform.startswith("linux"):
+        assert child_processes() == (0, 0)
+        return
+    children, memory = child_processes()
+    with subprocess.Popen([sys.executable, "-c", "input()"], stdin=subprocess.PIPE):
+        count, child_memory = child_processes()
+        assert count == children + 1
+        assert child_memory > memory
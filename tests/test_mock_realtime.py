@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import serve
+from websockets.protocol import State
+
+from benchmarks.mock_realtime import MockRealtime
+from yampa.openai.connection import UPSTREAM_CONNECTIONS
+from yampa.openai.processors import EventHandler
+from yampa.openai.runner import OpenAIRunner
+
+
+@pytest_asyncio.fixture
+async def mock_url():
+    mock = MockRealtime(speed=100.0)
+    async with serve(mock.handler, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_runner_turns_against_mock(mock_url):
+    received = []
+    done = asyncio.Event()
+
+    async def on_event(event: dict):
+        received.append(event)
+        if event["type"] == "response.done":
+            done.set()
+
+    runner = OpenAIRunner(
+        api_key="",
+        event_handler=EventHandler(on_event=on_event),
+        input_audio_format="pcm16",
+        url=mock_url,
+    )
+    run = asyncio.create_task(runner.run())
+    try:
+        for _ in range(2):
+            done.clear()
+            await runner.send_audio(bytes(4800))
+            await asyncio.wait_for(done.wait(), 2.0)
+    finally:
+        run.cancel()
+
+    types = [event["type"] for event in received]
+    assert types[:2] == ["session.created", "session.updated"]
+    assert types.count("response.audio.delta") == 2 * 21
+    # Each turn gets its own ids
+    items = [
+        event["item"]["id"]
+        for event in received
+        if event["type"] == "conversation.item.created"
+    ]
+    assert len(items) == len(set(items)) == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_runner_closes_upstream(mock_url):
+    connected = asyncio.Event()
+
+    async def on_session_updated(event: dict):
+        connected.set()
+
+    event_handler = EventHandler()
+    event_handler.register("session.updated", on_session_updated)
+    runner = OpenAIRunner(api_key="", event_handler=event_handler, url=mock_url)
+    upstream = UPSTREAM_CONNECTIONS.labels()
+    open_connections = upstream.value
+    run = asyncio.create_task(runner.run())
+    await asyncio.wait_for(connected.wait(), 2.0)
+    assert upstream.value == open_connections + 1
+    ws = runner.ws
+    tasks = asyncio.all_tasks()
+
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    assert runner._ws is None
+    assert ws.state is State.CLOSED
+    # Neither the reading nor the sending task outlives the runner
+    await asyncio.sleep(0)
+    assert all(task.done() for task in tasks - {asyncio.current_task(), run})
+    assert upstream.value == open_connections
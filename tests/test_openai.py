@@ -1,30 +1,19 @@
-import os
-import json
+import asyncio
+
 import pytest
-from pathlib import Path
 
 from yampa.openai.events import (
-    ConversationItemCreate,
-    AudioTranscriptDelta,
-    AudioTranscriptDone,
     AudioDelta,
     AudioDone,
+    AudioTranscriptDelta,
+    AudioTranscriptDone,
+    ConversationItemCreate,
 )
-from yampa.openai.processors import FakeOpenAI, EventHandler
-
-
-def load_scenario(scenario_name: str) -> list[str]:
-    steps = []
-    scneario_dir = Path(__file__).resolve().parent / Path(f"scenarios/{scenario_name}")
-    files = os.listdir(scneario_dir)
-    for f in sorted(files, key=lambda f: f):
-        with open(scneario_dir / f) as file:
-            steps.append(json.load(file))
-    return steps
+from yampa.openai.processors import EventHandler, FakeOpenAI
 
 
 @pytest.mark.asyncio
-async def test_opanai_on_item_create():
+async def test_opanai_on_item_create(load_scenario):
     scenario = load_scenario("ask_order")
     received_items = []
 
@@ -44,7 +33,7 @@ async def test_opanai_on_item_create():
 
 
 @pytest.mark.asyncio
-async def test_opanai_on_transcript_delta():
+async def test_opanai_on_transcript_delta(load_scenario):
     scenario = load_scenario("ask_order")
     received_items = []
 
@@ -83,7 +72,7 @@ async def test_opanai_on_transcript_delta():
 
 
 @pytest.mark.asyncio
-async def test_opanai_on_transcript_done():
+async def test_opanai_on_transcript_done(load_scenario):
     scenario = load_scenario("ask_order")
     received_items = []
 
@@ -106,7 +95,7 @@ async def test_opanai_on_transcript_done():
 
 
 @pytest.mark.asyncio
-async def test_opanai_on_audio_delta():
+async def test_opanai_on_audio_delta(load_scenario):
     scenario = load_scenario("ask_order")
     received_items = []
 
@@ -133,7 +122,7 @@ async def test_opanai_on_audio_delta():
 
 
 @pytest.mark.asyncio
-async def test_opanai_on_audio_done():
+async def test_opanai_on_audio_done(load_scenario):
     scenario = load_scenario("ask_order")
     received_items = []
 
@@ -149,3 +138,32 @@ async def test_opanai_on_audio_done():
     assert received_items == [
         ("item_AIK0wRecrZqZlLV2oUVja",),
     ]
+
+
+@pytest.mark.asyncio
+async def test_openai_replay_keeps_timing():
+    events = [{"type": "response.done"}, {"type": "response.created"}] * 2
+    timestamps = [0.0, 0.1, 0.3, 0.4]
+    received_at = []
+    loop = asyncio.get_running_loop()
+
+    async def on_event(event: dict):
+        received_at.append(loop.time())
+
+    openai = FakeOpenAI(
+        events=events,
+        event_handler=EventHandler(on_event=on_event),
+        timestamps=timestamps,
+        speed=4.0,
+    )
+    start = loop.time()
+    await openai.run()
+
+    offsets = [at - start for at in received_at]
+    # The gaps are divided by the speed
+    assert offsets == pytest.approx([0.0, 0.025, 0.075, 0.1], abs=0.015)
+
+
+def test_openai_replay_needs_one_timestamp_per_event():
+    with pytest.raises(ValueError):
+        FakeOpenAI(events=[{}], event_handler=EventHandler(), timestamps=[])
@@ -0,0 +1,70 @@
+import asyncio
+import base64
+
+import pytest
+
+from yampa.openai.events import InputAudioBufferAppend, InputAudioBufferCommit
+from yampa.openai.outbound import QUEUE_DEPTH, OutboundQueue
+
+
+def append(pcm: bytes) -> InputAudioBufferAppend:
+    return InputAudioBufferAppend(audio=base64.b64encode(pcm).decode())
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_room():
+    queue = OutboundQueue(maxsize=1, policy="block")
+    await queue.put(append(b"a"))
+    producer = asyncio.create_task(queue.put(append(b"b")))
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+
+    assert base64.b64decode((await queue.get()).audio) == b"a"
+    await producer
+    assert base64.b64decode((await queue.get()).audio) == b"b"
+    assert queue.qsize() == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesce_merges_consecutive_appends():
+    queue = OutboundQueue(maxsize=2, policy="coalesce")
+    await queue.put(append(b"abc"))
+    await queue.put(append(b"de"))
+    # Full: appends are merged into the last one
+    await queue.put(append(b"f"))
+    await queue.put(append(b"gh"))
+    assert queue.qsize() == 2
+
+    assert base64.b64decode(queue.get_nowait().audio) == b"abc"
+    assert base64.b64decode(queue.get_nowait().audio) == b"defgh"
+
+
+@pytest.mark.asyncio
+async def test_coalesce_does_not_cross_a_commit():
+    queue = OutboundQueue(maxsize=2, policy="coalesce")
+    await queue.put(append(b"a"))
+    await queue.put(InputAudioBufferCommit())
+    producer = asyncio.create_task(queue.put(append(b"b")))
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+    queue.get_nowait()
+    await producer
+    assert isinstance(queue.get_nowait(), InputAudioBufferCommit)
+
+
+@pytest.mark.asyncio
+async def test_drop_reports_dropped_appends():
+    dropped = []
+
+    async def on_drop(event):
+        dropped.append(event)
+
+    queue = OutboundQueue(maxsize=1, policy="drop", on_drop=on_drop)
+    depth = QUEUE_DEPTH.labels().value
+    assert await queue.put(append(b"a"))
+    assert not await queue.put(append(b"b"))
+    assert len(dropped) == 1
+    assert base64.b64decode(dropped[0].audio) == b"b"
+    assert QUEUE_DEPTH.labels().value == depth + 1
+    queue.clear()
+    assert QUEUE_DEPTH.labels().value == depth
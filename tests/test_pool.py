@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from yampa.utils import WorkerPool
+from yampa.utils.pool import WAIT_SECONDS
+
+
+def slow_identity(value: int) -> int:
+    time.sleep(0.05)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_off_the_event_loop():
+    pool = WorkerPool(max_workers=1, name="test_off_loop")
+    try:
+        assert await pool.run(threading.get_ident) != threading.get_ident()
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_is_bounded():
+    pool = WorkerPool(max_workers=2, name="test_bounded")
+    try:
+        tasks = [asyncio.create_task(pool.run(slow_identity, i)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        assert pool.queue_depth == 4
+
+        assert await asyncio.gather(*tasks) == list(range(6))
+        assert pool.queue_depth == 0
+        assert WAIT_SECONDS.labels("test_bounded").count == 6
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_process():
+    pool = WorkerPool(kind="process", max_workers=1, name="test_process")
+    try:
+        assert await pool.run(slow_identity, 3) == 3
+    finally:
+        pool.shutdown()
@@ -0,0 +1,262 @@
+import asyncio
+import json
+
+import pytest
+
+from yampa.openai.events import (
+    SERVER_EVENT,
+    AudioDelta,
+    AudioDeltaView,
+    AudioDone,
+    Error,
+    FunctionCallArgumentsDelta,
+    RawEvent,
+    parse_server_event,
+    peek_event_type,
+)
+from yampa.openai.instrumentation import (
+    CALLBACK_DURATION,
+    SLOW_CALLBACKS,
+    DispatchMetrics,
+)
+from yampa.openai.processors import EventHandler
+
+AUDIO_DELTA = {
+    "type": "response.audio.delta",
+    "item_id": "item_AIK0wRecrZqZlLV2oUVja",
+    "delta": "AAA=",
+}
+AUDIO_DONE = {"type": "response.audio.done", "item_id": "item_AIK0wRecrZqZlLV2oUVja"}
+
+
+@pytest.mark.asyncio
+async def test_register_several_subscribers():
+    received = []
+    event_handler = EventHandler()
+
+    @event_handler.on("response.audio.delta", model=AudioDelta)
+    async def first(delta: AudioDelta):
+        received.append(("first", delta))
+
+    @event_handler.on("response.audio.delta", model=AudioDelta)
+    async def second(delta: AudioDelta):
+        received.append(("second", delta))
+
+    await event_handler.handle_event(AUDIO_DELTA)
+
+    assert [name for name, _ in received] == ["first", "second"]
+    # The event is validated once for both subscribers
+    assert received[0][1] is received[1][1]
+    assert received[0][1].delta == "AAA="
+
+
+@pytest.mark.asyncio
+async def test_register_prefix_and_wildcard():
+    received = []
+    event_handler = EventHandler()
+
+    async def on_audio(event):
+        received.append(("audio", event["type"]))
+
+    async def on_any(event):
+        received.append(("any", event["type"]))
+
+    event_handler.register("response.audio.*", on_audio)
+    event_handler.register("*", on_any)
+
+    await event_handler.handle_event(AUDIO_DELTA)
+    await event_handler.handle_event(AUDIO_DONE)
+    await event_handler.handle_event({"type": "response.done"})
+
+    assert received == [
+        ("audio", "response.audio.delta"),
+        ("any", "response.audio.delta"),
+        ("audio", "response.audio.done"),
+        ("any", "response.audio.done"),
+        ("any", "response.done"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_validate_only_when_subscribed():
+    received = []
+
+    async def on_audio_done(done: AudioDone):
+        received.append(done.item_id)
+
+    event_handler = EventHandler(on_audio_done=on_audio_done)
+
+    # An invalid audio delta is never validated as nobody subscribed to it
+    await event_handler.handle_event({"type": "response.audio.delta"})
+    await event_handler.handle_event(AUDIO_DONE)
+
+    assert received == ["item_AIK0wRecrZqZlLV2oUVja"]
+
+
+@pytest.mark.asyncio
+async def test_handle_message_relays_audio_delta_without_decoding():
+    received = []
+    event_handler = EventHandler()
+
+    async def on_audio_delta(delta: AudioDeltaView):
+        received.append((delta.item_id, delta.delta, delta.pcm()))
+
+    async def on_event(event: RawEvent):
+        received.append((event.type, event.message))
+
+    event_handler.register("response.audio.delta", on_audio_delta, AudioDeltaView)
+    event_handler.register("*", on_event, RawEvent)
+    message = json.dumps(AUDIO_DELTA).encode()
+    await event_handler.handle_message(message)
+
+    assert received == [
+        ("item_AIK0wRecrZqZlLV2oUVja", "AAA=", b"\x00\x00"),
+        ("response.audio.delta", message),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_message_decodes_typed_events():
+    received = []
+
+    async def on_audio_done(done: AudioDone):
+        received.append(done.item_id)
+
+    async def on_event(event: dict):
+        received.append(event["type"])
+
+    event_handler = EventHandler(on_audio_done=on_audio_done, on_event=on_event)
+    await event_handler.handle_message(json.dumps(AUDIO_DONE))
+    # The type is nested before the top level one, the frame is decoded
+    await event_handler.handle_message(
+        '{"item": {"type": "message"}, "type": "conversation.item.created"}'
+    )
+
+    assert received == [
+        "item_AIK0wRecrZqZlLV2oUVja",
+        "response.audio.done",
+        "conversation.item.created",
+    ]
+
+
+def test_peek_event_type():
+    assert peek_event_type(b'{"type": "response.done", "event_id": "1"}') == (
+        "response.done"
+    )
+    assert peek_event_type('{"event_id":"1","type":"response.done"}') == (
+        "response.done"
+    )
+    assert peek_event_type('{"item": {"type": "message"}}') is None
+
+
+class RecordingHook:
+    def __init__(self):
+        self.events = []
+        self.callbacks = []
+
+    def on_event(self, event_type: str):
+        self.events.append(event_type)
+
+    def on_callback(self, event_type: str, callback, duration: float):
+        self.callbacks.append((event_type, callback, duration))
+
+
+@pytest.mark.asyncio
+async def test_hooks_time_each_callback():
+    hook = RecordingHook()
+    event_handler = EventHandler(hooks=[hook])
+
+    async def slow(event: dict):
+        await asyncio.sleep(0.01)
+
+    async def fails(event: dict):
+        raise RuntimeError
+
+    event_handler.register("response.audio.delta", slow)
+    event_handler.register("response.audio.done", fails)
+    await event_handler.handle_message(json.dumps(AUDIO_DELTA))
+    with pytest.raises(RuntimeError):
+        await event_handler.handle_event(AUDIO_DONE)
+
+    assert hook.events == ["response.audio.delta", "response.audio.done"]
+    assert [(event_type, callback) for event_type, callback, _ in hook.callbacks] == [
+        ("response.audio.delta", slow),
+        ("response.audio.done", fails),
+    ]
+    assert hook.callbacks[0][2] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_dispatch_metrics_logs_slow_callbacks(caplog):
+    metrics = DispatchMetrics(slow_threshold=0.005)
+    event_handler = EventHandler()
+    event_handler.add_hook(metrics)
+
+    async def relay(event: dict):
+        await asyncio.sleep(0.01)
+
+    event_handler.register("response.audio.done", relay)
+    await event_handler.handle_event(AUDIO_DONE)
+
+    name = "test_dispatch_metrics_logs_slow_callbacks.relay"
+    assert SLOW_CALLBACKS.labels("response.audio.done", name).value == 1
+    assert CALLBACK_DURATION.labels("response.audio.done", name).count == 1
+    assert f"slow callback {name} for response.audio.done" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_union_models_are_validated_from_the_frame(monkeypatch):
+    received = []
+    event_handler = EventHandler()
+
+    @event_handler.on("response.audio.done", model=AudioDone)
+    async def on_audio_done(audio_done: AudioDone):
+        received.append(audio_done)
+
+    def loads(message):
+        raise AssertionError("the frame should not be decoded to a dict")
+
+    monkeypatch.setattr(json, "loads", loads)
+    await event_handler.handle_message(b'{"type":"response.audio.done","item_id":"a"}')
+
+    assert received == [AudioDone(item_id="a")]
+
+
+@pytest.mark.asyncio
+async def test_union_models_share_the_decoded_json(monkeypatch):
+    received = []
+    event_handler = EventHandler()
+
+    @event_handler.on("response.audio.done", model=AudioDone)
+    async def on_audio_done(audio_done: AudioDone):
+        received.append(audio_done)
+
+    @event_handler.on("response.audio.done")
+    async def on_event(event: dict):
+        received.append(event)
+
+    def validate_json(message):
+        raise AssertionError("the frame should be parsed once")
+
+    monkeypatch.setattr(SERVER_EVENT, "validate_json", validate_json)
+    await event_handler.handle_message(b'{"type":"response.audio.done","item_id":"a"}')
+
+    assert received == [AudioDone(item_id="a"), AUDIO_DONE | {"item_id": "a"}]
+
+
+def test_parse_server_event():
+    error = parse_server_event(
+        b'{"type":"error","error":{"type":"invalid_request_error","message":"no"}}'
+    )
+    assert isinstance(error, Error)
+    assert error.error.message == "no"
+
+    arguments = parse_server_event(
+        '{"type":"response.function_call_arguments.delta","item_id":"i",'
+        '"call_id":"c","delta":"{\\"id\\""}'
+    )
+    assert isinstance(arguments, FunctionCallArgumentsDelta)
+    assert arguments.delta == '{"id"'
+
+    with pytest.raises(ValueError):
+        parse_server_event(b'{"type":"session.created"}')
@@ -0,0 +1,242 @@
+import asyncio
+import base64
+import shutil
+import subprocess
+
+import pytest
+
+from yampa.openai.events import InputAudioBufferCommit, TurnDetection
+from yampa.openai.runner import OpenAIRunner
+from yampa.utils import SilenceGate, StreamingTranscoder, TranscoderError
+
+
+@pytest.mark.asyncio
+async def test_send_audio_pcm16_skips_decoding():
+    runner = OpenAIRunner(
+        api_key="",
+        transcoder=StreamingTranscoder(ffmpeg="ffmpeg-does-not-exist"),
+        input_audio_format="pcm16",
+    )
+    pcm_audio = bytes(range(256)) * 4
+    await runner.send_audio(pcm_audio)
+
+    append_payload = runner.create_event.get_nowait()
+    assert append_payload.type == "input_audio_buffer.append"
+    assert base64.b64decode(append_payload.audio) == pcm_audio
+
+
+@pytest.mark.asyncio
+async def test_send_audio_pcm16_resamples():
+    runner = OpenAIRunner(
+        api_key="",
+        input_audio_format="pcm16",
+        input_sample_rate=48000,
+        input_channels=2,
+    )
+    await runner.send_audio(b"\x00\x00" * 2 * 4800)
+
+    append_payload = runner.create_event.get_nowait()
+    assert base64.b64decode(append_payload.audio) == b"\x00\x00" * 2400
+
+
+@pytest.mark.asyncio
+async def test_send_audio_commits_without_turn_detection():
+    runner = OpenAIRunner(api_key="", input_audio_format="pcm16")
+    await runner.send_audio(b"\x00\x00" * 240)
+
+    types = [runner.create_event.get_nowait().type for _ in range(3)]
+    assert types == [
+        "input_audio_buffer.append",
+        "input_audio_buffer.commit",
+        "response.create",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_audio_dropped_is_not_committed():
+    runner = OpenAIRunner(
+        api_key="",
+        input_audio_format="pcm16",
+        outbound_maxsize=1,
+        outbound_policy="drop",
+    )
+    await runner.create_event.put(InputAudioBufferCommit())
+    await runner.send_audio(b"\x00\x00" * 240)
+
+    # Only the commit queued before the dropped recording is left
+    assert runner.create_event.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_send_audio_server_vad_only_appends():
+    runner = OpenAIRunner(
+        api_key="",
+        input_audio_format="pcm16",
+        turn_detection=TurnDetection(
+            threshold=0.5, prefix_padding_ms=300, silence_duration_ms=500
+        ),
+    )
+    await runner.send_audio(b"\x00\x00" * 240)
+    await runner.send_audio(b"\x00\x00" * 240)
+
+    assert runner.create_event.qsize() == 2
+    assert runner.create_event.get_nowait().type == "input_audio_buffer.append"
+
+
+@pytest.mark.asyncio
+async def test_send_audio_silence_is_not_uploaded():
+    runner = OpenAIRunner(api_key="", input_audio_format="pcm16", vad=SilenceGate())
+    await runner.send_audio(b"\x00\x00" * 24000)
+
+    assert runner.create_event.qsize() == 0
+    assert runner.vad.stats.dropped_ms == 1000
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_appends_chunks_then_commits():
+    runner = OpenAIRunner(api_key="", input_audio_format="pcm16")
+    for _ in range(3):
+        await runner.stream_audio(b"\x00\x00" * 240)
+    assert runner.streaming
+    assert runner.create_event.qsize() == 3
+
+    await runner.commit_audio()
+
+    assert not runner.streaming
+    types = [runner.create_event.get_nowait().type for _ in range(5)]
+    assert types == [
+        *["input_audio_buffer.append"] * 3,
+        "input_audio_buffer.commit",
+        "response.create",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_dropped_clears_the_turn():
+    runner = OpenAIRunner(
+        api_key="",
+        input_audio_format="pcm16",
+        outbound_maxsize=2,
+        outbound_policy="drop",
+    )
+    for _ in range(3):
+        await runner.stream_audio(b"\x00\x00" * 240)
+    for _ in range(2):
+        runner.create_event.get_nowait()
+    await runner.commit_audio()
+
+    assert runner.create_event.get_nowait().type == "input_audio_buffer.clear"
+    assert runner.create_event.qsize() == 0
+    assert not runner._dropped
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_silence_is_not_committed():
+    runner = OpenAIRunner(api_key="", input_audio_format="pcm16", vad=SilenceGate())
+    for _ in range(4):
+        await runner.stream_audio(b"\x00\x00" * 6000)
+    await runner.commit_audio()
+
+    assert runner.create_event.qsize() == 0
+    assert runner.vad.stats.dropped_ms == 1000
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_pcm16_keeps_split_samples():
+    runner = OpenAIRunner(api_key="", input_audio_format="pcm16")
+    pcm_audio = bytes(range(256)) * 4
+    # Chunk boundaries in the middle of the samples
+    for start in range(0, len(pcm_audio), 333):
+        await runner.stream_audio(pcm_audio[start : start + 333])
+    await runner.commit_audio()
+
+    appended = b""
+    while runner.create_event.qsize():
+        event = runner.create_event.get_nowait()
+        if event.type == "input_audio_buffer.append":
+            appended += base64.b64decode(event.audio)
+    assert appended == pcm_audio
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_pcm16_needs_24khz_mono():
+    runner = OpenAIRunner(
+        api_key="", input_audio_format="pcm16", input_sample_rate=48000
+    )
+    with pytest.raises(ValueError):
+        await runner.stream_audio(b"\x00\x00" * 480)
+    assert not runner.streaming
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_rejects_unstreamable_m4a(get_audio):
+    runner = OpenAIRunner(
+        api_key="", transcoder=StreamingTranscoder(ffmpeg="ffmpeg-does-not-exist")
+    )
+    m4a = get_audio("ask_orders.m4a")
+    with pytest.raises(TranscoderError):
+        await runner.stream_audio(m4a[:2000])
+    # The rest of the recording and its commit are ignored
+    await runner.stream_audio(m4a[2000:4000])
+    await runner.commit_audio()
+    assert runner.create_event.qsize() == 0
+    assert not runner.streaming
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+@pytest.mark.asyncio
+async def test_send_audio_decodes_m4a(get_audio):
+    runner = OpenAIRunner(api_key="")
+    await runner.send_audio(get_audio("ask_orders.m4a"))
+
+    types = [runner.create_event.get_nowait().type for _ in range(3)]
+    assert types == [
+        "input_audio_buffer.append",
+        "input_audio_buffer.commit",
+        "response.create",
+    ]
+
+
+@pytest.fixture
+def webm_recording(make_wav) -> bytes:
+    # 3s of webm/opus, the MediaRecorder format of the browsers
+    return subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-c:a", "libopus"]
+        + ["-f", "webm", "pipe:1"],
+        input=make_wav(3.0),
+        capture_output=True,
+        check=True,
+    ).stdout
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+@pytest.mark.asyncio
+async def test_stream_audio_decodes_while_recording(webm_recording):
+    chunks = [
+        webm_recording[start : start + 2000]
+        for start in range(0, len(webm_recording), 2000)
+    ]
+    runner = OpenAIRunner(api_key="")
+    try:
+        for chunk in chunks[: len(chunks) // 2]:
+            await runner.stream_audio(chunk)
+        # Decoded and appended before the end of the recording
+        for _ in range(100):
+            if runner.create_event.qsize():
+                break
+            await asyncio.sleep(0.01)
+        assert runner.create_event.qsize() > 0
+
+        for chunk in chunks[len(chunks) // 2 :]:
+            await runner.stream_audio(chunk)
+        await runner.commit_audio()
+        appended = b""
+        while runner.create_event.qsize():
+            event = runner.create_event.get_nowait()
+            if event.type == "input_audio_buffer.append":
+                appended += base64.b64decode(event.audio)
+        assert len(appended) == 3 * 24000 * 2
+    finally:
+        await runner.transcoder.close()
+        if runner._pump is not None:
+            runner._pump.cancel()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import serve
+
+from yampa.openai.session_pool import SessionPool
+
+
+def get_stock(product_id: int) -> int:
+    """Get stock."""
+    return product_id
+
+
+@pytest_asyncio.fixture
+async def upstream():
+    """Local realtime server recording the connections and their first event."""
+    connections = []
+
+    async def handler(ws):
+        entry = {"ws": ws, "events": []}
+        connections.append(entry)
+        async for message in ws:
+            entry["events"].append(json.loads(message))
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://127.0.0.1:{port}", connections
+
+
+async def wait_for(predicate, timeout: float = 2.0):
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_pool_opens_configured_sessions(upstream):
+    url, connections = upstream
+    pool = SessionPool(api_key="key", tools=[get_stock], size=2, url=url)
+    pool.start()
+    try:
+        await wait_for(lambda: len(pool) == 2)
+        await wait_for(lambda: all(c["events"] for c in connections))
+        assert len(connections) == 2
+        for connection in connections:
+            event = connection["events"][0]
+            assert event["type"] == "session.update"
+            assert event["session"]["tools"][0]["name"] == "get_stock"
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_refills(upstream):
+    url, connections = upstream
+    pool = SessionPool(api_key="key", size=1, url=url)
+    pool.start()
+    try:
+        await wait_for(lambda: len(pool) == 1)
+        ws = await pool.acquire()
+        await wait_for(lambda: len(pool) == 1)
+        assert len(connections) == 2
+        await ws.close()
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_connects_when_empty(upstream):
+    url, connections = upstream
+    pool = SessionPool(api_key="key", size=0, url=url)
+    ws = await pool.acquire()
+    assert len(connections) == 1
+    await ws.close()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_expire(upstream):
+    url, connections = upstream
+    pool = SessionPool(api_key="key", size=1, max_idle=0.1, url=url)
+    pool.start()
+    try:
+        await wait_for(lambda: len(connections) >= 3)
+        assert len(pool) <= 1
+        # The expired sessions are closed upstream
+        await wait_for(lambda: connections[0]["ws"].state.name == "CLOSED")
+    finally:
+        await pool.close()
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from yampa.openai.events import RawEvent
+from yampa.openai.processors import EventHandler
+from yampa.openai.subscriptions import DEFAULT_SUBSCRIPTION, resolve_subscription
+
+
+def test_resolve_subscription():
+    assert resolve_subscription(["error", "response.done", " response.text.* "]) == [
+        "error",
+        "response.done",
+        "response.text.*",
+    ]
+    assert resolve_subscription(["all", "all"]) == ["*"]
+    with pytest.raises(ValueError):
+        resolve_subscription(["audio_deltas"])
+
+
+@pytest.mark.asyncio
+async def test_default_subscription_leaves_audio_out(load_scenario):
+    received = []
+
+    async def on_event(event: RawEvent):
+        received.append(event.type)
+
+    event_handler = EventHandler()
+    for pattern in resolve_subscription(DEFAULT_SUBSCRIPTION):
+        event_handler.register(pattern, on_event, RawEvent)
+    scenario = load_scenario("ask_order")
+    for event in scenario:
+        await event_handler.handle_message(json.dumps(event))
+
+    expected = [
+        event["type"]
+        for event in scenario
+        if event["type"] not in ("response.audio.delta", "response.audio.done")
+    ]
+    assert received == expected
+
+
+@pytest.mark.asyncio
+async def test_overlapping_subscriptions_and_unregister():
+    received = []
+
+    async def on_event(event: dict):
+        received.append(event["type"])
+
+    event_handler = EventHandler()
+    event_handler.register("*", on_event)
+    event_handler.register("response.*", on_event)
+    # Called once, even when several patterns match the event
+    await event_handler.handle_event({"type": "response.done"})
+    event_handler.unregister(on_event)
+    await event_handler.handle_event({"type": "response.done"})
+
+    assert received == ["response.done"]
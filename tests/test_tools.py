@@ -0,0 +1,197 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from yampa.openai.processors import EventHandler
+from yampa.openai.tools import (
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    TOOL_DURATION,
+    ToolExecutor,
+    cacheable,
+)
+
+
+def slow_stock(product_id: int) -> int:
+    time.sleep(0.2)
+    return product_id * 10
+
+
+async def list_products() -> list[int]:
+    return [1, 2]
+
+
+async def hang() -> int:
+    await asyncio.sleep(10)
+    return 0
+
+
+def function_call(name: str, call_id: str, arguments: str = "{}") -> dict:
+    return {
+        "type": "response.output_item.done",
+        "response_id": "resp_1",
+        "item": {
+            "id": f"item_{call_id}",
+            "type": "function_call",
+            "name": name,
+            "call_id": call_id,
+            "arguments": arguments,
+        },
+    }
+
+
+RESPONSE_DONE = {"type": "response.done", "response": {"id": "resp_1"}}
+
+
+async def run_response(executor: ToolExecutor, *calls: dict) -> float:
+    event_handler = EventHandler()
+    executor.attach(event_handler)
+    for call in calls:
+        await event_handler.handle_event(call)
+    start = time.perf_counter()
+    await event_handler.handle_event(RESPONSE_DONE)
+    # The receive loop is not blocked by the tools
+    assert time.perf_counter() - start < 0.05
+    await asyncio.gather(*executor._sending)
+    return time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_and_are_batched():
+    sent = []
+
+    async def send(event: BaseModel):
+        sent.append(json.loads(event.model_dump_json()))
+
+    executor = ToolExecutor([slow_stock, list_products], send)
+    elapsed = await run_response(
+        executor,
+        function_call("slow_stock", "call_1", '{"product_id": 2}'),
+        function_call("slow_stock", "call_2", '{"product_id": 3}'),
+        function_call("list_products", "call_3"),
+    )
+
+    assert elapsed < 0.35
+    assert [(m["type"], m.get("item", {}).get("call_id")) for m in sent] == [
+        ("conversation.item.create", "call_1"),
+        ("conversation.item.create", "call_2"),
+        ("conversation.item.create", "call_3"),
+        ("response.create", None),
+    ]
+    assert [m["item"]["output"] for m in sent[:3]] == ["20", "30", "[1, 2]"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_unknown_tool_report_errors():
+    sent = []
+
+    async def send(event: BaseModel):
+        sent.append(json.loads(event.model_dump_json()))
+
+    executor = ToolExecutor([hang], send, timeouts={"hang": 0.05})
+    await run_response(
+        executor,
+        function_call("hang", "call_1"),
+        function_call("missing", "call_2"),
+    )
+
+    assert sent[0]["item"]["output"] == "error: hang timed out"
+    assert sent[1]["item"]["output"] == "error: unknown tool missing"
+    assert sent[2]["type"] == "response.create"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_response_sends_nothing():
+    sent = []
+
+    async def send(event: BaseModel):
+        sent.append(event)
+
+    event_handler = EventHandler()
+    executor = ToolExecutor([hang], send)
+    executor.attach(event_handler)
+    await event_handler.handle_event(function_call("hang", "call_1"))
+    [(_, task)] = executor._calls["resp_1"]
+    await event_handler.handle_event(
+        {"type": "response.done", "response": {"id": "resp_1", "status": "cancelled"}}
+    )
+    await asyncio.sleep(0)
+
+    assert task.cancelled()
+    assert not executor._sending
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_response_without_calls_sends_nothing():
+    sent = []
+
+    async def send(event: BaseModel):
+        sent.append(event)
+
+    executor = ToolExecutor([list_products], send)
+    await run_response(executor)
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_cacheable_tool_single_flight_and_ttl():
+    calls = []
+
+    @cacheable(ttl=0.1, max_entries=1)
+    async def stock(product_id: int) -> int:
+        calls.append(product_id)
+        await asyncio.sleep(0.05)
+        return product_id
+
+    async def send(event: BaseModel):
+        pass
+
+    executor = ToolExecutor([stock], send)
+    outputs = await asyncio.gather(
+        executor._call("stock", '{"product_id": 1}'),
+        executor._call("stock", '{ "product_id" : 1 }'),
+    )
+    assert outputs == ["1", "1"]
+    assert calls == [1]
+
+    assert await executor._call("stock", '{"product_id": 1}') == "1"
+    assert calls == [1]
+
+    # max_entries=1: caching product 2 evicts product 1
+    await executor._call("stock", '{"product_id": 2}')
+    await executor._call("stock", '{"product_id": 1}')
+    assert calls == [1, 2, 1]
+
+    await asyncio.sleep(0.1)
+    await executor._call("stock", '{"product_id": 1}')
+    assert calls == [1, 2, 1, 1]
+    assert CACHE_HITS.labels("stock").value == 2
+    assert CACHE_MISSES.labels("stock").value == 4
+    assert CACHE_EVICTIONS.labels("stock").value == 2
+    # Every call is timed, the cache hits too
+    assert TOOL_DURATION.labels("stock").count == 6
+
+
+@pytest.mark.asyncio
+async def test_cacheable_tool_timeout_keeps_shared_call():
+    calls = []
+
+    @cacheable()
+    async def slow() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 1
+
+    async def send(event: BaseModel):
+        pass
+
+    executor = ToolExecutor([slow], send, timeouts={"slow": 0.01})
+    assert await executor._call("slow", None) == "error: slow timed out"
+    await asyncio.sleep(0.15)
+    assert await executor._call("slow", None) == "1"
+    assert calls == [1]
@@ -0,0 +1,64 @@
+import shutil
+
+import pytest
+
+from yampa.utils import StreamingTranscoder, TranscoderError, needs_seeking
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None, reason="ffmpeg is not installed"
+)
+
+
+@requires_ffmpeg
+@pytest.mark.asyncio
+async def test_transcoder_decodes_chunks(make_wav):
+    payload = make_wav(1.5)
+
+    transcoder = StreamingTranscoder()
+    try:
+        for _ in range(2):
+            pcm = bytearray()
+            for i in range(0, len(payload), 1024):
+                pcm += await transcoder.feed(payload[i : i + 1024])
+            pcm += await transcoder.flush()
+            assert len(pcm) % 2 == 0
+            assert len(pcm) / 2 / 24000 == pytest.approx(1.5, abs=0.01)
+    finally:
+        await transcoder.close()
+
+
+@requires_ffmpeg
+@pytest.mark.asyncio
+async def test_transcoder_invalid_input():
+    transcoder = StreamingTranscoder()
+    try:
+        await transcoder.feed(b"not an audio file")
+        with pytest.raises(TranscoderError):
+            await transcoder.flush()
+        assert await transcoder.flush() == b""
+    finally:
+        await transcoder.close()
+
+
+@pytest.mark.asyncio
+async def test_transcoder_flush_without_data():
+    transcoder = StreamingTranscoder(ffmpeg="ffmpeg-does-not-exist")
+    assert await transcoder.flush() == b""
+    await transcoder.close()
+
+
+def test_needs_seeking(get_audio, make_wav):
+    # The index of this m4a is written after the audio
+    assert needs_seeking(get_audio("ask_orders.m4a"))
+    assert not needs_seeking(make_wav(0.1))
+
+
+@requires_ffmpeg
+@pytest.mark.asyncio
+async def test_transcoder_decode_file(get_audio):
+    transcoder = StreamingTranscoder()
+    pcm = await transcoder.decode_file(get_audio("ask_orders.m4a"))
+    assert len(pcm) > 0
+    assert len(pcm) % 2 == 0
+    with pytest.raises(TranscoderError):
+        await transcoder.decode_file(b"not an audio file")
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from yampa.utils import FRAME_RATE, SilenceGate
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * FRAME_RATE)) / FRAME_RATE
+    return (8000 * np.sin(2 * np.pi * 300 * t)).astype("<i2")
+
+
+def silence(seconds: float) -> np.ndarray:
+    noise = np.random.default_rng(0).normal(0, 20, int(seconds * FRAME_RATE))
+    return noise.astype("<i2")
+
+
+def seconds(pcm: bytes) -> float:
+    return len(pcm) / (FRAME_RATE * 2)
+
+
+PCM = np.concatenate(
+    [silence(1), tone(0.5), silence(1), tone(0.3), silence(0.1), tone(0.2), silence(1)]
+).tobytes()
+
+
+def test_trims_silence_keeping_hangover_and_padding():
+    gate = SilenceGate(hangover_ms=300, padding_ms=200)
+    kept = gate.process(PCM, final=True)
+
+    # padding + speech + hangover, the short pause is kept
+    assert seconds(kept) == pytest.approx(0.2 + 0.5 + 0.3 + 0.2 + 0.6 + 0.3)
+    assert gate.stats.as_dict() == {"input_ms": 4100, "dropped_ms": 2000}
+
+
+def test_chunked_stream_matches_whole_recording():
+    whole = SilenceGate().process(PCM, final=True)
+
+    gate = SilenceGate()
+    rng = np.random.default_rng(1)
+    kept, start = b"", 0
+    while start < len(PCM):
+        size = int(rng.integers(1, 8000))
+        kept += gate.process(PCM[start : start + size])
+        start += size
+    kept += gate.process(b"", final=True)
+    assert kept == whole
+
+
+def test_silence_only_is_dropped():
+    gate = SilenceGate()
+    assert gate.process(silence(1).tobytes(), final=True) == b""
+    assert gate.stats.dropped_ms == pytest.approx(1000)
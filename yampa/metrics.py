@@ -0,0 +1,239 @@
+"""Minimal in-process metrics rendered in the Prometheus text format.
+
+Metrics are cheap enough to stay enabled at full load: labelled children are
+cached, so recording a value is a dict lookup plus an addition (or a bisect
+for histograms).
+"""
+
+import os
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def resident_memory_bytes() -> int:
+    """Resident set size of this process, 0 when it is not known (not Linux)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def child_processes() -> tuple[int, int]:
+    """Children of this process (eg. ffmpeg) and their resident set size.
+
+    (0, 0) when it is not known (not Linux).
+    """
+    parent = str(os.getpid())
+    count = rss_pages = 0
+    try:
+        pids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return 0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                # The command name is in parentheses and may contain spaces
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            # Exited meanwhile
+            continue
+        if fields[1] == parent:
+            count += 1
+            rss_pages += int(fields[21])
+    return count, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: "Metric"):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> "Metric | None":
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Registry | None = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_value()
+        return child
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_value(self) -> _CounterValue:
+        return _CounterValue()
+
+    def labels(self, *values: str) -> _CounterValue:
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            labels = _format_labels(zip(self.labelnames, values))
+            yield f"{self.name}{labels} {_format_value(child.value)}"  # type: ignore[attr-defined]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def _new_value(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def labels(self, *values: str) -> _GaugeValue:
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Registry | None = REGISTRY,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramValue:
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            assert isinstance(child, _HistogramValue)
+            labels = list(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                bucket_labels = _format_labels([*labels, ("le", _format_value(bound))])
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}"
+            yield f"{self.name}_count{_format_labels(labels)} {child.count}"
@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import Callable
+
+import websockets
+from websockets.asyncio.client import ClientConnection
+
+from yampa.metrics import Gauge
+
+from .events import TurnDetection, session_update_payload
+
+UPSTREAM_CONNECTIONS = Gauge(
+    "yampa_upstream_connections",
+    "Upstream realtime connections open, pooled ones included.",
+)
+# Keeps the tasks watching the open connections alive
+_watchers: set[asyncio.Task] = set()
+
+DEFAULT_URL = (
+    "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
+)
+
+
+async def connect(
+    api_key: str,
+    url: str = DEFAULT_URL,
+    tools: list[Callable] | None = None,
+    turn_detection: TurnDetection | None = None,
+) -> ClientConnection:
+    """Open an upstream realtime session configured with `tools`.
+
+    Without `turn_detection` the turns are committed by the client.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "OpenAI-Beta": "realtime=v1",
+    }
+    ws = await websockets.connect(url, additional_headers=headers)
+    # Counted until the socket is actually closed, whoever holds it
+    UPSTREAM_CONNECTIONS.inc()
+    watcher = asyncio.create_task(ws.wait_closed())
+    _watchers.add(watcher)
+    watcher.add_done_callback(_on_closed)
+
+    # Sent even without tools: the session defaults to server VAD, which must
+    # be disabled when the client commits the turns
+    await ws.send(session_update_payload(tools or [], turn_detection), text=True)
+    return ws
+
+
+def _on_closed(watcher: asyncio.Task):
+    _watchers.discard(watcher)
+    UPSTREAM_CONNECTIONS.dec()
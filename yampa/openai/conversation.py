@@ -0,0 +1,284 @@
+"""Conversation state rebuilt from the upstream events.
+
+Port of the `EventProcessors` prototype in `scratch.py`, made to last for
+long sessions: items are slotted records chained in a linked list indexed by
+id, so inserting after `previous_item_id` and deleting are O(1), audio is
+kept as pcm16 samples in an `array` so a truncation is a slice, and
+transcripts are built from a list of deltas joined on read.
+"""
+
+import sys
+from array import array
+from collections.abc import Iterator
+
+from yampa.utils import FRAME_RATE
+
+from .events import AudioDeltaView
+from .processors import EventHandler
+
+
+class TextBuilder:
+    """Text growing by deltas, joined once when read."""
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, text: str = ""):
+        self._parts = [text] if text else []
+
+    def append(self, delta: str):
+        self._parts.append(delta)
+
+    def clear(self):
+        self._parts.clear()
+
+    @property
+    def text(self) -> str:
+        parts = self._parts
+        if len(parts) > 1:
+            parts[:] = ["".join(parts)]
+        return parts[0] if parts else ""
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class ItemRecord:
+    __slots__ = (
+        "arguments",
+        "audio",
+        "audio_end_ms",
+        "audio_start_ms",
+        "call_id",
+        "id",
+        "name",
+        "next",
+        "output",
+        "prev",
+        "role",
+        "status",
+        "text",
+        "transcript",
+        "type",
+    )
+
+    def __init__(self, item: dict):
+        self.id: str = item["id"]
+        self.type: str = item.get("type", "message")
+        self.role: str | None = item.get("role")
+        self.status: str | None = item.get("status")
+        self.name: str | None = item.get("name")
+        self.call_id: str | None = item.get("call_id")
+        self.arguments = TextBuilder(item.get("arguments") or "")
+        self.output: str | None = item.get("output")
+        content = item.get("content")
+        self.text = TextBuilder(
+            "".join(
+                part.get("text") or ""
+                for part in content
+                if part.get("type") in ("text", "input_text")
+            )
+            if content
+            else ""
+        )
+        self.transcript = TextBuilder()
+        # pcm16 samples
+        self.audio = array("h")
+        self.audio_start_ms: int | None = None
+        self.audio_end_ms: int | None = None
+        self.prev: ItemRecord | None = None
+        self.next: ItemRecord | None = None
+
+    @property
+    def audio_ms(self) -> float:
+        return len(self.audio) * 1000 / FRAME_RATE
+
+
+class ResponseRecord:
+    __slots__ = ("id", "output", "status")
+
+    def __init__(self, response: dict):
+        self.id: str = response["id"]
+        self.status: str | None = response.get("status")
+        self.output: list[str] = []
+
+
+class ConversationStore:
+    """Items and responses of a realtime session, in conversation order.
+
+    `attach` subscribes the store to an `EventHandler`. Input transcriptions
+    and speech bounds arriving before their item are queued and applied when
+    it is created, other events about unknown items are ignored rather than
+    failing the session.
+    """
+
+    def __init__(self):
+        self._items: dict[str, ItemRecord] = {}
+        self._head: ItemRecord | None = None
+        self._tail: ItemRecord | None = None
+        self.responses: dict[str, ResponseRecord] = {}
+        self._queued_transcripts: dict[str, str] = {}
+        self._queued_speech: dict[str, tuple[int | None, int | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def __iter__(self) -> Iterator[ItemRecord]:
+        record = self._head
+        while record is not None:
+            yield record
+            record = record.next
+
+    def get(self, item_id: str) -> ItemRecord | None:
+        return self._items.get(item_id)
+
+    def _link(self, record: ItemRecord, event: dict):
+        # Appended unless upstream says where the item goes, a null
+        # previous_item_id being the start of the conversation
+        prev = self._tail
+        if "previous_item_id" in event:
+            previous_item_id = event["previous_item_id"]
+            if previous_item_id is None:
+                prev = None
+            else:
+                prev = self._items.get(previous_item_id, prev)
+        record.prev = prev
+        record.next = prev.next if prev is not None else self._head
+        if record.next is not None:
+            record.next.prev = record
+        else:
+            self._tail = record
+        if prev is not None:
+            prev.next = record
+        else:
+            self._head = record
+
+    def _unlink(self, record: ItemRecord):
+        if record.prev is not None:
+            record.prev.next = record.next
+        else:
+            self._head = record.next
+        if record.next is not None:
+            record.next.prev = record.prev
+        else:
+            self._tail = record.prev
+        record.prev = record.next = None
+
+    async def on_item_created(self, event: dict):
+        item = event["item"]
+        if item["id"] in self._items:
+            return
+        record = self._items[item["id"]] = ItemRecord(item)
+        self._link(record, event)
+
+        if record.type == "message":
+            record.status = "completed" if record.role == "user" else "in_progress"
+        elif record.type == "function_call":
+            record.status = "in_progress"
+        elif record.type == "function_call_output":
+            record.status = "completed"
+
+        transcript = self._queued_transcripts.pop(record.id, None)
+        if transcript is not None:
+            record.transcript.append(transcript)
+        speech = self._queued_speech.pop(record.id, None)
+        if speech is not None:
+            record.audio_start_ms, record.audio_end_ms = speech
+
+    async def on_item_truncated(self, event: dict):
+        record = self._items.get(event["item_id"])
+        if record is None:
+            return
+        end = event["audio_end_ms"] * FRAME_RATE // 1000
+        del record.audio[end:]
+        record.transcript.clear()
+
+    async def on_item_deleted(self, event: dict):
+        record = self._items.pop(event["item_id"], None)
+        if record is not None:
+            self._unlink(record)
+
+    async def on_input_audio_transcription_completed(self, event: dict):
+        # An empty transcript is still a completed transcription
+        transcript = event.get("transcript") or " "
+        record = self._items.get(event["item_id"])
+        if record is None:
+            self._queued_transcripts[event["item_id"]] = transcript
+            return
+        record.transcript.clear()
+        record.transcript.append(transcript)
+
+    async def on_speech_started(self, event: dict):
+        self._queued_speech[event["item_id"]] = (event["audio_start_ms"], None)
+
+    async def on_speech_stopped(self, event: dict):
+        start, _ = self._queued_speech.get(event["item_id"], (None, None))
+        self._queued_speech[event["item_id"]] = (start, event["audio_end_ms"])
+
+    async def on_response_created(self, event: dict):
+        response = event["response"]
+        if response["id"] not in self.responses:
+            self.responses[response["id"]] = ResponseRecord(response)
+
+    async def on_response_done(self, event: dict):
+        response = self.responses.get(event["response"]["id"])
+        if response is not None:
+            response.status = event["response"].get("status")
+
+    async def on_output_item_added(self, event: dict):
+        response = self.responses.get(event["response_id"])
+        if response is not None:
+            response.output.append(event["item"]["id"])
+
+    async def on_output_item_done(self, event: dict):
+        item = event["item"]
+        record = self._items.get(item["id"])
+        if record is not None:
+            record.status = item.get("status")
+
+    async def on_audio_transcript_delta(self, event: dict):
+        record = self._items.get(event["item_id"])
+        if record is not None:
+            record.transcript.append(event["delta"])
+
+    async def on_audio_delta(self, audio_delta: AudioDeltaView):
+        record = self._items.get(audio_delta.item_id)
+        if record is None:
+            return
+        samples = array("h", audio_delta.pcm())
+        if sys.byteorder == "big":
+            samples.byteswap()
+        record.audio.extend(samples)
+
+    async def on_function_call_arguments_delta(self, event: dict):
+        record = self._items.get(event["item_id"])
+        if record is not None:
+            record.arguments.append(event["delta"])
+
+    def attach(self, event_handler: EventHandler):
+        for event_type, callback, model in (
+            ("conversation.item.created", self.on_item_created, None),
+            ("conversation.item.truncated", self.on_item_truncated, None),
+            ("conversation.item.deleted", self.on_item_deleted, None),
+            (
+                "conversation.item.input_audio_transcription.completed",
+                self.on_input_audio_transcription_completed,
+                None,
+            ),
+            ("input_audio_buffer.speech_started", self.on_speech_started, None),
+            ("input_audio_buffer.speech_stopped", self.on_speech_stopped, None),
+            ("response.created", self.on_response_created, None),
+            ("response.done", self.on_response_done, None),
+            ("response.output_item.added", self.on_output_item_added, None),
+            ("response.output_item.done", self.on_output_item_done, None),
+            ("response.audio_transcript.delta", self.on_audio_transcript_delta, None),
+            ("response.audio.delta", self.on_audio_delta, AudioDeltaView),
+            (
+                "response.function_call_arguments.delta",
+                self.on_function_call_arguments_delta,
+                None,
+            ),
+        ):
+            event_handler.register(event_type, callback, model)
@@ -1,35 +1,82 @@
-from .session import session_created_handler, make_session_update_event
 from .conversation import (
-    make_conversation_item_create_event,
-    conversation_item_created_event_handler,
     ConversationItem,
     ConversationItemCreate,
     ConversationItemCreated,
+    FunctionCallOutputCreate,
+    FunctionCallOutputItem,
     InputAudioTranscriptionCompleted,
+    conversation_item_created_event_handler,
+    make_conversation_item_create_event,
+)
+from .error import Error, ErrorDetail
+from .input_audio_buffer import (
+    InputAudioBufferAppend,
+    InputAudioBufferClear,
+    InputAudioBufferCommit,
 )
+from .raw import Message, RawEvent, peek_event_type
 from .response import (
-    AudioTranscriptDelta,
-    AudioTranscriptDone,
     AudioDelta,
+    AudioDeltaView,
     AudioDone,
+    AudioTranscriptDelta,
+    AudioTranscriptDone,
+    FunctionCallArgumentsDelta,
+    FunctionCallArgumentsDone,
     OutputItemDone,
+    Response,
+    ResponseCreate,
+    ResponseCreated,
+    ResponseDone,
+)
+from .server_event import (
+    SERVER_EVENT,
+    SERVER_EVENT_MODELS,
+    ServerEvent,
+    parse_server_event,
+)
+from .session import (
+    TurnDetection,
+    make_session_update_event,
+    session_created_handler,
+    session_update_payload,
 )
-from .input_audio_buffer import InputAudioBufferAppend, InputAudioBufferCommit
 
 __all__ = [
-    "conversation_item_created_event_handler",
-    "session_created_handler",
-    "make_session_update_event",
-    "make_conversation_item_create_event",
+    "SERVER_EVENT",
+    "SERVER_EVENT_MODELS",
     "AudioDelta",
+    "AudioDeltaView",
     "AudioDone",
     "AudioTranscriptDelta",
     "AudioTranscriptDone",
     "ConversationItem",
     "ConversationItemCreate",
     "ConversationItemCreated",
-    "OutputItemDone",
-    "InputAudioTranscriptionCompleted",
+    "Error",
+    "ErrorDetail",
+    "FunctionCallArgumentsDelta",
+    "FunctionCallArgumentsDone",
+    "FunctionCallOutputCreate",
+    "FunctionCallOutputItem",
     "InputAudioBufferAppend",
+    "InputAudioBufferClear",
     "InputAudioBufferCommit",
+    "InputAudioTranscriptionCompleted",
+    "Message",
+    "OutputItemDone",
+    "RawEvent",
+    "Response",
+    "ResponseCreate",
+    "ResponseCreated",
+    "ResponseDone",
+    "ServerEvent",
+    "TurnDetection",
+    "conversation_item_created_event_handler",
+    "make_conversation_item_create_event",
+    "make_session_update_event",
+    "parse_server_event",
+    "peek_event_type",
+    "session_created_handler",
+    "session_update_payload",
 ]
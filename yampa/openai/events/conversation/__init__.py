@@ -4,6 +4,8 @@ from .item import (
     ConversationItem,
     ConversationItemCreate,
     ConversationItemCreated,
+    FunctionCallOutputCreate,
+    FunctionCallOutputItem,
     InputAudioTranscriptionCompleted,
 )
 
@@ -13,5 +15,7 @@ __all__ = [
     "ConversationItem",
     "ConversationItemCreate",
     "ConversationItemCreated",
+    "FunctionCallOutputCreate",
+    "FunctionCallOutputItem",
     "InputAudioTranscriptionCompleted",
 ]
@@ -1,5 +1,13 @@
-from .create import make_conversation_item_create_event, ConversationItemCreate
-from .base import ConversationItem, InputAudioTranscriptionCompleted
+from .create import (
+    make_conversation_item_create_event,
+    ConversationItemCreate,
+    FunctionCallOutputCreate,
+)
+from .base import (
+    ConversationItem,
+    FunctionCallOutputItem,
+    InputAudioTranscriptionCompleted,
+)
 from .created import conversation_item_created_event_handler, ConversationItemCreated
 
 __all__ = [
@@ -8,5 +16,7 @@ __all__ = [
     "ConversationItem",
     "ConversationItemCreate",
     "ConversationItemCreated",
+    "FunctionCallOutputCreate",
+    "FunctionCallOutputItem",
     "InputAudioTranscriptionCompleted",
 ]
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
@@ -15,6 +17,15 @@ class ConversationItem(BaseModel):
     content: list[ConversationItemContent] | None = None
 
 
+class FunctionCallOutputItem(BaseModel):
+    type: Literal["function_call_output"] = "function_call_output"
+    call_id: str
+    output: str
+
+
 class InputAudioTranscriptionCompleted(BaseModel):
+    type: Literal["conversation.item.input_audio_transcription.completed"] = (
+        "conversation.item.input_audio_transcription.completed"
+    )
     item_id: str
     transcript: str
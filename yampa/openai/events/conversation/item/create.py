@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from .base import ConversationItem, ConversationItemContent
+from .base import ConversationItem, ConversationItemContent, FunctionCallOutputItem
 from yampa.utils import audio_to_item_create_event
 
 
@@ -8,6 +8,11 @@ class ConversationItemCreate(BaseModel):
     item: ConversationItem
 
 
+class FunctionCallOutputCreate(BaseModel):
+    type: str = "conversation.item.create"
+    item: FunctionCallOutputItem
+
+
 def make_conversation_item_create_event(audio: bytes) -> ConversationItemCreate:
     return ConversationItemCreate(
         item=ConversationItem(
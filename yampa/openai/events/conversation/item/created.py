@@ -1,8 +1,12 @@
+from typing import Literal
+
 from pydantic import BaseModel
+
 from .base import ConversationItem
 
 
 class ConversationItemCreated(BaseModel):
+    type: Literal["conversation.item.created"] = "conversation.item.created"
     event_id: str
     item: ConversationItem
 
@@ -0,0 +1,17 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class ErrorDetail(BaseModel):
+    type: str
+    code: str | None = None
+    message: str | None = None
+    param: str | None = None
+    # Client event causing the error
+    event_id: str | None = None
+
+
+class Error(BaseModel):
+    type: Literal["error"] = "error"
+    error: ErrorDetail
@@ -8,3 +8,7 @@ class InputAudioBufferAppend(BaseModel):
 
 class InputAudioBufferCommit(BaseModel):
     type: str = "input_audio_buffer.commit"
+
+
+class InputAudioBufferClear(BaseModel):
+    type: str = "input_audio_buffer.clear"
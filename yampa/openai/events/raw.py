@@ -0,0 +1,75 @@
+import json
+from typing import Any
+
+# Upstream messages are json text frames, kept as bytes when possible
+Message = str | bytes
+
+
+def find_string_field(message: Message, key: str) -> tuple[int, int] | None:
+    """Bounds of the first `key` string value of a json object, without parsing.
+
+    Only meant for flat, compact objects as sent by the realtime API: the value
+    must not contain escaped characters, nothing is unescaped.
+    """
+    if isinstance(message, str):
+        pattern: Any = f'"{key}"'
+        quote: Any = '"'
+        separator: Any = ":"
+        backslash: Any = "\\"
+    else:
+        pattern = f'"{key}"'.encode()
+        quote, separator, backslash = b'"', b":", b"\\"
+    start = message.find(pattern)
+    if start == -1:
+        return None
+    value_start = message.find(quote, start + len(pattern))
+    if (
+        value_start == -1
+        or message[start + len(pattern) : value_start].strip() != separator
+    ):
+        return None
+    value_end = message.find(quote, value_start + 1)
+    if value_end == -1 or message.find(backslash, value_start, value_end) != -1:
+        return None
+    return value_start + 1, value_end
+
+
+def peek_event_type(message: Message) -> str | None:
+    """Top level `type` of an event, or None when it can't be read cheaply."""
+    bounds = find_string_field(message, "type")
+    if bounds is None:
+        return None
+    start, end = bounds
+    # The match must not belong to a nested object
+    opening = "{" if isinstance(message, str) else b"{"
+    if message.find(opening, 1, start) != -1:  # type: ignore[arg-type]
+        return None
+    event_type = message[start:end]
+    return event_type if isinstance(event_type, str) else event_type.decode()
+
+
+class RawEvent:
+    """Event kept as the text frame received from upstream.
+
+    Subscribing with this model skips the json decoding, eg. to relay the
+    event verbatim.
+    """
+
+    __slots__ = ("message", "type")
+
+    def __init__(self, type: str, message: Message):
+        self.type = type
+        self.message = message
+
+    @property
+    def text(self) -> str:
+        message = self.message
+        return message if isinstance(message, str) else message.decode()
+
+    @classmethod
+    def from_raw(cls, message: Message, event_type: str) -> "RawEvent":
+        return cls(event_type, message)
+
+    @classmethod
+    def model_validate(cls, event: dict) -> "RawEvent":
+        return cls(event["type"], json.dumps(event))
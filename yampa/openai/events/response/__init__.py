@@ -1,11 +1,21 @@
+from .audio import AudioDelta, AudioDeltaView, AudioDone
 from .audio_transcript import AudioTranscriptDelta, AudioTranscriptDone
-from .audio import AudioDelta, AudioDone
+from .create import ResponseCreate
+from .function_call import FunctionCallArgumentsDelta, FunctionCallArgumentsDone
 from .item import OutputItemDone
+from .lifecycle import Response, ResponseCreated, ResponseDone
 
 __all__ = [
     "AudioDelta",
+    "AudioDeltaView",
     "AudioDone",
     "AudioTranscriptDelta",
     "AudioTranscriptDone",
+    "FunctionCallArgumentsDelta",
+    "FunctionCallArgumentsDone",
     "OutputItemDone",
+    "Response",
+    "ResponseCreate",
+    "ResponseCreated",
+    "ResponseDone",
 ]
@@ -1,10 +1,58 @@
+import base64
+from typing import Literal
+
 from pydantic import BaseModel
 
+from ..raw import Message, find_string_field
+
 
 class AudioDelta(BaseModel):
+    type: Literal["response.audio.delta"] = "response.audio.delta"
     item_id: str
     delta: str
 
 
+class AudioDeltaView:
+    """Lightweight `response.audio.delta` read straight from the text frame.
+
+    The delta is sliced out of the frame instead of decoding the json and
+    validating a model: audio deltas are the largest and most frequent
+    upstream events and are relayed almost verbatim.
+    """
+
+    __slots__ = ("delta_view", "item_id")
+
+    def __init__(self, item_id: str, delta_view: memoryview | str):
+        self.item_id = item_id
+        # base64 encoded pcm16
+        self.delta_view = delta_view
+
+    @property
+    def delta(self) -> str:
+        delta_view = self.delta_view
+        return delta_view if isinstance(delta_view, str) else str(delta_view, "ascii")
+
+    def pcm(self) -> bytes:
+        return base64.b64decode(self.delta_view)
+
+    @classmethod
+    def from_raw(cls, message: Message, event_type: str) -> "AudioDeltaView":
+        item_id = find_string_field(message, "item_id")
+        delta = find_string_field(message, "delta")
+        if item_id is None or delta is None:
+            raise ValueError("not a flat response.audio.delta event")
+        if isinstance(message, str):
+            return cls(message[slice(*item_id)], message[slice(*delta)])
+        return cls(
+            message[slice(*item_id)].decode(),
+            memoryview(message)[slice(*delta)],
+        )
+
+    @classmethod
+    def model_validate(cls, event: dict) -> "AudioDeltaView":
+        return cls(event["item_id"], event["delta"])
+
+
 class AudioDone(BaseModel):
+    type: Literal["response.audio.done"] = "response.audio.done"
     item_id: str
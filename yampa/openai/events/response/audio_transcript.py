@@ -1,11 +1,15 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class AudioTranscriptDelta(BaseModel):
+    type: Literal["response.audio_transcript.delta"] = "response.audio_transcript.delta"
     item_id: str
     delta: str
 
 
 class AudioTranscriptDone(BaseModel):
+    type: Literal["response.audio_transcript.done"] = "response.audio_transcript.done"
     item_id: str
     transcript: str
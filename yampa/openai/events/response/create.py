@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class ResponseCreate(BaseModel):
+    type: str = "response.create"
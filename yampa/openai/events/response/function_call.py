@@ -0,0 +1,23 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class FunctionCallArgumentsDelta(BaseModel):
+    type: Literal["response.function_call_arguments.delta"] = (
+        "response.function_call_arguments.delta"
+    )
+    response_id: str | None = None
+    item_id: str
+    call_id: str
+    delta: str
+
+
+class FunctionCallArgumentsDone(BaseModel):
+    type: Literal["response.function_call_arguments.done"] = (
+        "response.function_call_arguments.done"
+    )
+    response_id: str | None = None
+    item_id: str
+    call_id: str
+    arguments: str
@@ -1,8 +1,11 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class OutputItem(BaseModel):
     id: str
+    type: str | None = None
     # TODO: Handle offer output than function
     name: str | None = None
     arguments: str | None = None
@@ -10,4 +13,6 @@ class OutputItem(BaseModel):
 
 
 class OutputItemDone(BaseModel):
+    type: Literal["response.output_item.done"] = "response.output_item.done"
+    response_id: str | None = None
     item: OutputItem
@@ -0,0 +1,24 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from .item import OutputItem
+
+
+class Response(BaseModel):
+    id: str
+    # in_progress, completed, cancelled, incomplete or failed
+    status: str | None = None
+    status_details: dict[str, Any] | None = None
+    output: list[OutputItem] = []
+    usage: dict[str, Any] | None = None
+
+
+class ResponseCreated(BaseModel):
+    type: Literal["response.created"] = "response.created"
+    response: Response
+
+
+class ResponseDone(BaseModel):
+    type: Literal["response.done"] = "response.done"
+    response: Response
@@ -0,0 +1,54 @@
+"""Events sent by upstream, validated straight from the frame.
+
+`SERVER_EVENT` is a `TypeAdapter` over a union of the modeled events
+discriminated on their `type`: pydantic-core parses the json and validates
+the model of the event type in one pass, without building a dict first.
+"""
+
+from typing import Annotated, get_args
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from .conversation import ConversationItemCreated, InputAudioTranscriptionCompleted
+from .error import Error
+from .raw import Message
+from .response import (
+    AudioDelta,
+    AudioDone,
+    AudioTranscriptDelta,
+    AudioTranscriptDone,
+    FunctionCallArgumentsDelta,
+    FunctionCallArgumentsDone,
+    OutputItemDone,
+    ResponseCreated,
+    ResponseDone,
+)
+
+ServerEvent = Annotated[
+    ConversationItemCreated
+    | InputAudioTranscriptionCompleted
+    | ResponseCreated
+    | ResponseDone
+    | OutputItemDone
+    | AudioTranscriptDelta
+    | AudioTranscriptDone
+    | AudioDelta
+    | AudioDone
+    | FunctionCallArgumentsDelta
+    | FunctionCallArgumentsDone
+    | Error,
+    Field(discriminator="type"),
+]
+
+SERVER_EVENT: TypeAdapter[ServerEvent] = TypeAdapter(ServerEvent)
+
+# Model of each event type of the union
+SERVER_EVENT_MODELS: dict[str, type[BaseModel]] = {
+    model.model_fields["type"].default: model
+    for model in get_args(get_args(ServerEvent)[0])
+}
+
+
+def parse_server_event(message: Message) -> ServerEvent:
+    """Validate an upstream frame, raises a ValidationError (ValueError)."""
+    return SERVER_EVENT.validate_json(message)
@@ -1,7 +1,10 @@
-from .update import make_session_update_event
+from .base import TurnDetection
 from .created import session_created_handler
+from .update import make_session_update_event, session_update_payload
 
 __all__ = [
+    "TurnDetection",
     "make_session_update_event",
     "session_created_handler",
+    "session_update_payload",
 ]
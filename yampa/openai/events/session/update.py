@@ -1,13 +1,17 @@
-from typing import Callable
+import inspect
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Literal, get_args, get_origin
+
+from pydantic import BaseModel
+
 from .base import (
     Session,
-    Tools,
     SessionParameters,
     SessionParametersProperties,
+    Tools,
+    TurnDetection,
 )
-from pydantic import BaseModel
-import inspect
-from typing import Literal, get_origin, get_args
 
 
 class InputAudioTranscription(BaseModel):
@@ -23,7 +27,9 @@ class SessionUpdate(BaseModel):
     session: SessionUpdatePayload
 
 
-def make_session_update_event(tools=list[Callable]) -> SessionUpdate:
+def make_session_update_event(
+    tools=list[Callable], turn_detection: TurnDetection | None = None
+) -> SessionUpdate:
     session_tools = []
     for tool in tools:
         description = tool.__doc__
@@ -64,7 +70,45 @@ def make_session_update_event(tools=list[Callable]) -> SessionUpdate:
         session=SessionUpdatePayload(
             tools=session_tools,
             input_audio_transcription=InputAudioTranscription(model="whisper-1"),
-            turn_detection=None,
+            turn_detection=turn_detection,
             voice="alloy",
         ),
     )
+
+
+def _tool_key(tool: Callable) -> tuple:
+    # Everything the schema is built from: editing a tool in place (eg. its
+    # docstring or code on reload) gives a new key, hence a new payload.
+    return (
+        tool,
+        tool.__name__,
+        tool.__doc__,
+        getattr(tool, "__code__", None),
+        tuple(getattr(tool, "__annotations__", {}).items()),
+    )
+
+
+@lru_cache(maxsize=64)
+def _session_update_payload(
+    key: tuple[tuple, ...], turn_detection: str | None
+) -> bytes:
+    event = make_session_update_event(
+        tools=[tool_key[0] for tool_key in key],
+        turn_detection=None
+        if turn_detection is None
+        else TurnDetection.model_validate_json(turn_detection),
+    )
+    return event.model_dump_json(exclude_unset=True).encode()
+
+
+def session_update_payload(
+    tools: list[Callable], turn_detection: TurnDetection | None = None
+) -> bytes:
+    """`session.update` event for `tools`, serialized once per configuration.
+
+    The json is utf-8 encoded, ready to be sent as is in a text frame.
+    """
+    return _session_update_payload(
+        tuple(_tool_key(tool) for tool in tools),
+        None if turn_detection is None else turn_detection.model_dump_json(),
+    )
@@ -0,0 +1,75 @@
+import logging
+from typing import Any, Protocol
+
+from yampa.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+DISPATCHED_EVENTS = Counter(
+    "yampa_dispatched_events_total",
+    "Upstream events dispatched to at least one callback.",
+    ("type",),
+)
+CALLBACK_DURATION = Histogram(
+    "yampa_callback_duration_seconds",
+    "Time spent awaiting an event handler callback.",
+    ("type", "callback"),
+)
+SLOW_CALLBACKS = Counter(
+    "yampa_slow_callbacks_total",
+    "Callbacks slower than the slow callback threshold.",
+    ("type", "callback"),
+)
+
+
+class DispatchHook(Protocol):
+    """Called by `EventHandler` around the callbacks it awaits.
+
+    Callbacks are awaited one after the other, so `on_callback` is called
+    once a callback returned (or raised) and before the next one starts.
+    """
+
+    def on_event(self, event_type: str): ...
+
+    def on_callback(self, event_type: str, callback: Any, duration: float): ...
+
+
+def callback_name(callback: Any) -> str:
+    name = getattr(callback, "__qualname__", None) or repr(callback)
+    return name.replace(".<locals>", "")
+
+
+class DispatchMetrics:
+    """Per event type counts and callback durations, on `/metrics`.
+
+    Callbacks taking longer than `slow_threshold` seconds are logged with
+    the event type, they delay every upstream event behind them.
+    """
+
+    def __init__(self, slow_threshold: float | None = 0.1):
+        self.slow_threshold = slow_threshold
+        self._events: dict[str, Any] = {}
+        self._callbacks: dict[tuple[str, Any], tuple[str, Any]] = {}
+
+    def on_event(self, event_type: str):
+        counter = self._events.get(event_type)
+        if counter is None:
+            counter = self._events[event_type] = DISPATCHED_EVENTS.labels(event_type)
+        counter.inc()
+
+    def on_callback(self, event_type: str, callback: Any, duration: float):
+        key = (event_type, callback)
+        cached = self._callbacks.get(key)
+        if cached is None:
+            name = callback_name(callback)
+            cached = self._callbacks[key] = (
+                name,
+                CALLBACK_DURATION.labels(event_type, name),
+            )
+        name, histogram = cached
+        histogram.observe(duration)
+        if self.slow_threshold is not None and duration > self.slow_threshold:
+            SLOW_CALLBACKS.labels(event_type, name).inc()
+            logger.warning(
+                "slow callback %s for %s took %.3fs", name, event_type, duration
+            )
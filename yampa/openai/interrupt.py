@@ -0,0 +1,146 @@
+import json
+import time
+from collections.abc import Awaitable, Callable
+
+from yampa.metrics import Counter, Histogram
+from yampa.utils import FRAME_RATE, SAMPLE_WIDTH
+
+from .events import AudioDeltaView
+from .processors import EventHandler
+
+# Sent straight to the upstream socket, ahead of the queued client events
+Send = Callable[[str], Awaitable[None]]
+
+INTERRUPT_TO_SILENCE = Histogram(
+    "yampa_interrupt_to_silence_seconds",
+    "Time from a user interrupt to upstream done with the interrupted response.",
+)
+INTERRUPTS = Counter(
+    "yampa_interrupts_total",
+    "Responses interrupted by the user.",
+)
+MUTED_DELTAS = Counter(
+    "yampa_interrupt_muted_deltas_total",
+    "Audio deltas received after an interrupt and not forwarded.",
+)
+
+RESPONSE_CANCEL = json.dumps({"type": "response.cancel"})
+
+
+class InterruptController:
+    """Barge-in: stop the assistant when the user speaks over it.
+
+    `interrupt` cancels the response being generated and truncates the item
+    being played at what the user actually heard, so the model does not
+    believe it said the rest. The deltas of an interrupted item still in
+    flight are flagged by `muted`, for the relay to drop them. Once its
+    audio is done an item is only truncated at what the client reports it
+    played, the audio still in the client buffers.
+
+    When the client does not report how much it played, it is estimated as
+    the time since the first delta of the item, capped by the audio received.
+    """
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.muted_items: set[str] = set()
+        self._response_id: str | None = None
+        # Upstream answers a second cancel of a response with an error
+        self._cancelled_response: str | None = None
+        self._audio_item: str | None = None
+        self._audio_started_at = 0.0
+        self._audio_bytes = 0
+        self._interrupted_at: float | None = None
+
+    def attach(self, event_handler: EventHandler):
+        event_handler.register("response.created", self.on_response_created)
+        event_handler.register("response.done", self.on_response_done)
+        event_handler.register(
+            "response.audio.delta", self.on_audio_delta, AudioDeltaView
+        )
+        event_handler.register("response.audio.done", self.on_audio_done)
+
+    def muted(self, item_id: str) -> bool:
+        return item_id in self.muted_items
+
+    @property
+    def received_ms(self) -> float:
+        return self._audio_bytes / (FRAME_RATE * SAMPLE_WIDTH) * 1000
+
+    async def on_response_created(self, event: dict):
+        self._response_id = event["response"]["id"]
+
+    async def on_response_done(self, event: dict):
+        self._response_id = None
+        # The deltas of the response all arrived, none is left to mute
+        self.muted_items.clear()
+        if self._interrupted_at is not None:
+            INTERRUPT_TO_SILENCE.observe(time.monotonic() - self._interrupted_at)
+            self._interrupted_at = None
+
+    async def on_audio_delta(self, audio_delta: AudioDeltaView):
+        item_id = audio_delta.item_id
+        if item_id in self.muted_items:
+            MUTED_DELTAS.inc()
+            return
+        if item_id != self._audio_item:
+            self._audio_item = item_id
+            self._audio_started_at = time.monotonic()
+            self._audio_bytes = 0
+        # Decoded size without decoding, off by the padding at most
+        self._audio_bytes += len(audio_delta.delta_view) * 3 // 4
+
+    async def on_audio_done(self, event: dict):
+        item_id = event["item_id"]
+        self.muted_items.discard(item_id)
+        if item_id == self._audio_item:
+            self._audio_item = None
+
+    async def interrupt(
+        self, played_ms: float | None = None, item_id: str | None = None
+    ) -> bool:
+        """Interrupt the assistant, return False when there was nothing to stop."""
+        interrupted = False
+        if (
+            self._response_id is not None
+            and self._response_id != self._cancelled_response
+        ):
+            # Sent straight away, not behind the queued audio appends
+            await self.send(RESPONSE_CANCEL)
+            self._cancelled_response = self._response_id
+            interrupted = True
+
+        if item_id is None or item_id == self._audio_item:
+            item_id = self._audio_item
+            received_ms = self.received_ms
+            if played_ms is None:
+                played_ms = (time.monotonic() - self._audio_started_at) * 1000
+            played_ms = min(played_ms, received_ms)
+        else:
+            received_ms = float("inf")
+        # Item with deltas still to come
+        streaming = item_id if item_id == self._audio_item else None
+        if item_id is not None and played_ms is not None and played_ms < received_ms:
+            await self.send(
+                json.dumps(
+                    {
+                        "type": "conversation.item.truncate",
+                        "item_id": item_id,
+                        "content_index": 0,
+                        "audio_end_ms": int(played_ms),
+                    }
+                )
+            )
+            interrupted = True
+        if streaming is not None and interrupted:
+            self.muted_items.add(streaming)
+            self._audio_item = None
+
+        if interrupted:
+            INTERRUPTS.inc()
+            if self._response_id is None:
+                # Nothing left to generate, upstream is already silent
+                INTERRUPT_TO_SILENCE.observe(0.0)
+            else:
+                self._interrupted_at = time.monotonic()
+        return interrupted
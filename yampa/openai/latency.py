@@ -0,0 +1,83 @@
+import time
+
+from yampa.metrics import Histogram
+
+from .events import AudioDeltaView
+from .processors import EventHandler
+
+# Turns last seconds, tools and transcodes milliseconds
+TURN_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    1.5,
+    2.0,
+    3.0,
+    5.0,
+    10.0,
+    30.0,
+)
+
+TURN_STAGE = Histogram(
+    "yampa_turn_stage_seconds",
+    "Time from the user audio received to each stage of the turn.",
+    ("stage",),
+    buckets=TURN_BUCKETS,
+)
+
+STAGES = (
+    "transcoded",
+    "append_sent",
+    "commit_sent",
+    "first_audio",
+    "audio_done",
+)
+
+
+class TurnTimer:
+    """Per-session timestamps of a turn across the relay pipeline.
+
+    `start` is called when the user audio is received, then each stage is
+    observed once per turn in `yampa_turn_stage_seconds`, as the time elapsed
+    since the start. Upstream stages are timed from the event handler, the
+    audio deltas cost an attribute check once the first one was seen. When a
+    tool is called, the audio stages come from the response answering it.
+    """
+
+    def __init__(self):
+        self._started_at: float | None = None
+        self._seen: set[str] = set()
+        # Bound once, observing is then a bisect and two additions
+        self._stages = {stage: TURN_STAGE.labels(stage) for stage in STAGES}
+        self._first_audio = False
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._seen.clear()
+        self._first_audio = False
+
+    def mark(self, stage: str):
+        if self._started_at is None or stage in self._seen:
+            return
+        self._seen.add(stage)
+        self._stages[stage].observe(time.monotonic() - self._started_at)
+
+    def attach(self, event_handler: EventHandler):
+        event_handler.register(
+            "response.audio.delta", self.on_audio_delta, AudioDeltaView
+        )
+        event_handler.register("response.audio.done", self.on_audio_done)
+
+    async def on_audio_delta(self, audio_delta: AudioDeltaView):
+        if not self._first_audio:
+            self._first_audio = True
+            self.mark("first_audio")
+
+    async def on_audio_done(self, event: dict):
+        self.mark("audio_done")
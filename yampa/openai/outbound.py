@@ -0,0 +1,132 @@
+import asyncio
+import base64
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+from pydantic import BaseModel
+
+from yampa.metrics import Counter, Gauge, Histogram
+
+from .events import InputAudioBufferAppend
+
+QueuePolicy = Literal["block", "coalesce", "drop"]
+OnDrop = Callable[[InputAudioBufferAppend], Awaitable[None]]
+
+# Upstream rejects client events larger than 15MiB
+MAX_COALESCED_AUDIO = 10 * 1024 * 1024
+
+QUEUE_DEPTH = Gauge(
+    "yampa_outbound_queue_depth",
+    "Client events waiting to be sent upstream, all sessions included.",
+)
+QUEUE_WAIT = Histogram(
+    "yampa_outbound_queue_wait_seconds",
+    "Time between queueing a client event and taking it to send it upstream.",
+)
+COALESCED = Counter(
+    "yampa_outbound_coalesced_total",
+    "Audio appends merged into the previous queued append.",
+)
+DROPPED = Counter(
+    "yampa_outbound_dropped_total",
+    "Audio appends dropped because the outbound queue was full.",
+)
+
+
+def _concat_base64(first: str, second: str) -> str:
+    # Without padding the first payload ends on a 3 bytes boundary and the
+    # encoded strings can be joined as is
+    if not first.endswith("="):
+        return first + second
+    return base64.b64encode(base64.b64decode(first) + base64.b64decode(second)).decode()
+
+
+class OutboundQueue:
+    """Bounded queue of the client events sent upstream.
+
+    When `maxsize` events are waiting, `put` applies `policy`:
+
+    - `block`: wait for room, which in turn stops reading the browser socket.
+    - `coalesce`: merge an audio append into the append queued last, as long
+      as no other event (eg. a commit) sits between them, otherwise block.
+    - `drop`: drop an audio append and report it to `on_drop`. Other events
+      are never dropped, losing a commit would break the turn, they block.
+
+    `put` returns False for a dropped append, the caller decides what
+    becomes of its turn.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        policy: QueuePolicy = "block",
+        on_drop: OnDrop | None = None,
+    ):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_drop = on_drop
+        self._events: deque[tuple[float, BaseModel]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def qsize(self) -> int:
+        return len(self._events)
+
+    def full(self) -> bool:
+        return len(self._events) >= self.maxsize
+
+    def _coalesce(self, event: BaseModel) -> bool:
+        if not (self._events and isinstance(event, InputAudioBufferAppend)):
+            return False
+        queued_at, last = self._events[-1]
+        if not isinstance(last, InputAudioBufferAppend):
+            return False
+        if len(last.audio) + len(event.audio) > MAX_COALESCED_AUDIO:
+            return False
+        merged = InputAudioBufferAppend(audio=_concat_base64(last.audio, event.audio))
+        self._events[-1] = (queued_at, merged)
+        COALESCED.inc()
+        return True
+
+    async def put(self, event: BaseModel) -> bool:
+        if self.full():
+            if self.policy == "coalesce" and self._coalesce(event):
+                return True
+            if self.policy == "drop" and isinstance(event, InputAudioBufferAppend):
+                DROPPED.inc()
+                if self.on_drop is not None:
+                    await self.on_drop(event)
+                return False
+            while self.full():
+                await self._not_full.wait()
+        self._events.append((time.monotonic(), event))
+        QUEUE_DEPTH.inc()
+        self._not_empty.set()
+        if self.full():
+            self._not_full.clear()
+        return True
+
+    def get_nowait(self) -> BaseModel:
+        if not self._events:
+            raise asyncio.QueueEmpty
+        queued_at, event = self._events.popleft()
+        QUEUE_DEPTH.dec()
+        QUEUE_WAIT.observe(time.monotonic() - queued_at)
+        if not self._events:
+            self._not_empty.clear()
+        self._not_full.set()
+        return event
+
+    async def get(self) -> BaseModel:
+        while not self._events:
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def clear(self):
+        QUEUE_DEPTH.dec(len(self._events))
+        self._events.clear()
+        self._not_empty.clear()
+        self._not_full.set()
@@ -1,20 +1,59 @@
-from collections.abc import Awaitable, Callable
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
 from .events import (
-    conversation_item_created_event_handler,
-    ConversationItem,
+    SERVER_EVENT_MODELS,
     AudioDelta,
     AudioDone,
     AudioTranscriptDelta,
     AudioTranscriptDone,
-    OutputItemDone,
+    ConversationItemCreated,
     InputAudioTranscriptionCompleted,
+    Message,
+    OutputItemDone,
+    parse_server_event,
+    peek_event_type,
 )
+from .instrumentation import DispatchHook
+
+Callback = Callable[[Any], Awaitable[None]]
+# Models validating the events, see EventHandler.register
+Model = Any
+# Distinct models of the matching subscriptions, each callback with the index
+# of the model it expects, whether a model needs the decoded json, and the
+# model validated straight from the frame if any.
+Route = tuple[
+    tuple[Model | None, ...],
+    tuple[tuple[Callback, int], ...],
+    bool,
+    Model | None,
+]
+
+
+def _from_message(
+    model: Model | None,
+    message: Message,
+    event_type: str,
+    event: dict | None,
+    parsed: Any,
+) -> Any:
+    if model is None:
+        return event
+    if hasattr(model, "from_raw"):
+        return model.from_raw(message, event_type)
+    if parsed is not None and type(parsed) is model:
+        return parsed
+    return model.model_validate(event)
 
 
 class EventHandler:
     def __init__(
         self,
-        on_item_created: Callable[[ConversationItem], Awaitable[None]] | None = None,
+        on_item_created: Callable[[ConversationItemCreated], Awaitable[None]]
+        | None = None,
         on_transcript_delta: Callable[[AudioTranscriptDelta], Awaitable[None]]
         | None = None,
         on_transcript_delta_done: Callable[[AudioTranscriptDone], Awaitable[None]]
@@ -26,67 +65,216 @@ class EventHandler:
             [InputAudioTranscriptionCompleted], Awaitable[None]
         ]
         | None = None,
-        on_event: Callable[[str], Awaitable[None]] | None = None,
+        on_event: Callable[[dict], Awaitable[None]] | None = None,
+        hooks: Iterable[DispatchHook] = (),
     ):
-        self.on_item_created = on_item_created
-        self.on_transcript_delta = on_transcript_delta
-        self.on_transcript_delta_done = on_transcript_delta_done
-        self.on_audio_delta = on_audio_delta
-        self.on_audio_done = on_audio_done
-        self.on_output_item_done = on_output_item_done
-        self.on_input_audio_transcription_completed = (
-            on_input_audio_transcription_completed
-        )
-        self.on_event = on_event
-
-    async def handle_event(self, event):
-        handlers = {
-            "conversation.item.created": (
-                conversation_item_created_event_handler,
-                self.on_item_created,
+        self._subscriptions: list[tuple[str, Callback, Model | None]] = []
+        self._routes: dict[str, Route] = {}
+        # Profiling hooks, see add_hook
+        self._hooks: tuple[DispatchHook, ...] = tuple(hooks)
+        for event_type, model, callback in (
+            ("conversation.item.created", ConversationItemCreated, on_item_created),
+            (
+                "response.audio_transcript.delta",
+                AudioTranscriptDelta,
+                on_transcript_delta,
             ),
-            "response.audio_transcript.delta": (
-                AudioTranscriptDelta.model_validate,
-                self.on_transcript_delta,
+            (
+                "response.audio_transcript.done",
+                AudioTranscriptDone,
+                on_transcript_delta_done,
             ),
-            "response.audio_transcript.done": (
-                AudioTranscriptDone.model_validate,
-                self.on_transcript_delta_done,
+            ("response.audio.delta", AudioDelta, on_audio_delta),
+            ("response.audio.done", AudioDone, on_audio_done),
+            ("response.output_item.done", OutputItemDone, on_output_item_done),
+            (
+                "conversation.item.input_audio_transcription.completed",
+                InputAudioTranscriptionCompleted,
+                on_input_audio_transcription_completed,
             ),
-            "response.audio.delta": (
-                AudioDelta.model_validate,
-                self.on_audio_delta,
-            ),
-            "response.audio.done": (
-                AudioDone.model_validate,
-                self.on_audio_done,
-            ),
-            "response.output_item.done": (
-                OutputItemDone.model_validate,
-                self.on_output_item_done,
-            ),
-            "conversation.item.input_audio_transcription.completed": (
-                InputAudioTranscriptionCompleted.model_validate,
-                self.on_input_audio_transcription_completed,
-            ),
-        }
-        (create_model_handler, callback) = handlers.get(event["type"], (None, None))
-        if callback:
-            item = create_model_handler(event)
-            await callback(item)
-        if self.on_event:
-            await self.on_event(event)
+            ("*", None, on_event),
+        ):
+            if callback is not None:
+                self.register(event_type, callback, model)
+
+    def register(self, event_type: str, callback: Callback, model: Model | None = None):
+        """Subscribe `callback` to `event_type`.
+
+        `event_type` is either an exact event type, a prefix ending with `*`
+        (eg. `response.audio*`) or `*` to receive every event. The callback
+        gets the event validated with `model.model_validate`, or the raw event
+        dict when there is no model. Callbacks are called in registration
+        order.
+
+        Models of the `ServerEvent` union (eg. `AudioTranscriptDone`) are
+        validated by `handle_message` straight from the upstream frame with
+        pydantic-core, without decoding it to a dict first, unless another
+        subscriber of the event needs the dict.
+
+        Models with a `from_raw(message, event_type)` classmethod (eg.
+        `RawEvent`, `AudioDeltaView`) are built straight from the upstream
+        frame by `handle_message`, which then skips the json decoding when no
+        other subscriber needs it.
+
+        A callback matching an event through several subscriptions (eg. `*`
+        and `response.done`) with the same model is called once.
+        """
+        self._subscriptions.append((event_type, callback, model))
+        self._routes.clear()
+
+    def unregister(self, callback: Callback):
+        """Remove every subscription of `callback`."""
+        self._subscriptions = [
+            subscription
+            for subscription in self._subscriptions
+            if subscription[1] != callback
+        ]
+        self._routes.clear()
+
+    def add_hook(self, hook: DispatchHook):
+        """Report the dispatched events and the callbacks durations to `hook`.
+
+        Without hooks the dispatch loop is not instrumented at all.
+        """
+        self._hooks = (*self._hooks, hook)
+
+    def on(self, event_type: str, model: Model | None = None):
+        def decorator(callback: Callback) -> Callback:
+            self.register(event_type, callback, model)
+            return callback
+
+        return decorator
+
+    def _compile(self, event_type: str) -> Route:
+        models: list[Model | None] = []
+        callbacks = []
+        for pattern, callback, model in self._subscriptions:
+            if pattern == event_type or (
+                pattern.endswith("*") and event_type.startswith(pattern[:-1])
+            ):
+                if model not in models:
+                    models.append(model)
+                subscribed = (callback, models.index(model))
+                if subscribed not in callbacks:
+                    callbacks.append(subscribed)
+        # The model of the event type in the ServerEvent union is validated
+        # from the frame in one pass unless another model needs the decoded
+        # json, the frame is then decoded once for all of them
+        typed = SERVER_EVENT_MODELS.get(event_type)
+        if typed not in models:
+            typed = None
+        needs_json = any(
+            model is None or (not hasattr(model, "from_raw") and model is not typed)
+            for model in models
+        )
+        route = self._routes[event_type] = (
+            tuple(models),
+            tuple(callbacks),
+            needs_json,
+            typed,
+        )
+        return route
+
+    async def handle_message(self, message: Message):
+        """Dispatch an upstream text frame, decoding it only when needed."""
+        event_type = peek_event_type(message)
+        if event_type is None:
+            await self.handle_event(json.loads(message))
+            return
+        route = self._routes.get(event_type) or self._compile(event_type)
+        models, callbacks, needs_json, typed = route
+        if not callbacks:
+            return
+        try:
+            # Decoded once, the union model is then validated from the dict
+            event = json.loads(message) if needs_json else None
+            parsed = (
+                None if typed is None or needs_json else parse_server_event(message)
+            )
+            items = [
+                _from_message(model, message, event_type, event, parsed)
+                for model in models
+            ]
+        except ValueError:
+            # Not a frame the raw models understand, use the decoded event
+            await self.handle_event(json.loads(message))
+            return
+        if self._hooks:
+            await self._dispatch_traced(event_type, callbacks, items)
+            return
+        for callback, index in callbacks:
+            await callback(items[index])
+
+    async def handle_event(self, event: dict):
+        event_type = event["type"]
+        route = self._routes.get(event_type) or self._compile(event_type)
+        models, callbacks, _, _ = route
+        if not callbacks:
+            return
+        # Each model validates the event once, and only if a callback needs it
+        items = [
+            event if model is None else model.model_validate(event) for model in models
+        ]
+        if self._hooks:
+            await self._dispatch_traced(event_type, callbacks, items)
+            return
+        for callback, index in callbacks:
+            await callback(items[index])
+
+    async def _dispatch_traced(
+        self,
+        event_type: str,
+        callbacks: tuple[tuple[Callback, int], ...],
+        items: list[Any],
+    ):
+        hooks = self._hooks
+        for hook in hooks:
+            hook.on_event(event_type)
+        clock = time.perf_counter
+        for callback, index in callbacks:
+            started_at = clock()
+            try:
+                await callback(items[index])
+            finally:
+                duration = clock() - started_at
+                for hook in hooks:
+                    hook.on_callback(event_type, callback, duration)
 
 
 class FakeOpenAI:
+    """Replay recorded events through an event handler.
+
+    Events are replayed as fast as possible unless `timestamps` (one per
+    event, in seconds) and `speed` are given: the original gaps between the
+    events are then kept, divided by `speed` (2.0 replays twice as fast).
+    """
+
     def __init__(
         self,
-        events: list[str],
+        events: list[dict],
         event_handler: EventHandler,
+        timestamps: list[float] | None = None,
+        speed: float | None = None,
     ):
+        if timestamps is not None and len(timestamps) != len(events):
+            raise ValueError("expected one timestamp per event")
         self.events = events
         self.event_handler = event_handler
+        self.timestamps = timestamps
+        self.speed = speed
 
     async def run(self):
-        for event in self.events:
+        if self.timestamps is None or not self.speed:
+            for event in self.events:
+                await self.event_handler.handle_event(event)
+            return
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first = self.timestamps[0] if self.timestamps else 0.0
+        for timestamp, event in zip(self.timestamps, self.events):
+            # Scheduled from the start, the callbacks time does not add up
+            delay = start + (timestamp - first) / self.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
             await self.event_handler.handle_event(event)
@@ -1,17 +1,42 @@
 import asyncio
+from collections.abc import Callable
+from typing import ParamSpec, TypeVar
+
 import websockets
-import json
 
-from .processors import EventHandler
+from yampa.utils import (
+    CHANNELS,
+    FRAME_RATE,
+    SAMPLE_WIDTH,
+    AudioBackend,
+    AudioFormat,
+    SilenceGate,
+    StreamingTranscoder,
+    TranscoderError,
+    WorkerPool,
+    get_audio_backend,
+    needs_seeking,
+    pcm16_to_base64,
+    pcm16_to_item_create_event,
+)
+
+from .connection import DEFAULT_URL, connect
 from .events import (
-    make_session_update_event,
     InputAudioBufferAppend,
+    InputAudioBufferClear,
     InputAudioBufferCommit,
+    ResponseCreate,
+    TurnDetection,
 )
+from .interrupt import InterruptController
+from .latency import TurnTimer
+from .outbound import OnDrop, OutboundQueue, QueuePolicy
+from .processors import EventHandler
+from .session_pool import SessionPool
+from .tools import ToolExecutor
 
-from pydantic import BaseModel
-
-from yampa.utils import audio_to_item_create_event
+P = ParamSpec("P")
+T = TypeVar("T")
 
 
 class OpenAIRunner:
@@ -20,11 +45,59 @@ class OpenAIRunner:
         api_key: str,
         event_handler: EventHandler | None = None,
         tools: list | None = None,
+        transcoder: StreamingTranscoder | None = None,
+        input_audio_format: AudioFormat = "container",
+        input_sample_rate: int = FRAME_RATE,
+        input_channels: int = CHANNELS,
+        audio_backend: AudioBackend | None = None,
+        worker_pool: WorkerPool | None = None,
+        url: str = DEFAULT_URL,
+        session_pool: SessionPool | None = None,
+        tool_timeout: float = 10.0,
+        outbound_maxsize: int = 64,
+        outbound_policy: QueuePolicy = "block",
+        on_outbound_drop: OnDrop | None = None,
+        turn_detection: TurnDetection | None = None,
+        vad: SilenceGate | None = None,
     ):
         self.api_key = api_key
         self.event_handler = EventHandler() if event_handler is None else event_handler
         self.tools = [] if tools is None else tools
-        self.create_event: asyncio.Queue[BaseModel] = asyncio.Queue()
+        self.transcoder = StreamingTranscoder() if transcoder is None else transcoder
+        self.input_audio_format = input_audio_format
+        self.input_sample_rate = input_sample_rate
+        self.input_channels = input_channels
+        self.audio_backend = (
+            get_audio_backend() if audio_backend is None else audio_backend
+        )
+        self.worker_pool = worker_pool
+        self.url = url
+        self.session_pool = session_pool
+        # With server VAD only appends are sent, upstream commits the turns
+        # and starts the responses on its own
+        self.turn_detection = turn_detection
+        # Drops the silence of the recordings before they are uploaded
+        self.vad = vad
+        self.create_event = OutboundQueue(
+            outbound_maxsize, outbound_policy, on_outbound_drop
+        )
+        self.tool_executor = ToolExecutor(
+            self.tools, self.create_event.put, tool_timeout
+        )
+        self.interrupts = InterruptController(self._send)
+        # Started by the caller when the user audio is received
+        self.turns = TurnTimer()
+        # Streamed recording, see stream_audio
+        self.streaming = False
+        self._streamed = False
+        # Set when an append of the streamed recording was dropped
+        self._dropped = False
+        # Set on a recording that can't be streamed, dropped until the commit
+        self._unstreamable = False
+        # Bytes of a sample split between two streamed pcm16 chunks
+        self._partial_sample = b""
+        self._stream_lock = asyncio.Lock()
+        self._pump: asyncio.Task | None = None
         self._ws = None
 
     @property
@@ -33,47 +106,225 @@ class OpenAIRunner:
             raise ValueError("there is no available weboscket")
         return self._ws
 
-    async def send_audio(self, audio: bytes):
-        append_payload = InputAudioBufferAppend(audio=audio_to_item_create_event(audio))
-        self.create_event.put_nowait(append_payload)
+    async def _send(self, message: str):
+        await self.ws.send(message)
 
-    async def run(self):
-        url = (
-            "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
+    async def interrupt(
+        self, played_ms: float | None = None, item_id: str | None = None
+    ) -> bool:
+        """Stop the assistant, see `InterruptController.interrupt`."""
+        if self._ws is None:
+            return False
+        return await self.interrupts.interrupt(played_ms, item_id)
+
+    async def _offload(
+        self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        # CPU bound work runs in the worker pool so it does not block the
+        # event loop shared with every other session.
+        if self.worker_pool is None:
+            return fn(*args, **kwargs)
+        return await self.worker_pool.run(fn, *args, **kwargs)
+
+    async def _to_pcm16(self, audio: bytes) -> bytes:
+        if self.input_audio_format == "pcm16":
+            if (self.input_sample_rate, self.input_channels) == (FRAME_RATE, CHANNELS):
+                return audio
+            return await self._offload(
+                self.audio_backend.to_pcm16,
+                audio,
+                self.input_sample_rate,
+                self.input_channels,
+                SAMPLE_WIDTH,
+            )
+        if needs_seeking(audio):
+            # Eg. an m4a with its index at the end, it can't be piped
+            return await self.transcoder.decode_file(audio)
+        # Each payload is a whole recording, so the stream ends with it
+        pcm_audio = await self.transcoder.feed(audio)
+        return pcm_audio + await self.transcoder.flush()
+
+    async def send_audio(self, audio: bytes):
+        if self.input_audio_format == "pcm16" and self.vad is None:
+            audio_payload = await self._offload(
+                pcm16_to_item_create_event,
+                audio,
+                self.input_sample_rate,
+                self.input_channels,
+                self.audio_backend,
+            )
+        else:
+            pcm_audio = await self._to_pcm16(audio)
+            if self.vad is not None:
+                # Stateful and cheap (vectorized), it stays on the event loop
+                pcm_audio = self.vad.process(pcm_audio, final=True)
+                if not pcm_audio:
+                    # Nothing but silence, there is no turn to commit
+                    return
+            audio_payload = await self._offload(pcm16_to_base64, pcm_audio)
+        self.turns.mark("transcoded")
+        appended = await self.create_event.put(
+            InputAudioBufferAppend(audio=audio_payload)
         )
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "OpenAI-Beta": "realtime=v1",
-        }
-        self._ws = await websockets.connect(url, extra_headers=headers)
+        # A dropped recording leaves nothing to answer
+        if appended and self.turn_detection is None:
+            await self.create_event.put(InputAudioBufferCommit())
+            await self.create_event.put(ResponseCreate())
+
+    async def _append_streamed(self, pcm_audio: bytes, final: bool = False):
+        if self.vad is not None:
+            pcm_audio = self.vad.process(pcm_audio, final=final)
+        if pcm_audio:
+            self._streamed = True
+            audio_payload = await self._offload(pcm16_to_base64, pcm_audio)
+            if not await self.create_event.put(
+                InputAudioBufferAppend(audio=audio_payload)
+            ):
+                self._dropped = True
+
+    async def _pump_decoded(self):
+        # What ffmpeg decodes after a chunk was fed is appended without
+        # waiting for the next chunk
+        while True:
+            await self.transcoder.wait_decoded()
+            async with self._stream_lock:
+                await self._append_streamed(self.transcoder.take())
+
+    @staticmethod
+    def can_stream(audio_format: AudioFormat, sample_rate: int, channels: int) -> bool:
+        """Whether `stream_audio` accepts audio in this format."""
+        if audio_format == "container":
+            return True
+        return (sample_rate, channels) == (FRAME_RATE, CHANNELS)
+
+    async def stream_audio(self, chunk: bytes):
+        """Append a chunk of a recording still going on.
+
+        Chunks are decoded as they come and appended upstream as soon as they
+        are, so once the recording ends `commit_audio` has little left to do.
+        Streamed pcm16 must be 24kHz mono: resampling each chunk on its own
+        would leave artifacts at the chunk boundaries.
+        """
+        if not self.can_stream(
+            self.input_audio_format, self.input_sample_rate, self.input_channels
+        ):
+            raise ValueError("streamed pcm16 audio must be 24kHz mono")
+        if self._unstreamable:
+            return
+        if (
+            not self.streaming
+            and self.input_audio_format == "container"
+            and needs_seeking(chunk)
+        ):
+            self._unstreamable = True
+            raise TranscoderError(
+                "this mp4/m4a has its index at the end and can't be streamed,"
+                " send it whole with uplink=blob"
+            )
+        self.streaming = True
+        async with self._stream_lock:
+            if self.input_audio_format == "pcm16":
+                pcm_audio = self._partial_sample + chunk
+                end = len(pcm_audio) - len(pcm_audio) % SAMPLE_WIDTH
+                pcm_audio, self._partial_sample = pcm_audio[:end], pcm_audio[end:]
+            else:
+                if self._pump is None:
+                    self._pump = asyncio.create_task(self._pump_decoded())
+                pcm_audio = await self.transcoder.feed(chunk)
+            await self._append_streamed(pcm_audio)
 
-        if self.tools:
-            event = make_session_update_event(tools=self.tools)
-            await self.ws.send(event.json(exclude_unset=True))
+    async def commit_audio(self):
+        """End the streamed recording, and its turn without server VAD."""
+        if self._unstreamable:
+            self._unstreamable = False
+            return
+        async with self._stream_lock:
+            try:
+                pcm_audio = (
+                    b""
+                    if self.input_audio_format == "pcm16"
+                    else await self.transcoder.flush()
+                )
+                await self._append_streamed(pcm_audio, final=True)
+                self.turns.mark("transcoded")
+                streamed, dropped = self._streamed, self._dropped
+            finally:
+                self.streaming = self._streamed = self._dropped = False
+                self._partial_sample = b""
+        if dropped and self.turn_detection is None:
+            # The recording is missing parts, what was appended is discarded
+            # rather than answered
+            await self.create_event.put(InputAudioBufferClear())
+            return
+        # Nothing but silence, there is no turn to commit
+        if streamed and self.turn_detection is None:
+            await self.create_event.put(InputAudioBufferCommit())
+            await self.create_event.put(ResponseCreate())
+
+    async def _on_speech_started(self, event: dict):
+        await self.interrupt()
+
+    async def run(self):
+        # Done here, the event handler can be replaced after the init
+        self.tool_executor.attach(self.event_handler)
+        self.interrupts.attach(self.event_handler)
+        self.turns.attach(self.event_handler)
+        if self.turn_detection is not None:
+            # Upstream VAD hears the user speaking over the assistant
+            self.event_handler.register(
+                "input_audio_buffer.speech_started", self._on_speech_started
+            )
+        if (
+            self.session_pool is not None
+            and self.session_pool.tools == self.tools
+            and self.session_pool.turn_detection == self.turn_detection
+        ):
+            self._ws = await self.session_pool.acquire()
+        else:
+            self._ws = await connect(
+                self.api_key, self.url, self.tools, self.turn_detection
+            )
 
         async def handle_event(ws):
-            async for message in ws:
-                m = json.loads(message)
-                await self.event_handler.handle_event(m)
+            try:
+                while True:
+                    # Keep the frame as bytes, the event handler only decodes
+                    # the events its subscribers need.
+                    message = await ws.recv(decode=False)
+                    await self.event_handler.handle_message(message)
+            except websockets.ConnectionClosedOK:
+                pass
 
         async def handle_audio_create(ws):
             while True:
                 create_event = await self.create_event.get()
-                await ws.send(create_event.json())
-
-                commit_payload = InputAudioBufferCommit()
-                await ws.send(commit_payload.json())
-
-                await ws.send(json.dumps({"type": "response.create"}))
+                await ws.send(create_event.model_dump_json())
+                if isinstance(create_event, InputAudioBufferAppend):
+                    self.turns.mark("append_sent")
+                elif isinstance(create_event, InputAudioBufferCommit):
+                    self.turns.mark("commit_sent")
 
         async def handler(websocket):
-            consumer_task = asyncio.create_task(handle_event(self.ws))
-            producer_task = asyncio.create_task(handle_audio_create(self.ws))
-            done, pending = await asyncio.wait(
-                [consumer_task, producer_task],
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-            for task in pending:
-                task.cancel()
+            tasks = [
+                asyncio.create_task(handle_event(websocket)),
+                asyncio.create_task(handle_audio_create(websocket)),
+            ]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                # Also when run is cancelled, asyncio.wait leaves them running
+                for task in tasks:
+                    task.cancel()
 
-        await handler(self.ws)
+        try:
+            await handler(self.ws)
+        finally:
+            if self._pump is not None:
+                self._pump.cancel()
+                self._pump = None
+            await self.tool_executor.close()
+            await self.transcoder.close()
+            self.create_event.clear()
+            # Pooled or not, a used upstream session is not reused
+            ws, self._ws = self._ws, None
+            await ws.close()
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+
+from websockets.asyncio.client import ClientConnection
+from websockets.exceptions import WebSocketException
+from websockets.protocol import State
+
+from yampa.metrics import Counter, Gauge
+
+from .connection import DEFAULT_URL, connect
+from .events import TurnDetection
+
+logger = logging.getLogger(__name__)
+
+IDLE_SESSIONS = Gauge(
+    "yampa_session_pool_idle",
+    "Upstream sessions connected and waiting for a browser connection.",
+)
+ACQUIRED_SESSIONS = Counter(
+    "yampa_session_pool_acquired_total",
+    "Upstream sessions handed to browser connections.",
+    ("source",),
+)
+
+
+class SessionPool:
+    """Upstream realtime sessions connected and configured ahead of time.
+
+    `acquire` hands out an idle session, already past the TLS and websocket
+    handshakes and the `session.update` with the tools and turn detection,
+    and a replacement is opened in the background. Sessions idle for more
+    than `max_idle` seconds are closed and replaced. When the pool is empty
+    `acquire` connects directly.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        tools: list[Callable] | None = None,
+        size: int = 2,
+        max_idle: float = 300.0,
+        url: str = DEFAULT_URL,
+        turn_detection: TurnDetection | None = None,
+    ):
+        self.api_key = api_key
+        self.tools = [] if tools is None else tools
+        self.turn_detection = turn_detection
+        self.size = size
+        self.max_idle = max_idle
+        self.url = url
+        self._idle: deque[tuple[float, ClientConnection]] = deque()
+        self._refill_task: asyncio.Task[None] | None = None
+        self._expire_task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    async def _connect(self) -> ClientConnection:
+        return await connect(self.api_key, self.url, self.tools, self.turn_detection)
+
+    def start(self):
+        self._refill()
+        if self._expire_task is None:
+            self._expire_task = asyncio.create_task(self._expire())
+
+    def _refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._fill())
+
+    async def _fill(self):
+        while len(self._idle) < self.size:
+            try:
+                ws = await self._connect()
+            except (OSError, TimeoutError, WebSocketException) as exc:
+                # Retried on the next acquire or expiry check
+                logger.warning("can't open an upstream session: %s", exc)
+                return
+            self._idle.append((time.monotonic(), ws))
+            IDLE_SESSIONS.set(len(self._idle))
+
+    async def _expire(self):
+        while True:
+            await asyncio.sleep(self.max_idle / 2)
+            deadline = time.monotonic() - self.max_idle
+            while self._idle and self._idle[0][0] < deadline:
+                _, ws = self._idle.popleft()
+                await ws.close()
+            IDLE_SESSIONS.set(len(self._idle))
+            self._refill()
+
+    async def acquire(self) -> ClientConnection:
+        deadline = time.monotonic() - self.max_idle
+        while self._idle:
+            created, ws = self._idle.popleft()
+            if created >= deadline and ws.state is State.OPEN:
+                IDLE_SESSIONS.set(len(self._idle))
+                ACQUIRED_SESSIONS.labels("pool").inc()
+                self._refill()
+                return ws
+            await ws.close()
+        IDLE_SESSIONS.set(0)
+        ACQUIRED_SESSIONS.labels("direct").inc()
+        self._refill()
+        return await self._connect()
+
+    async def close(self):
+        for task in (self._refill_task, self._expire_task):
+            if task is not None:
+                task.cancel()
+        self._refill_task = self._expire_task = None
+        while self._idle:
+            _, ws = self._idle.popleft()
+            await ws.close()
+        IDLE_SESSIONS.set(0)
@@ -0,0 +1,49 @@
+"""Upstream events a client subscribes to, by category or event type."""
+
+from collections.abc import Iterable
+
+# Event type patterns, as understood by EventHandler.register
+CATEGORIES: dict[str, tuple[str, ...]] = {
+    "session": ("session.*",),
+    "conversation": ("conversation.*",),
+    "input_audio": ("input_audio_buffer.*",),
+    "response": (
+        "response.created",
+        "response.done",
+        "response.output_item.*",
+        "response.content_part.*",
+    ),
+    "text": ("response.text.*", "response.audio_transcript.*"),
+    "tools": ("response.function_call_arguments.*",),
+    "audio": ("response.audio.delta", "response.audio.done"),
+    "rate_limits": ("rate_limits.*",),
+    "error": ("error",),
+    "all": ("*",),
+}
+
+# The audio is already sent to the client on its own, as `new.audio` or
+# binary frames
+DEFAULT_SUBSCRIPTION = tuple(
+    category for category in CATEGORIES if category not in ("audio", "all")
+)
+
+
+def resolve_subscription(names: Iterable[str]) -> list[str]:
+    """Event type patterns of categories, event types or patterns.
+
+    Names that are not a category must be event types (`response.done`) or
+    patterns (`response.*`), anything else raises a ValueError.
+    """
+    patterns: list[str] = []
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        if name in CATEGORIES:
+            expanded = CATEGORIES[name]
+        elif "." in name or name.endswith("*"):
+            expanded = (name,)
+        else:
+            raise ValueError(f"unknown event category: {name}")
+        patterns.extend(pattern for pattern in expanded if pattern not in patterns)
+    return patterns
@@ -0,0 +1,239 @@
+import asyncio
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from yampa.metrics import Counter, Histogram
+
+from .events import (
+    FunctionCallOutputCreate,
+    FunctionCallOutputItem,
+    OutputItemDone,
+    ResponseCreate,
+)
+from .processors import EventHandler
+
+logger = logging.getLogger(__name__)
+
+# Queues a client event, eg. OutboundQueue.put
+Send = Callable[[BaseModel], Awaitable[Any]]
+F = TypeVar("F", bound=Callable)
+
+CACHE_HITS = Counter(
+    "yampa_tool_cache_hits_total",
+    "Tool calls answered from the cache or by an identical call in flight.",
+    ("tool",),
+)
+CACHE_MISSES = Counter(
+    "yampa_tool_cache_misses_total",
+    "Tool calls running the tool.",
+    ("tool",),
+)
+CACHE_EVICTIONS = Counter(
+    "yampa_tool_cache_evictions_total",
+    "Cached tool results evicted to stay under max_entries.",
+    ("tool",),
+)
+TOOL_DURATION = Histogram(
+    "yampa_tool_duration_seconds",
+    "Time to answer a tool call, cache hits, failures and timeouts included.",
+    ("tool",),
+)
+
+
+class ToolCache:
+    """TTL and LRU bounded results of one tool, keyed by its arguments.
+
+    Concurrent calls with the same arguments share a single call of the
+    tool. Failed calls are not cached.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._hits = CACHE_HITS.labels(name)
+        self._misses = CACHE_MISSES.labels(name)
+        self._evictions = CACHE_EVICTIONS.labels(name)
+
+    @staticmethod
+    def key(params: dict) -> str:
+        return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits.inc()
+                return entry[1]
+            del self._entries[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._hits.inc()
+        else:
+            self._misses.inc()
+            future = self._inflight[key] = asyncio.ensure_future(call())
+            future.add_done_callback(partial(self._store, key))
+        # A waiter giving up (eg. on timeout) must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _store(self, key: str, future: asyncio.Future[Any]):
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+
+
+def cacheable(ttl: float = 60.0, max_entries: int = 1024) -> Callable[[F], F]:
+    """Mark an idempotent tool so `ToolExecutor` caches its results.
+
+    The cache lives on the tool, so it is shared by every session of the
+    worker using it.
+    """
+
+    def decorator(tool: F) -> F:
+        tool.tool_cache = ToolCache(tool.__name__, ttl, max_entries)  # type: ignore[attr-defined]
+        return tool
+
+    return decorator
+
+
+class ToolExecutor:
+    """Run the function calls of a response and send their outputs back.
+
+    Tools are looked up by name, async tools run on the event loop and sync
+    ones in `executor` (the loop default thread pool when None), so a slow
+    tool never blocks the receive loop. Each call starts as soon as its
+    `response.output_item.done` arrives, calls of the same response run
+    concurrently and, once the response is done, their outputs are sent as
+    `function_call_output` items followed by a single `response.create`.
+    The calls of a cancelled response (eg. interrupted by the user) are
+    cancelled and their outputs never sent.
+
+    A call taking more than its timeout (`timeouts[name]`, `timeout` by
+    default) gets an error output. A sync tool can't be interrupted: its
+    thread keeps running, only its result is dropped. Results of tools
+    marked with `cacheable` are looked up in their cache first.
+    """
+
+    def __init__(
+        self,
+        tools: list[Callable],
+        send: Send,
+        timeout: float = 10.0,
+        timeouts: dict[str, float] | None = None,
+        executor: Executor | None = None,
+    ):
+        self.tools = {tool.__name__: tool for tool in tools}
+        self.send = send
+        self.timeout = timeout
+        self.timeouts = {} if timeouts is None else timeouts
+        self.executor = executor
+        self._calls: defaultdict[str | None, list[tuple[str, asyncio.Task[str]]]] = (
+            defaultdict(list)
+        )
+        self._sending: set[asyncio.Task[None]] = set()
+
+    def attach(self, event_handler: EventHandler):
+        event_handler.register(
+            "response.output_item.done", self.on_output_item_done, OutputItemDone
+        )
+        event_handler.register("response.done", self.on_response_done)
+
+    async def _call(self, name: str, arguments: str | None) -> str:
+        tool = self.tools.get(name)
+        if tool is None:
+            return f"error: unknown tool {name}"
+        started_at = time.monotonic()
+        try:
+            return await self._call_tool(name, tool, arguments)
+        finally:
+            TOOL_DURATION.labels(name).observe(time.monotonic() - started_at)
+
+    async def _call_tool(self, name: str, tool: Callable, arguments: str | None) -> str:
+        try:
+            params = json.loads(arguments) if arguments else {}
+            tool_cache: ToolCache | None = getattr(tool, "tool_cache", None)
+            if tool_cache is None:
+                call = self._run(tool, params)
+            else:
+                call = tool_cache.get(
+                    ToolCache.key(params), partial(self._run, tool, params)
+                )
+            result = await asyncio.wait_for(call, self.timeouts.get(name, self.timeout))
+        except TimeoutError:
+            logger.warning("tool %s timed out", name)
+            return f"error: {name} timed out"
+        except Exception as exc:
+            logger.exception("tool %s failed", name)
+            return f"error: {exc}"
+        return str(result)
+
+    def _run(self, tool: Callable, params: dict) -> Awaitable[Any]:
+        if inspect.iscoroutinefunction(tool):
+            return tool(**params)
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, partial(tool, **params))
+
+    async def on_output_item_done(self, output_item: OutputItemDone):
+        item = output_item.item
+        if item.name is None or item.call_id is None:
+            return
+        task = asyncio.create_task(self._call(item.name, item.arguments))
+        self._calls[output_item.response_id].append((item.call_id, task))
+
+    async def on_response_done(self, event: dict):
+        response = event.get("response", {})
+        calls = self._calls.pop(response.get("id"), None)
+        if calls is None:
+            # Events without a response id are grouped under None
+            calls = self._calls.pop(None, None)
+        if not calls:
+            return
+        if response.get("status") == "cancelled":
+            for _, call in calls:
+                call.cancel()
+            return
+        task = asyncio.create_task(self._send_outputs(calls))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send_outputs(self, calls: list[tuple[str, asyncio.Task[str]]]):
+        outputs = await asyncio.gather(*(task for _, task in calls))
+        for (call_id, _), output in zip(calls, outputs):
+            await self.send(
+                FunctionCallOutputCreate(
+                    item=FunctionCallOutputItem(call_id=call_id, output=output)
+                )
+            )
+        await self.send(ResponseCreate())
+
+    async def close(self):
+        tasks = [task for calls in self._calls.values() for _, task in calls]
+        tasks.extend(self._sending)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._calls.clear()
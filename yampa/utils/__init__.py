@@ -0,0 +1,47 @@
+from .aggregator import AudioAggregator
+from .audio import (
+    audio_to_item_create_event,
+    pcm16_to_base64,
+    pcm16_to_item_create_event,
+)
+from .backend import (
+    DEFAULT_AUDIO_BACKEND,
+    AudioBackend,
+    AudioBackendName,
+    NumpyBackend,
+    PydubBackend,
+    get_audio_backend,
+)
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH, AudioFormat
+from .frames import pack_audio_frame, unpack_audio_frame
+from .pool import WorkerPool, WorkerPoolKind
+from .store import AudioStore
+from .transcoder import StreamingTranscoder, TranscoderError, needs_seeking
+from .vad import SilenceGate, VadStats
+
+__all__ = [
+    "CHANNELS",
+    "DEFAULT_AUDIO_BACKEND",
+    "FRAME_RATE",
+    "SAMPLE_WIDTH",
+    "AudioAggregator",
+    "AudioBackend",
+    "AudioBackendName",
+    "AudioFormat",
+    "AudioStore",
+    "NumpyBackend",
+    "PydubBackend",
+    "SilenceGate",
+    "StreamingTranscoder",
+    "TranscoderError",
+    "VadStats",
+    "WorkerPool",
+    "WorkerPoolKind",
+    "audio_to_item_create_event",
+    "get_audio_backend",
+    "needs_seeking",
+    "pack_audio_frame",
+    "pcm16_to_base64",
+    "pcm16_to_item_create_event",
+    "unpack_audio_frame",
+]
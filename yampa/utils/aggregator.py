@@ -0,0 +1,102 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from yampa.metrics import Counter
+
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH
+
+AGGREGATED_DELTAS = Counter(
+    "yampa_audio_aggregated_deltas_total",
+    "Response audio deltas buffered by the downstream aggregation.",
+)
+SENT_FRAMES = Counter(
+    "yampa_audio_frames_sent_total",
+    "Response audio frames sent to the clients by the downstream aggregation.",
+    ("reason",),
+)
+
+SendFrame = Callable[[str, bytes], Awaitable[None]]
+
+
+class AudioAggregator:
+    """Response audio regrouped in fewer, larger frames for the client.
+
+    Decoded pcm is buffered per item and sent once at least `frame_ms` of it
+    is buffered. Frames are not cut to exactly `frame_ms`: the remainder
+    would cost a message of its own, and a large delta is sent as is. What
+    is left is sent on `done`, or after `max_latency_ms` so the start of
+    playback is never delayed by more than that. `frame_ms=0` sends each
+    delta as it comes.
+
+    Frames of an item are sent in order, the timer flush and the deltas
+    share a lock.
+    """
+
+    def __init__(
+        self,
+        send: SendFrame,
+        frame_ms: int = 80,
+        max_latency_ms: int | None = 100,
+    ):
+        self.send = send
+        self.frame_ms = frame_ms
+        self.max_latency_ms = max_latency_ms
+        self.frame_bytes = FRAME_RATE * CHANNELS * SAMPLE_WIDTH * frame_ms // 1000
+        self._buffers: dict[str, bytearray] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+
+    async def append(self, item_id: str, pcm: bytes | memoryview):
+        if not self.frame_bytes:
+            await self.send(item_id, bytes(pcm))
+            return
+        AGGREGATED_DELTAS.inc()
+        async with self._lock:
+            buffer = self._buffers.get(item_id)
+            if buffer is None:
+                buffer = self._buffers[item_id] = bytearray()
+            buffer += pcm
+            if len(buffer) >= self.frame_bytes:
+                frame = bytes(buffer)
+                buffer.clear()
+                SENT_FRAMES.labels("full").inc()
+                await self.send(item_id, frame)
+        if self.max_latency_ms is None:
+            return
+        if buffer:
+            if self._timer is None:
+                self._timer = asyncio.create_task(self._flush_later())
+        elif self._timer is not None and not any(self._buffers.values()):
+            # Nothing waits anymore, the next delta starts a new deadline
+            self._timer.cancel()
+            self._timer = None
+
+    async def _flush_later(self):
+        assert self.max_latency_ms is not None
+        await asyncio.sleep(self.max_latency_ms / 1000)
+        self._timer = None
+        async with self._lock:
+            for item_id, buffer in self._buffers.items():
+                if buffer:
+                    frame = bytes(buffer)
+                    buffer.clear()
+                    SENT_FRAMES.labels("latency").inc()
+                    await self.send(item_id, frame)
+
+    async def done(self, item_id: str):
+        """Send what is left of an item, its audio is complete."""
+        async with self._lock:
+            buffer = self._buffers.pop(item_id, None)
+            if buffer:
+                SENT_FRAMES.labels("done").inc()
+                await self.send(item_id, bytes(buffer))
+
+    def discard(self, item_id: str):
+        """Drop the buffered audio of an item, eg. interrupted by the user."""
+        self._buffers.pop(item_id, None)
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._buffers.clear()
@@ -0,0 +1,39 @@
+import base64
+import io
+
+from .backend import AudioBackend, PydubBackend, get_audio_backend
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH
+
+
+def pcm16_to_base64(pcm_audio: bytes) -> str:
+    return base64.b64encode(pcm_audio).decode()
+
+
+def pcm16_to_item_create_event(
+    audio: bytes,
+    frame_rate: int = FRAME_RATE,
+    channels: int = CHANNELS,
+    backend: AudioBackend | None = None,
+) -> str:
+    if (frame_rate, channels) != (FRAME_RATE, CHANNELS):
+        backend = get_audio_backend() if backend is None else backend
+        audio = backend.to_pcm16(audio, frame_rate, channels, SAMPLE_WIDTH)
+    return pcm16_to_base64(audio)
+
+
+def audio_to_item_create_event(
+    audio_bytes: bytes, backend: AudioBackend | None = None
+) -> str:
+    from pydub import AudioSegment
+
+    # Load the audio file from the byte stream
+    audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
+
+    # Resample to 24kHz mono pcm16
+    backend = PydubBackend() if backend is None else backend
+    pcm_audio = backend.to_pcm16(
+        audio.raw_data, audio.frame_rate, audio.channels, audio.sample_width
+    )
+
+    # Encode to base64 string
+    return pcm16_to_base64(pcm_audio)
@@ -0,0 +1,145 @@
+from functools import lru_cache
+from math import gcd
+from typing import Literal, Protocol
+
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+AudioBackendName = Literal["numpy", "pydub"]
+DEFAULT_AUDIO_BACKEND: AudioBackendName = "pydub" if np is None else "numpy"
+
+
+class AudioBackend(Protocol):
+    def to_pcm16(
+        self, audio: bytes, frame_rate: int, channels: int, sample_width: int
+    ) -> bytes:
+        """Convert raw signed pcm to 24kHz mono pcm16."""
+        ...
+
+
+class PydubBackend:
+    def to_pcm16(
+        self, audio: bytes, frame_rate: int, channels: int, sample_width: int
+    ) -> bytes:
+        from pydub import AudioSegment
+
+        segment = AudioSegment(
+            data=audio,
+            sample_width=sample_width,
+            frame_rate=frame_rate,
+            channels=channels,
+        )
+        return (
+            segment.set_frame_rate(FRAME_RATE)
+            .set_channels(CHANNELS)
+            .set_sample_width(SAMPLE_WIDTH)
+            .raw_data
+        )
+
+
+# Kaiser windowed sinc, same design as scipy.signal.resample_poly
+_KAISER_BETA = 5.0
+_HALF_LENGTH_PER_RATE = 10
+_SCALE = {1: 256.0, 2: 1.0, 3: 1 / 65536, 4: 1 / 65536}
+_DTYPE = {1: "i1", 2: "<i2", 4: "<i4"}
+
+
+def _frombuffer(audio: bytes, sample_width: int) -> "np.ndarray":
+    if sample_width != 3:
+        return np.frombuffer(audio, dtype=_DTYPE[sample_width])
+    # No 24 bit dtype, samples are moved to the upper bytes of an int32
+    widened = np.zeros((len(audio) // 3, 4), np.uint8)
+    widened[:, 1:] = np.frombuffer(audio, np.uint8).reshape(-1, 3)
+    return widened.view("<i4").ravel()
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> "np.ndarray":
+    """Low-pass filter split in `up` phases, each phase reversed.
+
+    Row `p` holds the taps applied to the input window ending at the sample
+    used for every output sample of phase `p`.
+    """
+    max_rate = max(up, down)
+    half_length = _HALF_LENGTH_PER_RATE * max_rate
+    n = np.arange(2 * half_length + 1, dtype=np.float64) - half_length
+    h = np.sinc(n / max_rate) * np.kaiser(n.size, _KAISER_BETA)
+    h *= up / h.sum()
+    taps = -(-h.size // up)
+    h = np.concatenate([h, np.zeros(taps * up - h.size)])
+    # h[p + j * up] is the j-th tap of phase p
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+
+
+def _resample(samples: "np.ndarray", up: int, down: int) -> "np.ndarray":
+    phases = _polyphase_filter(up, down)
+    taps = phases.shape[1]
+    half_length = _HALF_LENGTH_PER_RATE * max(up, down)
+    length = -(-samples.size * up // down)
+    padded = np.zeros(samples.size + 2 * taps + half_length // up + 1, np.float32)
+    padded[taps - 1 : taps - 1 + samples.size] = samples
+    windows = np.lib.stride_tricks.sliding_window_view(padded, taps)
+
+    # Output samples `r`, `r + up`, `r + 2 * up`, ... share the same phase and
+    # their input windows are `down` samples apart: one strided matrix-vector
+    # product per phase.
+    out = np.empty(length, np.float32)
+    for r in range(min(up, length)):
+        index, phase = divmod(r * down + half_length, up)
+        count = len(range(r, length, up))
+        out[r::up] = windows[index : index + count * down : down] @ phases[phase]
+    return out
+
+
+class NumpyBackend:
+    """Vectorized resampling, downmix and sample width conversion.
+
+    Samples are read in place with `np.frombuffer` and channels are summed
+    from strided views, the only intermediate arrays are the float32 mono
+    signal and the resampled one.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("numpy is required by the numpy audio backend")
+
+    def to_pcm16(
+        self, audio: bytes, frame_rate: int, channels: int, sample_width: int
+    ) -> bytes:
+        if (frame_rate, channels, sample_width) == (FRAME_RATE, CHANNELS, SAMPLE_WIDTH):
+            return audio
+        if sample_width not in _SCALE:
+            raise ValueError(f"unsupported sample width: {sample_width}")
+
+        interleaved = _frombuffer(audio, sample_width)
+        samples = interleaved[::channels].astype(np.float32)
+        for channel in range(1, channels):
+            samples += interleaved[channel::channels]
+        scale = _SCALE[sample_width] / channels
+        if scale != 1:
+            samples *= scale
+
+        if frame_rate != FRAME_RATE:
+            divisor = gcd(FRAME_RATE, frame_rate)
+            samples = _resample(samples, FRAME_RATE // divisor, frame_rate // divisor)
+
+        np.rint(samples, out=samples)
+        np.clip(samples, -32768, 32767, out=samples)
+        return samples.astype("<i2").tobytes()
+
+
+def get_audio_backend(name: AudioBackendName | None = None) -> AudioBackend:
+    """Return the requested backend, `DEFAULT_AUDIO_BACKEND` by default.
+
+    pydub relies on audioop, deprecated and removed from python 3.13, so it
+    is only the default when numpy is not installed. It is still faster in
+    `benchmarks/bench_audio_backend.py` and can be requested by name.
+    """
+    if (DEFAULT_AUDIO_BACKEND if name is None else name) == "numpy":
+        return NumpyBackend()
+    return PydubBackend()
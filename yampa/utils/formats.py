@@ -0,0 +1,11 @@
+from typing import Literal
+
+# Realtime API input/output audio format: 24kHz mono pcm16
+FRAME_RATE = 24000
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+
+# Format of the audio sent by the browser: any container ffmpeg can decode, or
+# raw pcm16 which needs no decoding and is only resampled when its rate or
+# channels differ from the realtime API ones.
+AudioFormat = Literal["container", "pcm16"]
@@ -0,0 +1,19 @@
+import struct
+
+# Binary audio frame sent to the browser:
+#   uint32 LE sequence number | uint8 item id length | item id | pcm16 samples
+_HEADER = struct.Struct("<IB")
+
+
+def pack_audio_frame(item_id: str, sequence: int, pcm_audio: bytes) -> bytes:
+    encoded_item_id = item_id.encode()
+    return b"".join(
+        (_HEADER.pack(sequence, len(encoded_item_id)), encoded_item_id, pcm_audio)
+    )
+
+
+def unpack_audio_frame(frame: bytes) -> tuple[str, int, memoryview]:
+    sequence, item_id_length = _HEADER.unpack_from(frame)
+    offset = _HEADER.size + item_id_length
+    item_id = frame[_HEADER.size : offset].decode()
+    return item_id, sequence, memoryview(frame)[offset:]
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal, ParamSpec, TypeVar
+
+from yampa.metrics import Counter, Gauge, Histogram
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+WorkerPoolKind = Literal["thread", "process"]
+
+QUEUE_DEPTH = Gauge(
+    "yampa_worker_pool_queue_depth",
+    "Tasks waiting for a free worker.",
+    ("pool",),
+)
+WAIT_SECONDS = Histogram(
+    "yampa_worker_pool_wait_seconds",
+    "Time between a task submission and its start on a worker.",
+    ("pool",),
+)
+TASKS = Counter(
+    "yampa_worker_pool_tasks_total",
+    "Tasks run by the worker pool.",
+    ("pool",),
+)
+
+
+def _timed_call(fn: Callable[..., T], args: tuple, kwargs: dict) -> tuple[float, T]:
+    # time.monotonic is shared between processes, unlike time.perf_counter
+    return time.monotonic(), fn(*args, **kwargs)
+
+
+class WorkerPool:
+    """Bounded pool running CPU bound work off the event loop.
+
+    At most `max_workers` tasks are handed to the executor, the others wait in
+    `run` so the queue depth and the wait time can be measured. `run` is
+    awaited by each session before submitting its next payload, which keeps the
+    ordering per session.
+    """
+
+    def __init__(
+        self,
+        kind: WorkerPoolKind = "thread",
+        max_workers: int | None = None,
+        name: str = "transcode",
+    ):
+        self.kind = kind
+        self.max_workers = (
+            min(4, os.cpu_count() or 1) if max_workers is None else max_workers
+        )
+        self.name = name
+        self._executor: Executor = (
+            ThreadPoolExecutor(self.max_workers, thread_name_prefix=name)
+            if kind == "thread"
+            else ProcessPoolExecutor(self.max_workers)
+        )
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._queue_depth = QUEUE_DEPTH.labels(name)
+        self._wait_seconds = WAIT_SECONDS.labels(name)
+        self._tasks = TASKS.labels(name)
+
+    @property
+    def queue_depth(self) -> int:
+        return int(self._queue_depth.value)
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        submitted = time.monotonic()
+        self._queue_depth.inc()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queue_depth.dec()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(
+                self._executor, _timed_call, fn, args, kwargs
+            )
+        finally:
+            self._slots.release()
+        self._wait_seconds.observe(started - submitted)
+        self._tasks.inc()
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
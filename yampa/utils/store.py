@@ -0,0 +1,184 @@
+import base64
+import os
+import tempfile
+from collections import OrderedDict
+
+from yampa.metrics import Counter, Gauge
+
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH
+
+STORED_BYTES = Gauge(
+    "yampa_audio_store_bytes",
+    "Decoded response audio held in memory, all sessions included.",
+)
+SPILLED_BYTES = Gauge(
+    "yampa_audio_store_spilled_bytes",
+    "Response audio spilled to disk, all sessions included.",
+)
+EVICTIONS = Counter(
+    "yampa_audio_store_evictions_total",
+    "Response audio items evicted (or spilled) to stay under the byte budget.",
+)
+
+BYTES_PER_MS = FRAME_RATE * CHANNELS * SAMPLE_WIDTH // 1000
+
+
+class AudioStore:
+    """Response audio of a session, decoded once, one `bytearray` per item.
+
+    Items grow with `append` until `done`. Done items are freed unless
+    `keep_done` is set, in which case they stay available for replay. When
+    the stored audio goes over `max_bytes`, the least recently used items
+    are evicted, or written to a temporary file under `spill_dir` when one
+    is given. Spilled files have their own `max_spill_bytes` budget, over
+    it the least recently used ones are deleted. The item being appended is
+    never evicted, it can go over the budgets on its own.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 4 * 1024 * 1024,
+        keep_done: bool = False,
+        spill_dir: str | None = None,
+        max_spill_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.keep_done = keep_done
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.nbytes = 0
+        self.spilled_bytes = 0
+        self._items: OrderedDict[str, bytearray] = OrderedDict()
+        # Paths of the spilled items, no file stays open between calls
+        self._spilled: OrderedDict[str, str] = OrderedDict()
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items or item_id in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._items) + len(self._spilled)
+
+    def _resize(self, delta: int):
+        self.nbytes += delta
+        STORED_BYTES.inc(delta)
+
+    def _resize_spilled(self, delta: int):
+        self.spilled_bytes += delta
+        SPILLED_BYTES.inc(delta)
+
+    def append(self, item_id: str, pcm: bytes | memoryview):
+        path = self._spilled.get(item_id)
+        if path is not None:
+            with open(path, "ab") as file:
+                file.write(pcm)
+            self._spilled.move_to_end(item_id)
+            self._resize_spilled(len(pcm))
+            if self.spilled_bytes > self.max_spill_bytes:
+                self._evict_spilled(keep=item_id)
+            return
+        item = self._items.get(item_id)
+        if item is None:
+            item = self._items[item_id] = bytearray()
+        else:
+            self._items.move_to_end(item_id)
+        item += pcm
+        self._resize(len(pcm))
+        if self.nbytes > self.max_bytes:
+            self._evict(keep=item_id)
+
+    def append_base64(self, item_id: str, delta: str | bytes | memoryview):
+        self.append(item_id, base64.b64decode(delta))
+
+    def _evict(self, keep: str):
+        for item_id in list(self._items):
+            if self.nbytes <= self.max_bytes:
+                break
+            if item_id == keep:
+                continue
+            item = self._items.pop(item_id)
+            if self.spill_dir is not None:
+                fd, path = tempfile.mkstemp(prefix="yampa-audio-", dir=self.spill_dir)
+                with open(fd, "wb") as file:
+                    file.write(item)
+                self._spilled[item_id] = path
+                self._resize_spilled(len(item))
+            self._resize(-len(item))
+            EVICTIONS.inc()
+        if self.spilled_bytes > self.max_spill_bytes:
+            self._evict_spilled(keep=keep)
+
+    def _evict_spilled(self, keep: str):
+        for item_id in list(self._spilled):
+            if self.spilled_bytes <= self.max_spill_bytes:
+                break
+            if item_id != keep:
+                self._delete_spilled(item_id)
+                EVICTIONS.inc()
+
+    def _delete_spilled(self, item_id: str):
+        path = self._spilled.pop(item_id)
+        self._resize_spilled(-os.path.getsize(path))
+        os.remove(path)
+
+    def done(self, item_id: str):
+        if not self.keep_done:
+            self.discard(item_id)
+
+    def discard(self, item_id: str):
+        item = self._items.pop(item_id, None)
+        if item is not None:
+            self._resize(-len(item))
+        if item_id in self._spilled:
+            self._delete_spilled(item_id)
+
+    def get(self, item_id: str) -> bytes | None:
+        return self.slice_ms(item_id, 0)
+
+    def duration_ms(self, item_id: str) -> float:
+        item = self._items.get(item_id)
+        if item is not None:
+            return len(item) / BYTES_PER_MS
+        path = self._spilled.get(item_id)
+        if path is None:
+            return 0.0
+        return os.path.getsize(path) / BYTES_PER_MS
+
+    def slice_ms(
+        self, item_id: str, start_ms: float, end_ms: float | None = None
+    ) -> bytes | None:
+        """Audio of an item between two offsets, None when it is not stored."""
+        start = int(start_ms * BYTES_PER_MS) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        end = (
+            None
+            if end_ms is None
+            else int(end_ms * BYTES_PER_MS) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        )
+        item = self._items.get(item_id)
+        if item is not None:
+            self._items.move_to_end(item_id)
+            return bytes(memoryview(item)[start:end])
+        path = self._spilled.get(item_id)
+        if path is None:
+            return None
+        self._spilled.move_to_end(item_id)
+        with open(path, "rb") as file:
+            file.seek(start)
+            return file.read(-1 if end is None else max(end - start, 0))
+
+    def truncate(self, item_id: str, end_ms: float):
+        """Drop the audio of an item after `end_ms`, eg. what was not played."""
+        end = int(end_ms * BYTES_PER_MS) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        item = self._items.get(item_id)
+        if item is not None and end < len(item):
+            self._resize(end - len(item))
+            del item[end:]
+        path = self._spilled.get(item_id)
+        if path is not None:
+            size = os.path.getsize(path)
+            if end < size:
+                os.truncate(path, end)
+                self._resize_spilled(end - size)
+
+    def clear(self):
+        for item_id in list(self._items) + list(self._spilled):
+            self.discard(item_id)
@@ -0,0 +1,220 @@
+import asyncio
+import struct
+import tempfile
+
+from .formats import CHANNELS, FRAME_RATE, SAMPLE_WIDTH
+
+# Last bytes of the ffmpeg stderr kept for the error messages
+STDERR_TAIL = 4096
+
+
+class TranscoderError(RuntimeError):
+    pass
+
+
+def needs_seeking(data: bytes) -> bool:
+    """Whether `data` starts an mp4/m4a with its index after the samples.
+
+    ffmpeg reads the `moov` box before decoding the `mdat` one, from a pipe
+    it can't go back to the samples once it found the index at the end.
+    Fragmented mp4 (eg. Safari MediaRecorder) has its index first.
+    """
+    if data[4:8] != b"ftyp":
+        return False
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box = struct.unpack_from(">I4s", data, offset)
+        if box == b"moov":
+            return False
+        if box == b"mdat":
+            return True
+        if size == 1 and offset + 16 <= len(data):
+            (size,) = struct.unpack_from(">Q", data, offset + 8)
+        if size < 8:
+            break
+        offset += size
+    return False
+
+
+class StreamingTranscoder:
+    """Long-lived ffmpeg decoder turning container/codec bytes into pcm16.
+
+    Bytes are fed incrementally with `feed` which returns the pcm decoded so
+    far, `flush` ends the current stream and returns what is left. The pcm
+    decoded in between can be collected with `wait_decoded` and `take`. Once a
+    stream is flushed a new ffmpeg process is spawned in the background so the
+    next stream does not pay for the process start.
+
+    The input must be a streamable container (webm, ogg, ...), containers
+    needing to seek (eg. m4a with its index at the end) can't be read from a
+    pipe.
+    """
+
+    def __init__(
+        self,
+        ffmpeg: str = "ffmpeg",
+        frame_rate: int = FRAME_RATE,
+        channels: int = CHANNELS,
+        prewarm: bool = True,
+    ):
+        self.ffmpeg = ffmpeg
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.prewarm = prewarm
+        self._frame_width = channels * SAMPLE_WIDTH
+        self._process: asyncio.subprocess.Process | None = None
+        self._spawning: asyncio.Task[asyncio.subprocess.Process] | None = None
+        self._reader: asyncio.Task[None] | None = None
+        self._stderr: asyncio.Task[bytes] | None = None
+        self._pcm = bytearray()
+        # Set by the reader each time pcm is decoded
+        self._decoded = asyncio.Event()
+        self._fed = False
+
+    def _command(self, source: str = "pipe:0") -> list[str]:
+        return [
+            self.ffmpeg,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            # Start decoding as soon as possible instead of buffering seconds
+            # of input to probe the container.
+            "-probesize",
+            "4096",
+            "-analyzeduration",
+            "0",
+            "-i",
+            source,
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-ac",
+            str(self.channels),
+            "-ar",
+            str(self.frame_rate),
+            "-flush_packets",
+            "1",
+            "pipe:1",
+        ]
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            *self._command(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+    async def _read(self, process: asyncio.subprocess.Process):
+        assert process.stdout is not None
+        while chunk := await process.stdout.read(65536):
+            self._pcm += chunk
+            self._decoded.set()
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process) -> bytes:
+        # Read as it comes, a full pipe would block ffmpeg on its warnings
+        assert process.stderr is not None
+        tail = bytearray()
+        while chunk := await process.stderr.read(65536):
+            tail += chunk
+            del tail[:-STDERR_TAIL]
+        return bytes(tail)
+
+    async def start(self):
+        if self._process is not None:
+            return
+        if self._spawning is None:
+            self._spawning = asyncio.ensure_future(self._spawn())
+        spawning, self._spawning = self._spawning, None
+        self._process = await spawning
+        self._reader = asyncio.create_task(self._read(self._process))
+        self._stderr = asyncio.create_task(self._drain_stderr(self._process))
+
+    def _take(self, everything: bool = False) -> bytes:
+        size = len(self._pcm)
+        if not everything:
+            size -= size % self._frame_width
+        pcm = bytes(self._pcm[:size])
+        del self._pcm[:size]
+        return pcm
+
+    def take(self) -> bytes:
+        """Whole frames decoded so far and not returned yet."""
+        return self._take()
+
+    async def wait_decoded(self):
+        """Wait until at least a whole frame is decoded, see `take`."""
+        while len(self._pcm) < self._frame_width:
+            self._decoded.clear()
+            await self._decoded.wait()
+
+    async def feed(self, data: bytes) -> bytes:
+        await self.start()
+        assert self._process is not None and self._process.stdin is not None
+        self._fed = True
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg stopped reading, the error is reported by flush
+            pass
+        # Give the reader a chance to collect what is already decoded
+        await asyncio.sleep(0)
+        return self._take()
+
+    async def flush(self) -> bytes:
+        if self._process is None or not self._fed:
+            return b""
+        process, reader, errors = self._process, self._reader, self._stderr
+        assert process.stdin is not None
+        assert reader is not None and errors is not None
+        self._process, self._reader, self._stderr = None, None, None
+        self._fed = False
+        if self.prewarm:
+            self._spawning = asyncio.ensure_future(self._spawn())
+
+        process.stdin.close()
+        await reader
+        stderr = await errors
+        if await process.wait() != 0:
+            self._pcm.clear()
+            raise TranscoderError(stderr.decode(errors="replace").strip())
+        return self._take(everything=True)
+
+    async def decode_file(self, data: bytes) -> bytes:
+        """Decode a whole recording from a temporary file, ffmpeg can seek it."""
+        with tempfile.NamedTemporaryFile(prefix="yampa-upload-") as file:
+            file.write(data)
+            file.flush()
+            process = await asyncio.create_subprocess_exec(
+                *self._command(file.name),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            pcm, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise TranscoderError(
+                stderr[-STDERR_TAIL:].decode(errors="replace").strip()
+            )
+        return pcm
+
+    async def close(self):
+        processes = [] if self._process is None else [self._process]
+        if self._spawning is not None:
+            try:
+                processes.append(await self._spawning)
+            except OSError:
+                pass
+        for task in (self._reader, self._stderr):
+            if task is not None:
+                task.cancel()
+        for process in processes:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+        self._process, self._spawning = None, None
+        self._reader, self._stderr = None, None
+        self._fed = False
+        self._pcm.clear()
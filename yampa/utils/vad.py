@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+
+from yampa.metrics import Counter
+
+from .formats import FRAME_RATE, SAMPLE_WIDTH
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+INPUT_SECONDS = Counter(
+    "yampa_vad_input_seconds_total",
+    "Seconds of microphone audio going through the silence gate.",
+)
+DROPPED_SECONDS = Counter(
+    "yampa_vad_dropped_seconds_total",
+    "Seconds of silence dropped by the silence gate before the upload.",
+)
+
+
+@dataclass
+class VadStats:
+    input_bytes: int = 0
+    kept_bytes: int = 0
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.input_bytes - self.kept_bytes
+
+    @property
+    def input_ms(self) -> float:
+        return self.input_bytes / (FRAME_RATE * SAMPLE_WIDTH) * 1000
+
+    @property
+    def dropped_ms(self) -> float:
+        return self.dropped_bytes / (FRAME_RATE * SAMPLE_WIDTH) * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "input_ms": round(self.input_ms),
+            "dropped_ms": round(self.dropped_ms),
+        }
+
+
+class SilenceGate:
+    """Energy and zero-crossing VAD dropping silence from 24kHz mono pcm16.
+
+    The audio is split in `frame_ms` frames. A frame is speech when its level
+    is above `threshold_db` (dBFS), or within `fricative_margin_db` of it
+    with a zero-crossing rate above `zcr_threshold` (unvoiced consonants are
+    quiet but noisy). Frames up to `hangover_ms` after speech and
+    `padding_ms` before it are kept too, so words are not clipped and short
+    pauses survive. Everything else is dropped.
+
+    The gate is stateful: chunks of a stream are passed to `process` in
+    order and `final=True` ends the stream. Audio held back while waiting to
+    know whether it precedes speech is at most `padding_ms` long.
+
+    With server VAD, `hangover_ms` must be longer than its silence duration
+    or upstream never sees the end of the turn.
+    """
+
+    def __init__(
+        self,
+        threshold_db: float = -45.0,
+        frame_ms: int = 20,
+        hangover_ms: int = 300,
+        padding_ms: int = 200,
+        zcr_threshold: float = 0.3,
+        fricative_margin_db: float = 10.0,
+    ):
+        if np is None:
+            raise ImportError("numpy is required by the silence gate")
+        self.threshold_db = threshold_db
+        self.frame_bytes = FRAME_RATE * frame_ms // 1000 * SAMPLE_WIDTH
+        self.hangover = -(-hangover_ms // frame_ms)
+        self.padding = -(-padding_ms // frame_ms)
+        self.zcr_threshold = zcr_threshold
+        self.fricative_margin_db = fricative_margin_db
+        self.stats = VadStats()
+        self._dropped_seconds = 0.0
+        self.reset()
+
+    def reset(self):
+        """Forget the current stream, the held back audio is dropped."""
+        # Bytes not making a whole frame yet, trailing silent frames held
+        # back in case speech follows, and frames from the last speech frame
+        # to the held back ones
+        self._partial = b""
+        self._pending = b""
+        self._since_speech = self.hangover + 1
+
+    def _speech_frames(self, frames: "np.ndarray") -> "np.ndarray":
+        samples = frames.astype(np.float32)
+        power = np.einsum("ij,ij->i", samples, samples) / samples.shape[1]
+        level_db = 10 * np.log10(power / 32768.0**2 + 1e-12)
+        signs = np.signbit(frames)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr = crossings / (frames.shape[1] - 1)
+        return (level_db > self.threshold_db) | (
+            (level_db > self.threshold_db - self.fricative_margin_db)
+            & (zcr > self.zcr_threshold)
+        )
+
+    def _keep(self, speech: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+        count = len(speech)
+        index = np.arange(count)
+        last_speech = np.where(speech, index, -1 - self._since_speech)
+        since_speech = index - np.maximum.accumulate(last_speech)
+        next_speech = np.where(speech, index, count + self.padding)
+        until_speech = np.minimum.accumulate(next_speech[::-1])[::-1] - index
+        keep = (since_speech <= self.hangover) | (until_speech <= self.padding)
+        return keep, since_speech
+
+    def process(self, pcm: bytes, final: bool = False) -> bytes:
+        """Audio to upload from `pcm`, preceded by held back padding if any."""
+        data = self._pending + self._partial + pcm
+        frame_count = len(data) // self.frame_bytes
+        whole = frame_count * self.frame_bytes
+        kept = b""
+        held = 0
+        if frame_count:
+            samples = np.frombuffer(data, "<i2", count=whole // SAMPLE_WIDTH)
+            keep, since_speech = self._keep(
+                self._speech_frames(samples.reshape(frame_count, -1))
+            )
+            if not final:
+                # Trailing dropped frames may turn out to be padding
+                kept_frames = np.flatnonzero(keep)
+                trailing = frame_count - (
+                    int(kept_frames[-1]) + 1 if kept_frames.size else 0
+                )
+                held = min(trailing, self.padding)
+            if held < frame_count:
+                self._since_speech = int(since_speech[frame_count - held - 1])
+            mask = np.repeat(keep, self.frame_bytes)
+            kept = np.frombuffer(data, np.uint8, count=whole)[mask].tobytes()
+        self._pending = data[whole - held * self.frame_bytes : whole]
+        self._partial = data[whole:]
+
+        if final:
+            # The last partial frame goes with the frame before it
+            if self._partial and self._since_speech < self.hangover:
+                kept += self._partial
+            self.reset()
+
+        stats = self.stats
+        stats.input_bytes += len(pcm)
+        stats.kept_bytes += len(kept)
+        # Held back audio counts as dropped once it is known to be
+        dropped = (stats.dropped_bytes - len(self._pending) - len(self._partial)) / (
+            FRAME_RATE * SAMPLE_WIDTH
+        )
+        INPUT_SECONDS.inc(len(pcm) / (FRAME_RATE * SAMPLE_WIDTH))
+        DROPPED_SECONDS.inc(dropped - self._dropped_seconds)
+        self._dropped_seconds = dropped
+        return kept